@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark Company Name Similarity
+
+This script measures how many candidate pairs per second are scored by score_normalized,
+one pair at a time with each longest common substring backend, and by the NumPy kernel
+of NameMatrix, one block of pairs at a time.
+The pairs are the candidates CompanyNameIndex generates for the names at a threshold, so
+the benchmark scores the pairs the grouping would score.
+
+Usage:
+    python benchmark_similarity.py [input_file] [--threshold T] [--limit N] [--repeat N]
+"""
+
+import argparse
+import os
+import time
+from company_name_blocking import CompanyNameIndex
+from company_name_similarity import DEFAULT_LCS_BACKEND, LCS_BACKENDS, score_normalized, set_lcs_backend
+from company_name_similarity_batch import NameMatrix
+
+DEFAULT_INPUT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                  'Data', 'NormalizedCompanyNames.2024.txt')
+
+def best_time(function, repeat=3):
+    """
+    Run a function several times and keep the fastest run.
+
+    Args:
+        function (callable): Function to run, without arguments
+        repeat (int, optional): Number of runs. Defaults to 3.
+
+    Returns:
+        float: Seconds taken by the fastest run
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def benchmark(names, threshold=0.5, repeat=3):
+    """
+    Score the candidate pairs of some names with the scalar scorer of each backend and the batched scorer.
+
+    Args:
+        names (list): Company names
+        threshold (float, optional): Threshold the candidates are generated for. Defaults to 0.5.
+        repeat (int, optional): Number of runs. Defaults to 3.
+
+    Returns:
+        tuple: (number of pairs, dict of scalar pairs/second by backend, batched pairs/second)
+    """
+    index = CompanyNameIndex(names)
+    left = []
+    right = []
+    for i in range(len(index)):
+        candidates = index.candidates(i, threshold)
+        left.extend([i] * len(candidates))
+        right.extend(candidates)
+
+    tokenized = index.tokenized
+    matrix = NameMatrix(tokenized)
+
+    def scalar():
+        for i, j in zip(left, right):
+            score_normalized(tokenized[i], tokenized[j])
+
+    def rate(seconds):
+        return len(left) / seconds if seconds > 0 else float('inf')
+
+    scalar_rates = {}
+    for backend in LCS_BACKENDS:
+        set_lcs_backend(backend)
+        scalar_rates[backend] = rate(best_time(scalar, repeat))
+    set_lcs_backend(DEFAULT_LCS_BACKEND)
+    return len(left), scalar_rates, rate(best_time(lambda: matrix.score_pairs(left, right), repeat))
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the company name similarity scorers')
+    parser.add_argument('input_file', nargs='?', default=DEFAULT_INPUT_FILE,
+                        help='Path to input file containing company names (one per line)')
+    parser.add_argument('--threshold', type=float, default=0.5,
+                        help='Similarity threshold the candidate pairs are generated for')
+    parser.add_argument('--limit', type=int, default=0,
+                        help='Only use the first N names (0 for all names)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Number of runs, the fastest one is reported')
+
+    args = parser.parse_args()
+    with open(args.input_file, 'r') as f:
+        names = [line.strip() for line in f if line.strip()]
+    if args.limit > 0:
+        names = names[:args.limit]
+
+    pairs, scalar_rates, batch_rate = benchmark(names, args.threshold, args.repeat)
+    print(f"Scored {pairs} candidate pairs of {len(names)} names")
+    for backend, scalar_rate in scalar_rates.items():
+        print(f"Scalar throughput ({backend}): {scalar_rate:,.0f} pairs/second")
+    print(f"Batched throughput: {batch_rate:,.0f} pairs/second")
+
+if __name__ == "__main__":
+    main()
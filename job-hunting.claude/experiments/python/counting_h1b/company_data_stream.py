@@ -0,0 +1,670 @@
+"""
+Company Data Stream
+
+This module reads the USCIS employer TSV files in chunks, keeping only the columns the
+matcher uses, so that memory does not grow with the number of fiscal years loaded.
+Chunks are reduced to one row per employer name as they are read (NameAggregates),
+and the counts of each canonical company are computed from those rows once the names
+are grouped.
+
+The encoding of each file is sniffed once from its byte order mark and a sample of its
+first bytes, and the file is then parsed a single time. USCIS exports are UTF-16, which
+takes twice the bytes of UTF-8 for their mostly ASCII content; with a cache folder, each
+file is transcoded once to a UTF-8 copy that later runs read instead.
+
+With pyarrow installed, the cache can instead keep a Parquet copy of each file, with
+integer counts and dictionary encoded employer, state and NAICS columns. Its rows are
+sorted by state, so the row group statistics let a query for a few states or years
+skip the other row groups entirely, and only the requested columns are read.
+
+Year and state filters are also applied while reading the TSV files: a line that does not
+contain a wanted state and year as tab-separated fields is dropped before being split or
+parsed, so a report on a single state only parses the few lines that may match.
+
+Usage:
+    from company_data_stream import NameAggregates, iter_chunks
+
+    aggregates = NameAggregates('Employer (Petitioner) Name')
+    for chunk in iter_chunks(['Employer Information.2023.tsv', 'Employer Information.2024.tsv'],
+                             cache_dir='Data/cache', cache_format=PARQUET_CACHE, state_filter='WA'):
+        aggregates.add(chunk)
+
+    company_names = aggregates.names()
+    aggregated = aggregates.by_canonical(company_map)
+"""
+
+import codecs
+import glob
+import itertools
+import os
+import re
+import shutil
+from io import StringIO
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+import numpy as np
+import pandas as pd
+import requests
+from company_naics_codes import naics_code_lists, naics_codes
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+EMPLOYER_NAME_COLUMN = 'Employer (Petitioner) Name'
+COUNT_COLUMNS = ['Initial Approval', 'Initial Denial', 'Continuing Approval', 'Continuing Denial']
+NAICS_COLUMN = 'Industry (NAICS) Code'
+
+# Columns used to filter, group and aggregate employers, besides the employer name column
+USED_COLUMNS = ['Fiscal Year', 'Petitioner State', NAICS_COLUMN] + COUNT_COLUMNS
+
+# Encodings announced by a byte order mark, longest marks first
+BOM_ENCODINGS = [
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+# Encoding of files that are neither UTF-16 nor UTF-8, which decodes any byte
+FALLBACK_ENCODING = 'latin1'
+
+# Bytes read from the start of a file to guess its encoding
+SAMPLE_SIZE = 64 * 1024
+
+# Rows read at once from each file
+DEFAULT_CHUNKSIZE = 100_000
+
+# Formats of the copies kept in a cache folder
+UTF8_CACHE = 'utf8'
+PARQUET_CACHE = 'parquet'
+CACHE_FORMATS = [UTF8_CACHE, PARQUET_CACHE]
+
+# Columns stored as dictionaries in Parquet copies, as few distinct values repeat a lot
+CATEGORICAL_COLUMNS = [EMPLOYER_NAME_COLUMN, 'Petitioner State', NAICS_COLUMN]
+
+# Column of Parquet copies keeping the position of each row in the source file
+ROW_COLUMN = '__row'
+
+# Rows per row group of Parquet copies, the unit read or skipped by filters
+ROW_GROUP_SIZE = 20_000
+
+# Version of the layout of Parquet copies, 2 keeps counts with thousands separators
+PARQUET_FORMAT = 2
+
+# Partial aggregates kept before merging them into one row per name
+COMPACT_ROWS = 1_000_000
+
+
+def is_url(path: str) -> bool:
+    """Check whether a source is a URL rather than a local path."""
+    try:
+        result = urlparse(path)
+        return all([result.scheme, result.netloc])
+    except:
+        return False
+
+
+def expand_sources(sources) -> List[str]:
+    """
+    List the files and URLs of sources, replacing folders by the TSV files they contain.
+
+    Args:
+        sources (str or list): Single file path/URL, folder path, or list of file paths/URLs
+
+    Returns:
+        list: File paths and URLs, in order
+    """
+    if isinstance(sources, str):
+        sources = [sources]
+
+    expanded = []
+    for source in sources:
+        if os.path.isdir(source):
+            files = sorted(glob.glob(os.path.join(source, "*.tsv")))
+            if not files:
+                print(f"Warning: No .tsv files found in directory: {source}")
+            expanded.extend(files)
+        else:
+            expanded.append(source)
+    return expanded
+
+
+def sniff_encoding(sample: bytes) -> str:
+    """
+    Guess the encoding of a file from its first bytes.
+
+    A byte order mark decides the encoding. Without one, text whose every other byte is
+    mostly NUL is UTF-16, text that decodes as UTF-8 is UTF-8, and anything else is
+    FALLBACK_ENCODING.
+
+    Args:
+        sample (bytes): First bytes of the file
+
+    Returns:
+        str: Name of the encoding
+    """
+    for bom, encoding in BOM_ENCODINGS:
+        if sample.startswith(bom):
+            return encoding
+
+    if sample:
+        # ASCII characters have a NUL high byte in UTF-16
+        if sample[1::2].count(0) > len(sample) // 4:
+            return 'utf-16-le'
+        if sample[0::2].count(0) > len(sample) // 4:
+            return 'utf-16-be'
+
+    try:
+        sample.decode('utf-8')
+    except UnicodeDecodeError as e:
+        # The sample may end in the middle of a character
+        if e.reason != 'unexpected end of data':
+            return FALLBACK_ENCODING
+    return 'utf-8'
+
+
+def detect_encoding(path: str) -> str:
+    """
+    Guess the encoding of a file from its first SAMPLE_SIZE bytes.
+
+    Args:
+        path (str): Path to the file
+
+    Returns:
+        str: Name of the encoding
+    """
+    with open(path, 'rb') as f:
+        return sniff_encoding(f.read(SAMPLE_SIZE))
+
+
+def _cached_copy_path(path: str, cache_dir: str, suffix: str) -> Tuple[str, bool]:
+    """Get the path of the copy of a file named after its size and modification time, and whether it exists."""
+    stat = os.stat(path)
+    name = os.path.basename(path)
+    copy_path = os.path.join(cache_dir, f"{name}.{stat.st_size}-{stat.st_mtime_ns}{suffix}")
+    if os.path.exists(copy_path):
+        return copy_path, True
+
+    # The file changed since its previous copies were made
+    os.makedirs(cache_dir, exist_ok=True)
+    for outdated in glob.glob(os.path.join(glob.escape(cache_dir), f"{glob.escape(name)}.*{suffix}")):
+        os.remove(outdated)
+    return copy_path, False
+
+
+def utf8_copy(path: str, cache_dir: str) -> str:
+    """
+    Get a UTF-8 copy of a file, transcoding it on first use.
+
+    Copies are named after the size and modification time of the file, so a changed
+    file is transcoded again, and its outdated copies are deleted.
+
+    Args:
+        path (str): Path to the file
+        cache_dir (str): Folder keeping the copies
+
+    Returns:
+        str: Path to the UTF-8 copy
+    """
+    copy_path, exists = _cached_copy_path(path, cache_dir, '.utf8.tsv')
+    if exists:
+        return copy_path
+
+    # Write next to the copy first, so an interrupted run leaves no partial copy
+    temp_path = f"{copy_path}.tmp"
+    with open(path, 'r', encoding=detect_encoding(path), newline='') as source, \
+            open(temp_path, 'w', encoding='utf-8', newline='') as copy:
+        shutil.copyfileobj(source, copy, 1024 * 1024)
+    os.replace(temp_path, copy_path)
+    return copy_path
+
+
+def _require_pyarrow():
+    if pq is None:
+        raise ImportError("Parquet copies need pyarrow, install it with: pip install pyarrow")
+
+
+def parquet_copy(path: str, cache_dir: str, row_group_size: int = ROW_GROUP_SIZE) -> str:
+    """
+    Get a Parquet copy of a file, converting it on first use.
+
+    Counts are stored as integers, invalid counts being 0, fiscal years as integers, the
+    CATEGORICAL_COLUMNS as dictionaries and the other columns as strings. Rows are sorted
+    by state, with their position in the file in ROW_COLUMN. Like UTF-8 copies, copies
+    are named after the size and modification time of the file.
+
+    Args:
+        path (str): Path to the file
+        cache_dir (str): Folder keeping the copies
+        row_group_size (int, optional): Rows per row group. Defaults to ROW_GROUP_SIZE.
+
+    Returns:
+        str: Path to the Parquet copy
+    """
+    _require_pyarrow()
+    copy_path, exists = _cached_copy_path(path, cache_dir, f'.v{PARQUET_FORMAT}.parquet')
+    if exists:
+        return copy_path
+
+    df = pd.read_csv(path, sep='\t', encoding=detect_encoding(path), dtype=str)
+    for column in df.columns:
+        if column in COUNT_COLUMNS:
+            df[column] = parse_counts(df[column])
+        elif column == 'Fiscal Year':
+            df[column] = pd.to_numeric(df[column], errors='coerce').astype('Int32')
+        elif column in CATEGORICAL_COLUMNS:
+            df[column] = df[column].astype('category')
+    df[ROW_COLUMN] = np.arange(len(df), dtype='int64')
+    if 'Petitioner State' in df:
+        df = df.sort_values('Petitioner State', kind='stable')
+
+    temp_path = f"{copy_path}.tmp"
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), temp_path, row_group_size=row_group_size)
+    os.replace(temp_path, copy_path)
+    return copy_path
+
+
+def _filter_values(year_filter=None, state_filter=None) -> Tuple[Optional[List[int]], Optional[List[str]]]:
+    """Get the fiscal years and states of filters as lists, None when not filtered."""
+    if year_filter is not None:
+        year_filter = [int(year_filter)] if isinstance(year_filter, (int, str)) else [int(year) for year in year_filter]
+    if state_filter is not None:
+        state_filter = [state_filter] if isinstance(state_filter, str) else list(state_filter)
+    return year_filter, state_filter
+
+
+def read_parquet(path: str, columns: Optional[Sequence[str]] = None, year_filter=None,
+                 state_filter=None) -> pd.DataFrame:
+    """
+    Read a Parquet copy, skipping the row groups of other years and states.
+
+    The file is memory-mapped, only the requested columns are read, and rows are returned
+    in the order of the source file.
+
+    Args:
+        path (str): Path to a Parquet copy, from parquet_copy
+        columns (Sequence[str], optional): Columns to read, the missing ones being ignored.
+            Defaults to None (all columns).
+        year_filter (int or list, optional): Fiscal year(s) to keep. Defaults to None (all years).
+        state_filter (str or list, optional): State(s) to keep. Defaults to None (all states).
+
+    Returns:
+        pandas.DataFrame: Rows of the copy, with categorical dictionary columns
+    """
+    _require_pyarrow()
+    names = [name for name in pq.read_schema(path).names if name != ROW_COLUMN]
+    if columns is not None:
+        names = [name for name in names if name in set(columns)]
+
+    year_filter, state_filter = _filter_values(year_filter, state_filter)
+    filters = []
+    if year_filter is not None:
+        filters.append(('Fiscal Year', 'in', year_filter))
+    if state_filter is not None:
+        filters.append(('Petitioner State', 'in', state_filter))
+
+    table = pq.read_table(path, columns=names + [ROW_COLUMN], filters=filters or None, memory_map=True)
+    df = table.to_pandas()
+    return df.sort_values(ROW_COLUMN).drop(columns=ROW_COLUMN).reset_index(drop=True)
+
+
+def local_source(path: str, cache_dir: Optional[str] = None) -> Tuple[str, str]:
+    """
+    Get the file to read for a local source and its encoding.
+
+    Args:
+        path (str): Path to the source file
+        cache_dir (str, optional): Folder keeping UTF-8 copies of the sources. Defaults to
+            None (read the source itself).
+
+    Returns:
+        tuple: Path to the file to read and its encoding
+    """
+    if cache_dir:
+        return utf8_copy(path, cache_dir), 'utf-8'
+    return path, detect_encoding(path)
+
+
+def parse_counts(values: pd.Series) -> pd.Series:
+    """
+    Convert a column of petition counts to integers.
+
+    Counts may use thousands separators, like "1,234". Counts that are still not integers
+    count as 0.
+
+    Args:
+        values (pandas.Series): Counts as read from a file
+
+    Returns:
+        pandas.Series: Counts as int64
+    """
+    values = values.astype('string').str.replace(',', '', regex=False)
+    return pd.to_numeric(values, errors='coerce').fillna(0).astype('int64')
+
+
+def apply_filters(df: pd.DataFrame, year_filter=None, state_filter=None) -> pd.DataFrame:
+    """
+    Keep the rows of the given fiscal years and states.
+
+    Args:
+        df (pandas.DataFrame): Company data
+        year_filter (int or list, optional): Fiscal year(s) to keep. Defaults to None (all years).
+        state_filter (str or list, optional): State(s) to keep. Defaults to None (all states).
+
+    Returns:
+        pandas.DataFrame: Filtered company data
+    """
+    year_filter, state_filter = _filter_values(year_filter, state_filter)
+    if year_filter is not None:
+        df = df[df['Fiscal Year'].astype(int).isin(year_filter)]
+
+    if state_filter is not None:
+        df = df[df['Petitioner State'].isin(state_filter)]
+
+    return df
+
+
+def _line_filter(headers: Sequence[str], year_filter=None, state_filter=None) -> Optional[Callable[[str], bool]]:
+    """
+    Build a check of whether a line may match filters, without splitting it.
+
+    A line may match if it contains one of the wanted values of each filtered column as a
+    whole field. Lines with quotes always may, as their fields cannot be found this way.
+
+    Args:
+        headers (Sequence[str]): Column names of the file
+        year_filter (int or list, optional): Fiscal year(s) to keep. Defaults to None (all years).
+        state_filter (str or list, optional): State(s) to keep. Defaults to None (all states).
+
+    Returns:
+        callable: Check of a line, None when nothing is filtered
+    """
+    year_filter, state_filter = _filter_values(year_filter, state_filter)
+    searches = []
+    for column, values in [('Fiscal Year', year_filter), ('Petitioner State', state_filter)]:
+        if values is None or column not in headers:
+            continue
+        index = list(headers).index(column)
+        before = '^' if index == 0 else '\t'
+        after = '(?:\t|\r?\n?$)' if index == len(headers) - 1 else '\t'
+        alternatives = '|'.join(re.escape(str(value)) for value in values)
+        searches.append(re.compile(f'{before}(?:{alternatives}){after}').search)
+    if not searches:
+        return None
+
+    def may_match(line: str) -> bool:
+        if '"' in line:
+            return True
+        for search in searches:
+            if search(line) is None:
+                return False
+        return True
+
+    return may_match
+
+
+class _FilteredLines:
+    """File-like reader of the header and the lines that may match filters, for pd.read_csv"""
+
+    def __init__(self, lines: Iterator[str], may_match: Callable[[str], bool]):
+        self._lines = lines
+        self._may_match = may_match
+        self._buffer = next(lines, '')
+        self._done = False
+
+    def read(self, size: int = -1) -> str:
+        parts = [self._buffer]
+        length = len(self._buffer)
+        while not self._done and (size < 0 or length < size):
+            line = next(self._lines, None)
+            if line is None:
+                self._done = True
+            elif self._may_match(line):
+                parts.append(line)
+                length += len(line)
+
+        text = ''.join(parts)
+        if size < 0:
+            self._buffer = ''
+            return text
+        self._buffer = text[size:]
+        return text[:size]
+
+
+def iter_chunks(sources, columns: Optional[Sequence[str]] = None,
+                employer_name_column: str = EMPLOYER_NAME_COLUMN,
+                chunksize: int = DEFAULT_CHUNKSIZE, cache_dir: Optional[str] = None,
+                cache_format: str = UTF8_CACHE, year_filter=None, state_filter=None) -> Iterator[pd.DataFrame]:
+    """
+    Read the rows of every source in chunks, keeping the rows of the given years and states.
+
+    Values are read as strings, and the approval and denial counts are converted to
+    integers, missing or invalid counts being 0. Lines that cannot match the filters are
+    skipped before being parsed. With Parquet copies, fiscal years are integers, and the
+    matching rows of each file are read at once before being split.
+
+    Args:
+        sources (str or list): Single file path/URL, folder path, or list of file paths/URLs
+        columns (Sequence[str], optional): Columns to keep. Defaults to the employer name
+            column and USED_COLUMNS.
+        employer_name_column (str, optional): Name of the column containing employer names.
+        chunksize (int, optional): Number of rows per chunk. Defaults to DEFAULT_CHUNKSIZE.
+        cache_dir (str, optional): Folder keeping copies of local sources. Defaults to None.
+        cache_format (str, optional): Format of the copies, 'utf8' or 'parquet'. Defaults to 'utf8'.
+        year_filter (int or list, optional): Fiscal year(s) to keep. Defaults to None (all years).
+        state_filter (str or list, optional): State(s) to keep. Defaults to None (all states).
+
+    Yields:
+        pandas.DataFrame: Chunk of rows, with only the requested columns
+    """
+    if columns is None:
+        columns = [employer_name_column] + USED_COLUMNS
+    columns = set(columns)
+
+    for source in expand_sources(sources):
+        if cache_dir and cache_format == PARQUET_CACHE and not is_url(source):
+            df = read_parquet(parquet_copy(source, cache_dir), columns, year_filter, state_filter)
+            for column in df.columns:
+                if isinstance(df[column].dtype, pd.CategoricalDtype):
+                    df[column] = df[column].astype(object)
+            for start in range(0, len(df), chunksize):
+                yield df.iloc[start:start + chunksize]
+            continue
+
+        if is_url(source):
+            response = requests.get(source)
+            response.raise_for_status()
+            f = StringIO(response.text)
+        else:
+            path, encoding = local_source(source, cache_dir)
+            f = open(path, 'r', encoding=encoding, newline='')
+
+        with f:
+            data = f
+            if year_filter is not None or state_filter is not None:
+                header = f.readline()
+                may_match = _line_filter(header.rstrip('\r\n').split('\t'), year_filter, state_filter)
+                if may_match is not None:
+                    data = _FilteredLines(itertools.chain([header], f), may_match)
+
+            reader = pd.read_csv(data, sep='\t', dtype=str, usecols=lambda column: column in columns,
+                                 chunksize=chunksize)
+            with reader:
+                for chunk in reader:
+                    for column in COUNT_COLUMNS:
+                        if column in chunk:
+                            chunk[column] = parse_counts(chunk[column])
+                    yield apply_filters(chunk, year_filter, state_filter)
+
+
+def iter_rows(sources, cache_dir: Optional[str] = None, year_filter=None, state_filter=None) -> Iterator[Dict[str, str]]:
+    """
+    Read the rows of every source one at a time, without pandas.
+
+    Lines that cannot match the filters are skipped before being split.
+
+    Args:
+        sources (str or list): Single file path/URL, folder path, or list of file paths/URLs
+        cache_dir (str, optional): Folder keeping UTF-8 copies of local sources. Defaults to None.
+        year_filter (int or list, optional): Fiscal year(s) to keep. Defaults to None (all years).
+        state_filter (str or list, optional): State(s) to keep. Defaults to None (all states).
+
+    Yields:
+        dict: Mapping from column name to value, for each row with every column
+    """
+    years, states = _filter_values(year_filter, state_filter)
+    headers = None
+    may_match = None
+    for source in expand_sources(sources):
+        if is_url(source):
+            response = requests.get(source)
+            response.raise_for_status()
+            lines = iter(response.text.split('\n'))
+            f = None
+        else:
+            path, encoding = local_source(source, cache_dir)
+            f = open(path, 'r', encoding=encoding)
+            lines = f
+
+        try:
+            for line in lines:
+                line = line.strip()
+                if not line:
+                    continue
+
+                # Cheap check before splitting, the fields are checked once split
+                if may_match is not None and not may_match(line):
+                    continue
+
+                fields = line.split('\t')
+
+                if headers is None:
+                    headers = fields
+                    may_match = _line_filter(headers, years, states)
+                    continue
+
+                if fields[0] == "Line by line":
+                    continue
+
+                if len(fields) != len(headers):
+                    continue
+
+                row = dict(zip(headers, fields))
+                if years is not None and int(row.get('Fiscal Year', 0)) not in years:
+                    continue
+                if states is not None and row.get('Petitioner State') not in states:
+                    continue
+                yield row
+        finally:
+            if f is not None:
+                f.close()
+
+
+class NameAggregates:
+    """Approval and denial counts and NAICS codes of each employer name, built chunk by chunk"""
+
+    def __init__(self, employer_name_column: str = EMPLOYER_NAME_COLUMN, compact_rows: int = COMPACT_ROWS):
+        """
+        Create empty aggregates.
+
+        Args:
+            employer_name_column (str, optional): Name of the column containing employer names.
+            compact_rows (int, optional): Number of partial rows kept before merging them.
+                Defaults to COMPACT_ROWS.
+        """
+        self.employer_name_column = employer_name_column
+        self.compact_rows = compact_rows
+        self.counts = pd.DataFrame(columns=COUNT_COLUMNS, dtype=int)
+        self.naics = pd.DataFrame(columns=[employer_name_column, NAICS_COLUMN], dtype=object)
+        self._pending_counts: List[pd.DataFrame] = []
+        self._pending_naics: List[pd.DataFrame] = []
+        self._pending_rows = 0
+
+    def add(self, chunk: pd.DataFrame):
+        """
+        Add the rows of a chunk, from iter_chunks.
+
+        Args:
+            chunk (pandas.DataFrame): Rows with the employer name, count and NAICS columns
+        """
+        name = self.employer_name_column
+        chunk = chunk[chunk[name].notna()]
+
+        # Names keep the order in which they are first seen
+        counts = chunk.groupby(name, sort=False)[COUNT_COLUMNS].sum()
+        naics = chunk[[name, NAICS_COLUMN]].dropna().drop_duplicates()
+        self._pending_counts.append(counts)
+        self._pending_naics.append(naics)
+        self._pending_rows += len(counts) + len(naics)
+        if self._pending_rows >= self.compact_rows:
+            self.compact()
+
+    def compact(self):
+        """Merge the partial aggregates of the chunks added so far into one row per name."""
+        if self._pending_counts:
+            counts = pd.concat([self.counts] + self._pending_counts)
+            self.counts = counts.groupby(level=0, sort=False).sum()
+            self.naics = pd.concat([self.naics] + self._pending_naics).drop_duplicates()
+        self._pending_counts = []
+        self._pending_naics = []
+        self._pending_rows = 0
+
+    def rename(self, mapping: Dict[str, str]):
+        """
+        Replace every name by its value in mapping, merging the names replaced by the same value.
+
+        Args:
+            mapping (dict): Mapping from each name to its new name, such as its normalized name
+        """
+        self.compact()
+        self.counts = self.counts.groupby(self.counts.index.map(mapping), sort=False).sum()
+        self.naics = self.naics.assign(**{
+            self.employer_name_column: self.naics[self.employer_name_column].map(mapping)
+        }).drop_duplicates()
+
+    def names(self) -> List[str]:
+        """Get the distinct names, in the order they were first seen."""
+        self.compact()
+        return self.counts.index.tolist()
+
+    def approvals(self) -> Dict[str, int]:
+        """Get the total approvals (Initial + Continuing) of each name."""
+        self.compact()
+        return (self.counts['Initial Approval'] + self.counts['Continuing Approval']).astype(int).to_dict()
+
+    def by_canonical(self, company_map: Dict[str, str], top_n: int = 0) -> pd.DataFrame:
+        """
+        Sum the counts of the names of each canonical company and collect its NAICS codes.
+
+        Args:
+            company_map (dict): Mapping from each name to its canonical name
+            top_n (int, optional): Only keep the companies with approvals that may be among the
+                top_n by total approvals, with every company tied with the last one, and only
+                collect their NAICS codes. Defaults to 0 (all companies).
+
+        Returns:
+            pandas.DataFrame: One row per canonical company, sorted by 'Canonical Company'
+        """
+        self.compact()
+        counts = self.counts.groupby(self.counts.index.map(company_map)).sum()
+        counts.index.name = 'Canonical Company'
+
+        if top_n > 0:
+            approvals = counts['Initial Approval'] + counts['Continuing Approval']
+            approvals = approvals[approvals > 0]
+            if len(approvals) > top_n:
+                counts = counts[approvals.reindex(counts.index, fill_value=0) >= approvals.nlargest(top_n).iloc[-1]]
+
+        naics = self.naics
+        canonical = naics[self.employer_name_column].map(company_map)
+        if top_n > 0:
+            kept = canonical.isin(counts.index)
+            naics, canonical = naics[kept], canonical[kept]
+        counts[NAICS_COLUMN] = naics_code_lists(canonical, naics_codes(naics[NAICS_COLUMN]), counts.index)
+        for column in COUNT_COLUMNS:
+            counts[column] = counts[column].astype(int)
+        return counts.reset_index()
@@ -0,0 +1,83 @@
+"""
+Company NAICS Codes
+
+This module extracts the NAICS codes of employers for whole pandas columns. USCIS files
+hold few distinct NAICS values ("54 - Professional, Scientific, and Technical Services"),
+so each distinct value is parsed once with .str.extract, and the codes are kept as a
+categorical column. The codes of each company are then collected as a bitmask over the
+categories, summed per company by pandas, and only the distinct bitmasks are turned back
+into sorted lists of codes.
+
+Usage:
+    from company_naics_codes import naics_code_lists, naics_codes
+
+    codes = naics_codes(df['Industry (NAICS) Code'])
+    codes_per_company = naics_code_lists(df['Canonical Company'], codes)
+"""
+
+from typing import Optional
+import numpy as np
+import pandas as pd
+
+# Numeric part of a NAICS value, such as "54" or "31-33", followed by its description
+NAICS_PATTERN = r"^(?:(\d\d(?:-\d\d)?) - .*)?$"
+
+# Most categories whose bitmasks fit an int64
+MAX_MASK_BITS = 62
+
+
+def naics_codes(values: pd.Series) -> pd.Series:
+    """
+    Extract the numeric part of NAICS values, parsing each distinct value once.
+
+    Args:
+        values (pd.Series): Raw NAICS values, possibly missing
+
+    Returns:
+        pd.Series: Categorical codes with sorted categories, missing when a value has no code
+    """
+    inverse, uniques = pd.factorize(values)
+
+    # Object dtype keeps Python regex semantics, string dtypes may use another engine
+    parsed = pd.Series(uniques, dtype=object).astype(str).astype(object).str.extract(NAICS_PATTERN, expand=False)
+    categories = sorted(parsed.dropna().unique())
+    unique_codes = pd.Categorical(parsed, categories=categories).codes
+
+    # Missing values have no code, like values that do not match
+    codes = np.where(inverse >= 0, unique_codes[inverse], -1)
+    return pd.Series(pd.Categorical.from_codes(codes, categories=categories), index=values.index, name=values.name)
+
+
+def naics_code_lists(keys: pd.Series, codes: pd.Series, index: Optional[pd.Index] = None) -> pd.Series:
+    """
+    Collect the sorted distinct NAICS codes of each key.
+
+    Args:
+        keys (pd.Series): Key of each row, such as its canonical company
+        codes (pd.Series): Categorical NAICS code of each row, from naics_codes
+        index (pd.Index, optional): Keys to return, with an empty list for keys without codes.
+            Defaults to None (the keys with at least one code, sorted).
+
+    Returns:
+        pd.Series: Sorted list of codes of each key
+    """
+    categories = codes.cat.categories
+    pairs = pd.DataFrame({'key': keys.to_numpy(), 'code': codes.cat.codes.to_numpy()})
+    pairs = pairs[pairs['code'] >= 0].drop_duplicates()
+
+    if len(categories) > MAX_MASK_BITS:
+        pairs = pairs.sort_values('code')
+        code_lists = pairs.groupby('key')['code'].agg(lambda c: [categories[i] for i in c]).rename(None)
+    else:
+        # Pairs are distinct, so the sum of the bits of a key is their union
+        masks = (np.int64(1) << pairs['code'].astype('int64')).groupby(pairs['key']).sum()
+        lists = {
+            mask: [code for i, code in enumerate(categories) if mask >> i & 1]
+            for mask in masks.unique().tolist()
+        }
+        code_lists = pd.Series([lists[mask] for mask in masks.tolist()], index=masks.index, dtype=object)
+
+    if index is None:
+        return code_lists
+    return pd.Series([found if isinstance(found, list) else [] for found in code_lists.reindex(index).tolist()],
+                     index=index, dtype=object)
@@ -8,7 +8,7 @@ common words, and other metrics that can be used to improve company name matchin
 from collections import defaultdict, Counter
 import re
 from typing import Dict, List, Set
-from company_name_normalizer import normalize_company_name
+from company_name_cache import normalize_many
 
 def analyze_company_name_patterns(file_path: str, min_word_freq: int = 5, min_acronym_length: int = 2) -> Dict:
     """
@@ -29,8 +29,7 @@ def analyze_company_name_patterns(file_path: str, min_word_freq: int = 5, min_ac
 
     # Normalize all names and create a mapping from normalized to original names
     normalized_to_original = {}
-    for name in raw_names:
-        norm_name = normalize_company_name(name)
+    for name, norm_name in zip(raw_names, normalize_many(raw_names)):
         if norm_name:  # Only include non-empty normalized names
             if norm_name not in normalized_to_original:
                 normalized_to_original[norm_name] = []
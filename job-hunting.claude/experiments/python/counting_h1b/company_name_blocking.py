@@ -0,0 +1,427 @@
+"""
+Company Name Blocking
+
+This module provides the candidate generation stage for company name matching.
+Instead of comparing every name with every later name, names are indexed by the
+non-common tokens that calculate_similarity scores on, and only pairs that can still
+reach the similarity threshold are sent to the scorer.
+
+A pair can only score above zero when the names are equal after normalization, belong
+to the same corporate family, or share at least one non-common token, so the token
+index never drops a matching pair. Since the longest common substring ratio is at most
+1, a pair also needs a minimum number of shared tokens to reach the threshold, which
+lets the index only look up the rarest tokens of each name (prefix filtering).
+Candidates are then pruned with upper bounds of the score (the longest common substring
+cannot be longer than the shorter name) and with character n-gram blocking: when the
+threshold requires a common substring of at least k characters, both names must share
+at least k - n + 1 of their n-grams.
+
+Usage:
+    from company_name_blocking import CompanyNameIndex, group_similar_names
+
+    # Group names the same way the pairwise loop does, but only scoring candidates
+    groups = group_similar_names(company_names, threshold=0.85)
+
+    # Get the candidates of a single name
+    index = CompanyNameIndex(company_names)
+    candidates = index.candidates(0, threshold=0.85)
+"""
+
+import math
+from bisect import bisect_right
+from collections import Counter, defaultdict
+from typing import Callable, Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
+from company_name_cache import normalize_many
+from company_name_similarity import (
+    FAST_LCS,
+    LCS_WEIGHT,
+    MIN_SINGLE_WORD_LCS_RATIO,
+    UNIQUE_WORD_WEIGHT,
+    NormalizedName,
+    get_lcs_backend,
+    score_normalized,
+    tokenize_name,
+)
+from company_name_similarity_batch import NameMatrix
+
+# Highest score calculate_similarity can return
+MAX_SIMILARITY = 1.0
+
+# Size of the character n-grams used for blocking
+NGRAM_SIZE = 3
+
+# Slack for floating point rounding when comparing score bounds with the threshold
+SCORE_EPSILON = 1e-9
+
+
+def character_ngrams(name: str, n: int = NGRAM_SIZE) -> FrozenSet[Tuple[str, int]]:
+    """
+    Get the character n-grams of a name, numbering repeated n-grams.
+
+    Numbering each occurrence makes the size of the intersection of two of these sets
+    the number of n-grams the names have in common, counting repetitions.
+
+    Args:
+        name (str): Normalized company name
+        n (int, optional): Size of the n-grams. Defaults to NGRAM_SIZE.
+
+    Returns:
+        frozenset: Set of (n-gram, occurrence) tuples
+    """
+    occurrences = Counter()
+    grams = []
+    for i in range(len(name) - n + 1):
+        gram = name[i:i + n]
+        occurrences[gram] += 1
+        grams.append((gram, occurrences[gram]))
+    return frozenset(grams)
+
+
+def min_matching_words(threshold: float, min_token_count: int) -> int:
+    """
+    Get the number of shared non-common tokens a pair needs to reach the threshold.
+
+    Args:
+        threshold (float): Minimum similarity score for a match
+        min_token_count (int): Number of tokens of the name with fewer tokens
+
+    Returns:
+        int: Minimum number of matching unique words, at least 1
+    """
+    required = (threshold - LCS_WEIGHT) / UNIQUE_WORD_WEIGHT * min_token_count
+    return max(1, math.ceil(required - SCORE_EPSILON))
+
+
+class CompanyNameIndex:
+    """Inverted index of company names used to generate candidate pairs for scoring"""
+
+    def __init__(self, names: Sequence[str], normalized: Optional[Sequence[str]] = None):
+        """
+        Build the index.
+
+        Args:
+            names (Sequence[str]): Company names, in the order they are grouped
+            normalized (Sequence[str], optional): Normalized form of each name. Defaults to
+                normalizing the names.
+        """
+        self.names = list(names)
+        if normalized is None:
+            normalized = normalize_many(self.names)
+        self.normalized = list(normalized)
+        self.tokenized: List[NormalizedName] = [tokenize_name(norm) for norm in self.normalized]
+
+        self.token_counts = []
+        self.unique_words = []
+        self.lengths = []
+        self._ngrams: Dict[int, FrozenSet[Tuple[str, int]]] = {}
+        self._prefixes: Dict[float, Tuple[List[int], Dict[str, List[int]]]] = {}
+        self._matrix: Optional[NameMatrix] = None
+
+        # Posting lists are filled in index order, so they are sorted
+        self.postings: Dict[str, List[int]] = defaultdict(list)
+        self.exact: Dict[str, List[int]] = defaultdict(list)
+        self.families: Dict[str, List[int]] = defaultdict(list)
+
+        for i, (norm, tokens, unique_words, family) in enumerate(self.tokenized):
+            self.token_counts.append(len(tokens))
+            self.unique_words.append(unique_words)
+            self.lengths.append(len(norm))
+
+            if not norm:
+                continue
+
+            self.exact[norm].append(i)
+            if family:
+                self.families[family].append(i)
+            for word in unique_words:
+                self.postings[word].append(i)
+
+        # Rarest words first, so prefixes point to the shortest posting lists
+        def rarity(word):
+            return len(self.postings[word]), word
+        self.ordered_words = [sorted(words, key=rarity) for words in self.unique_words]
+
+    def __len__(self):
+        return len(self.names)
+
+    def ngrams(self, i: int) -> FrozenSet[Tuple[str, int]]:
+        """Get the character n-grams of the i-th normalized name, computing them once."""
+        grams = self._ngrams.get(i)
+        if grams is None:
+            grams = self._ngrams[i] = character_ngrams(self.normalized[i])
+        return grams
+
+    def score(self, i: int, j: int, similarity: Optional[Callable[[str, str], float]] = None) -> float:
+        """
+        Score the i-th and j-th names.
+
+        Args:
+            i (int): Position of the first name
+            j (int): Position of the second name
+            similarity (callable, optional): Pairwise scorer of raw names. Defaults to
+                scoring the tokenized names, without normalizing them again.
+
+        Returns:
+            float: Similarity score of the pair
+        """
+        if similarity is None:
+            return score_normalized(self.tokenized[i], self.tokenized[j])
+        return similarity(self.names[i], self.names[j])
+
+    def score_pairs(self, left: Sequence[int], right: Sequence[int]) -> List[float]:
+        """
+        Score many pairs of names at once, with the NumPy kernel of NameMatrix.
+
+        The kernel computes the lengths of the fast backend, so with another longest common
+        substring backend, each pair is scored with it instead.
+
+        Args:
+            left (Sequence[int]): Position of the first name of each pair
+            right (Sequence[int]): Position of the second name of each pair
+
+        Returns:
+            list: Similarity score of each pair, as score would compute it
+        """
+        if get_lcs_backend() != FAST_LCS:
+            return [self.score(i, j) for i, j in zip(left, right)]
+        if self._matrix is None:
+            self._matrix = NameMatrix(self.tokenized)
+        return self._matrix.score_pairs(left, right).tolist()
+
+    def _later(self, posting: List[int], i: int) -> List[int]:
+        """Get the entries of a posting list that come after the i-th name."""
+        return posting[bisect_right(posting, i):]
+
+    def _prefix_index(self, threshold: float) -> Tuple[List[int], Dict[str, List[int]]]:
+        """
+        Get the prefix length of every name and the posting lists of prefix words.
+
+        A pair sharing at least c words of a name shares one of its first k - c + 1 words,
+        where k is its number of unique words and c is computed from its own token count.
+        """
+        if threshold not in self._prefixes:
+            prefix_lengths = []
+            prefix_postings = defaultdict(list)
+            for i, words in enumerate(self.ordered_words):
+                length = len(words) - min_matching_words(threshold, self.token_counts[i]) + 1
+                prefix_lengths.append(length)
+                for word in words[:max(length, 0)]:
+                    prefix_postings[word].append(i)
+            self._prefixes[threshold] = (prefix_lengths, prefix_postings)
+        return self._prefixes[threshold]
+
+    def candidates(self, i: int, threshold: float, skip: Optional[Set[int]] = None) -> List[int]:
+        """
+        Get the later names that can reach the threshold when compared with the i-th name.
+
+        Args:
+            i (int): Position of the name in the index
+            threshold (float): Minimum similarity score for a match
+            skip (set, optional): Positions that should not be returned. Defaults to None.
+
+        Returns:
+            list: Sorted positions j > i that must be scored against the i-th name
+        """
+        # Every score reaches a threshold of zero, and none reaches one above the maximum
+        if threshold <= 0:
+            return [j for j in range(i + 1, len(self.names)) if not (skip and j in skip)]
+        norm = self.normalized[i]
+        if not norm or threshold > MAX_SIMILARITY + SCORE_EPSILON:
+            return []
+
+        # Names equal after normalization or in the same corporate family always score 1.0
+        selected = set(self._later(self.exact[norm], i))
+        family = self.tokenized[i].family
+        if family:
+            selected.update(self._later(self.families[family], i))
+
+        prefix_lengths, prefix_postings = self._prefix_index(threshold)
+        token_count = self.token_counts[i]
+        found = set()
+
+        # Names with at least as many tokens share a word of this name's prefix
+        for word in self.ordered_words[i][:max(prefix_lengths[i], 0)]:
+            found.update(j for j in self._later(self.postings[word], i)
+                         if self.token_counts[j] >= token_count)
+
+        # Names with fewer tokens share a word of their own prefix
+        for word in self.unique_words[i]:
+            found.update(j for j in self._later(prefix_postings.get(word, []), i)
+                         if self.token_counts[j] < token_count)
+
+        found.difference_update(selected)
+        if skip:
+            found.difference_update(skip)
+
+        unique_words = self.unique_words[i]
+        for j in found:
+            num_matching = len(unique_words & self.unique_words[j])
+            if self._can_reach(i, j, num_matching, threshold):
+                selected.add(j)
+
+        if skip:
+            selected.difference_update(skip)
+        return sorted(selected)
+
+    def query(self, name: NormalizedName, threshold: float) -> List[int]:
+        """
+        Get the indexed names that can reach the threshold when compared with another name.
+
+        Candidates are generated like in candidates, but for a name that is not in the index,
+        such as a name looked up against the names of a previous run, and at any position.
+
+        Args:
+            name (NormalizedName): Name to compare, from tokenize_name
+            threshold (float): Minimum similarity score for a match
+
+        Returns:
+            list: Sorted positions of the indexed names that must be scored against the name
+        """
+        if threshold <= 0:
+            return list(range(len(self.names)))
+        if not name.norm or threshold > MAX_SIMILARITY + SCORE_EPSILON:
+            return []
+
+        # Names equal after normalization or in the same corporate family always score 1.0
+        selected = set(self.exact.get(name.norm, ()))
+        if name.family:
+            selected.update(self.families.get(name.family, ()))
+
+        _, prefix_postings = self._prefix_index(threshold)
+        token_count = len(name.tokens)
+        ordered_words = sorted(name.unique_words, key=lambda word: (len(self.postings.get(word, ())), word))
+        prefix_length = len(ordered_words) - min_matching_words(threshold, token_count) + 1
+        found = set()
+
+        # Names with at least as many tokens share a word of this name's prefix
+        for word in ordered_words[:max(prefix_length, 0)]:
+            found.update(j for j in self.postings.get(word, ()) if self.token_counts[j] >= token_count)
+
+        # Names with fewer tokens share a word of their own prefix
+        for word in ordered_words:
+            found.update(j for j in prefix_postings.get(word, ()) if self.token_counts[j] < token_count)
+
+        found.difference_update(selected)
+        if found:
+            grams = character_ngrams(name.norm)
+            for j in found:
+                num_matching = len(name.unique_words & self.unique_words[j])
+                if self._bound_reaches(len(name.norm), token_count, lambda: grams, j, num_matching, threshold):
+                    selected.add(j)
+        return sorted(selected)
+
+    def _can_reach(self, i: int, j: int, num_matching: int, threshold: float) -> bool:
+        """
+        Check whether a pair sharing num_matching non-common tokens can reach the threshold.
+
+        The word ratio is known exactly from the token counts, so only the longest common
+        substring is bounded: by the length of the shorter name, and then by the n-grams
+        both names must share to contain a common substring of the required length.
+        """
+        return self._bound_reaches(self.lengths[i], self.token_counts[i], lambda: self.ngrams(i), j,
+                                   num_matching, threshold)
+
+    def _bound_reaches(self, length: int, token_count: int, ngrams: Callable[[], FrozenSet[Tuple[str, int]]],
+                       j: int, num_matching: int, threshold: float) -> bool:
+        """Check _can_reach for a name given by its length, token count and n-grams, and the j-th name."""
+        len_i, len_j = length, self.lengths[j]
+        shorter, longer = (len_i, len_j) if len_i < len_j else (len_j, len_i)
+        token_count = token_count if token_count < self.token_counts[j] else self.token_counts[j]
+
+        unique_word_ratio = num_matching / token_count
+
+        # Smallest lcs ratio that still reaches the threshold
+        min_lcs_ratio = (threshold - UNIQUE_WORD_WEIGHT * unique_word_ratio) / LCS_WEIGHT
+        if num_matching < 2 and min_lcs_ratio < MIN_SINGLE_WORD_LCS_RATIO:
+            min_lcs_ratio = MIN_SINGLE_WORD_LCS_RATIO
+
+        if min_lcs_ratio <= SCORE_EPSILON:
+            return True
+        if shorter / longer < min_lcs_ratio - SCORE_EPSILON:
+            return False
+
+        # A common substring of min_length characters contains min_length - n + 1 n-grams
+        min_length = math.ceil(min_lcs_ratio * longer - SCORE_EPSILON)
+        min_shared_ngrams = min_length - NGRAM_SIZE + 1
+        if min_shared_ngrams <= 0:
+            return True
+        return len(ngrams() & self.ngrams(j)) >= min_shared_ngrams
+
+
+def group_similar_names(company_names: Sequence[str], threshold: float,
+                        similarity: Optional[Callable[[str, str], float]] = None,
+                        index: Optional[CompanyNameIndex] = None) -> List[Tuple[str, List[str]]]:
+    """
+    Group similar company names, using the first name of each group as its canonical name.
+
+    Each name, in order, starts a group unless it already joined one, and every later name
+    not yet grouped joins it when their similarity reaches the threshold. This gives the
+    same groups as comparing every pair, but only the candidates of the index are scored.
+
+    Args:
+        company_names (Sequence[str]): Company names to group
+        threshold (float): Minimum similarity score to consider companies as matches
+        similarity (callable, optional): Pairwise scorer of raw names. Defaults to scoring
+            the names tokenized by the index, which is what calculate_similarity computes.
+        index (CompanyNameIndex, optional): Index of company_names. Defaults to building one.
+
+    Returns:
+        list: List of (canonical name, group) tuples, including single name groups
+    """
+    if index is None:
+        # Repeated names never start or join a group of their own
+        index = CompanyNameIndex(list(dict.fromkeys(company_names)))
+
+    company_groups = []
+    processed = set()
+
+    for i, name1 in enumerate(index.names):
+        if i in processed:
+            continue
+
+        # Create a new group with this company
+        group = [name1]
+        processed.add(i)
+
+        # Find similar companies among the candidates
+        for j in index.candidates(i, threshold, skip=processed):
+            name2 = index.names[j]
+            if index.score(i, j, similarity) >= threshold:
+                group.append(name2)
+                processed.add(j)
+
+        company_groups.append((name1, group))
+
+    return company_groups
+
+
+def find_similar_pairs(company_names: Sequence[str], threshold: float,
+                       similarity: Optional[Callable[[str, str], float]] = None,
+                       index: Optional[CompanyNameIndex] = None) -> List[Tuple[str, str, float]]:
+    """
+    Find every pair of company names whose similarity reaches the threshold.
+
+    Args:
+        company_names (Sequence[str]): Company names to compare
+        threshold (float): Minimum similarity score to consider companies as matches
+        similarity (callable, optional): Pairwise scorer of raw names. Defaults to scoring
+            the names tokenized by the index, which is what calculate_similarity computes.
+        index (CompanyNameIndex, optional): Index of company_names. Defaults to building one.
+
+    Returns:
+        list: List of tuples (name1, name2, similarity), in pair order
+    """
+    if index is None:
+        index = CompanyNameIndex(company_names)
+
+    pairs = [(i, j) for i in range(len(index)) for j in index.candidates(i, threshold)]
+    if similarity is None:
+        scores = index.score_pairs([i for i, _ in pairs], [j for _, j in pairs])
+    else:
+        scores = [index.score(i, j, similarity) for i, j in pairs]
+
+    similar_pairs = []
+    for (i, j), score in zip(pairs, scores):
+        if score >= threshold:
+            similar_pairs.append((index.names[i], index.names[j], score))
+    return similar_pairs
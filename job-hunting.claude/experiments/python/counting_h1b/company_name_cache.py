@@ -0,0 +1,140 @@
+"""
+Company Name Cache
+
+This module provides a memoized layer over company_name_normalizer. Each distinct raw
+company name goes through the regex pipeline once per process, no matter how many rows
+repeat it or how many pairs it is compared in.
+
+Usage:
+    from company_name_cache import normalize_cached, normalize_distinct, cache_info
+
+    # Normalize a single name, reusing the result of earlier calls
+    normalized = normalize_cached("ACME Corp. LLC")
+
+    # Pre-normalize a whole column, getting a mapping from raw to normalized name
+    mapping = normalize_distinct(df['Employer (Petitioner) Name'].dropna().unique())
+
+    # Check how effective the cache was
+    print(cache_info())
+"""
+
+from collections import OrderedDict, namedtuple
+from typing import Callable, Dict, Iterable, List
+from company_name_normalizer import normalize_company_name
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+# Large enough to hold every distinct employer of all fiscal years at once
+DEFAULT_MAXSIZE = 1_000_000
+
+
+class NormalizationCache:
+    """Bounded LRU cache from raw company names to normalized names"""
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE,
+                 normalizer: Callable[[str], str] = normalize_company_name):
+        """
+        Create an empty cache.
+
+        Args:
+            maxsize (int, optional): Maximum number of names kept. Defaults to DEFAULT_MAXSIZE.
+            normalizer (callable, optional): Function computing the normalized name.
+                Defaults to normalize_company_name.
+        """
+        self.maxsize = maxsize
+        self.normalizer = normalizer
+        self.hits = 0
+        self.misses = 0
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+
+    def __len__(self):
+        return len(self._cache)
+
+    def __contains__(self, name):
+        return name in self._cache
+
+    def normalize(self, name: str) -> str:
+        """
+        Normalize a company name, computing it only if it is not cached yet.
+
+        Args:
+            name (str): Raw company name
+
+        Returns:
+            str: Normalized company name
+        """
+        try:
+            normalized = self._cache[name]
+        except KeyError:
+            self.misses += 1
+            normalized = self._cache[name] = self.normalizer(name)
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+            return normalized
+
+        self.hits += 1
+        self._cache.move_to_end(name)
+        return normalized
+
+    def normalize_many(self, names: Iterable[str]) -> List[str]:
+        """
+        Normalize a sequence of company names, keeping their order and repetitions.
+
+        Args:
+            names (Iterable[str]): Raw company names
+
+        Returns:
+            list: Normalized name of each input name
+        """
+        return [self.normalize(name) for name in names]
+
+    def normalize_distinct(self, names: Iterable[str]) -> Dict[str, str]:
+        """
+        Normalize every distinct name of a column in bulk.
+
+        Args:
+            names (Iterable[str]): Raw company names, possibly repeated
+
+        Returns:
+            dict: Mapping from each distinct raw name to its normalized name
+        """
+        return {name: self.normalize(name) for name in dict.fromkeys(names)}
+
+    def cache_info(self) -> CacheInfo:
+        """Get the hit and miss counters and the size of the cache."""
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._cache))
+
+    def clear(self):
+        """Remove every cached name and reset the counters."""
+        self._cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+# Cache shared by the matcher, the analyzer and the scripts of this package
+_default_cache = NormalizationCache()
+
+
+def get_default_cache() -> NormalizationCache:
+    """Get the cache shared by every module in the process."""
+    return _default_cache
+
+
+def normalize_cached(name: str) -> str:
+    """Normalize a company name using the shared cache."""
+    return _default_cache.normalize(name)
+
+
+def normalize_many(names: Iterable[str]) -> List[str]:
+    """Normalize a sequence of company names using the shared cache."""
+    return _default_cache.normalize_many(names)
+
+
+def normalize_distinct(names: Iterable[str]) -> Dict[str, str]:
+    """Normalize every distinct name of a column using the shared cache."""
+    return _default_cache.normalize_distinct(names)
+
+
+def cache_info() -> CacheInfo:
+    """Get the hit and miss counters of the shared cache."""
+    return _default_cache.cache_info()
@@ -0,0 +1,276 @@
+"""
+Company Name Clustering
+
+This module turns scored pairs of company names into groups. The pairs are scored once,
+down to a minimum threshold, and kept as a similarity graph: regrouping at any higher
+threshold, or with another linkage or canonical name rule, only filters the edges.
+
+Linkage policies:
+    center: each name, in order, starts a group unless it already joined one, and the
+        later names not yet grouped that match it join the group. This is the grouping
+        of group_similar_names.
+    single: names are grouped with every name they are transitively similar to, using a
+        union-find structure over the edges. Groups do not depend on the order of names.
+
+Canonical name rules:
+    first: the first name of the group, in input order
+    shortest: the shortest name, ties broken alphabetically
+    approvals: the name with the most approvals, ties broken like shortest
+
+Usage:
+    from company_name_clustering import SimilarityGraph
+
+    graph = SimilarityGraph.from_index(CompanyNameIndex(company_names), threshold=0.7)
+    groups = graph.groups(0.85, linkage='single', canonical='approvals', approvals=approvals)
+"""
+
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+from company_name_blocking import CompanyNameIndex
+
+CENTER_LINKAGE = 'center'
+SINGLE_LINKAGE = 'single'
+LINKAGES = [CENTER_LINKAGE, SINGLE_LINKAGE]
+
+FIRST_NAME = 'first'
+SHORTEST_NAME = 'shortest'
+MOST_APPROVALS = 'approvals'
+CANONICAL_RULES = [FIRST_NAME, SHORTEST_NAME, MOST_APPROVALS]
+
+# Later names matching a name, with their score
+Matches = Dict[int, List[Tuple[int, float]]]
+
+
+class UnionFind:
+    """Disjoint sets of the integers 0 to size - 1, with path compression and union by size"""
+
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+        self.size = [1] * size
+
+    def __len__(self):
+        return len(self.parent)
+
+    def find(self, x: int) -> int:
+        """Get the representative of the set containing x."""
+        root = x
+        while self.parent[root] != root:
+            root = self.parent[root]
+        # Point every element of the path directly to the root
+        while self.parent[x] != root:
+            self.parent[x], x = root, self.parent[x]
+        return root
+
+    def union(self, x: int, y: int) -> int:
+        """Merge the sets containing x and y, returning the representative of the merged set."""
+        root_x, root_y = self.find(x), self.find(y)
+        if root_x == root_y:
+            return root_x
+        if self.size[root_x] < self.size[root_y]:
+            root_x, root_y = root_y, root_x
+        self.parent[root_y] = root_x
+        self.size[root_x] += self.size[root_y]
+        return root_x
+
+    def sets(self) -> List[List[int]]:
+        """Get every set, each one sorted, ordered by their smallest element."""
+        members = defaultdict(list)
+        for x in range(len(self.parent)):
+            members[self.find(x)].append(x)
+        return list(members.values())
+
+
+def match_range(index: CompanyNameIndex, start: int, stop: int, threshold: float,
+                first_new: int = 0) -> List[Tuple[int, List[Tuple[int, float]]]]:
+    """
+    Score each name of a range of positions against its candidates.
+
+    Args:
+        index (CompanyNameIndex): Index of the names
+        start (int): First position of the range
+        stop (int): Position after the last one of the range
+        threshold (float): Minimum similarity score for a match
+        first_new (int, optional): Only pairs with at least one name at or after this
+            position are scored, the pairs of earlier names being already known.
+            Defaults to 0.
+
+    Returns:
+        list: (position, [(later position, score)]) tuples, for the positions with at
+            least one match
+    """
+    left = []
+    right = []
+    for i in range(start, stop):
+        candidates = index.candidates(i, threshold)
+        if i < first_new:
+            candidates = candidates[bisect_left(candidates, first_new):]
+        left.extend([i] * len(candidates))
+        right.extend(candidates)
+
+    # Every candidate of the range is scored in one batch
+    matching = defaultdict(list)
+    for i, j, score in zip(left, right, index.score_pairs(left, right)):
+        if score >= threshold:
+            matching[i].append((j, score))
+    return list(matching.items())
+
+
+def choose_canonical(group: Sequence[str], rule: str = FIRST_NAME,
+                     approvals: Optional[Mapping[str, int]] = None) -> str:
+    """
+    Choose the canonical name of a group.
+
+    Args:
+        group (Sequence[str]): Names of the group, in input order
+        rule (str, optional): One of CANONICAL_RULES. Defaults to FIRST_NAME.
+        approvals (Mapping[str, int], optional): Number of approvals of each name, used
+            by MOST_APPROVALS. Missing names count as 0.
+
+    Returns:
+        str: Canonical name of the group
+    """
+    if rule == FIRST_NAME:
+        return group[0]
+    if rule == SHORTEST_NAME:
+        return min(group, key=lambda name: (len(name), name))
+    if rule == MOST_APPROVALS:
+        approvals = approvals or {}
+        return min(group, key=lambda name: (-approvals.get(name, 0), len(name), name))
+    raise ValueError(f"Unknown canonical name rule: {rule}")
+
+
+def canonical_name_map(company_groups: Iterable[Tuple[str, Sequence[str]]]) -> Dict[str, str]:
+    """
+    Map each name of a grouping to the canonical name of its group.
+
+    Args:
+        company_groups (Iterable): (canonical name, group) tuples
+
+    Returns:
+        dict: Mapping from each grouped name to its canonical name
+    """
+    return {name: canonical for canonical, group in company_groups for name in group}
+
+
+class SimilarityGraph:
+    """Names and the pairs of them that reach a minimum similarity threshold, with their scores"""
+
+    def __init__(self, names: Sequence[str], matches: Matches, min_threshold: float):
+        """
+        Create the graph from already scored pairs.
+
+        Args:
+            names (Sequence[str]): Distinct company names, in input order
+            matches (dict): Mapping from positions to the (later position, score) tuples
+                of the names they match, sorted by position
+            min_threshold (float): Threshold the pairs were scored with. Every pair
+                scoring at least this much must be in matches.
+        """
+        self.names = list(names)
+        self.matches = matches
+        self.min_threshold = min_threshold
+
+    @classmethod
+    def from_index(cls, index: CompanyNameIndex, threshold: float) -> 'SimilarityGraph':
+        """
+        Score the candidate pairs of an index in this process.
+
+        Args:
+            index (CompanyNameIndex): Index of distinct company names
+            threshold (float): Minimum similarity score of the pairs kept
+
+        Returns:
+            SimilarityGraph: Graph of the pairs reaching the threshold
+        """
+        return cls(index.names, dict(match_range(index, 0, len(index), threshold)), threshold)
+
+    def __len__(self):
+        return len(self.names)
+
+    def edge_count(self) -> int:
+        """Get the number of scored pairs kept in the graph."""
+        return sum(len(matching) for matching in self.matches.values())
+
+    def _check_threshold(self, threshold: Optional[float]) -> float:
+        if threshold is None:
+            return self.min_threshold
+        if threshold < self.min_threshold:
+            raise ValueError(f"Threshold {threshold} is below the threshold the pairs were "
+                             f"scored with ({self.min_threshold})")
+        return threshold
+
+    def edges(self, threshold: Optional[float] = None) -> Iterable[Tuple[int, int, float]]:
+        """
+        Get the pairs reaching a threshold, in pair order.
+
+        Args:
+            threshold (float, optional): Minimum score. Defaults to min_threshold.
+
+        Returns:
+            iterable: (position, later position, score) tuples
+        """
+        threshold = self._check_threshold(threshold)
+        for i in sorted(self.matches):
+            for j, score in self.matches[i]:
+                if score >= threshold:
+                    yield i, j, score
+
+    def clusters(self, threshold: Optional[float] = None,
+                 linkage: str = CENTER_LINKAGE) -> List[List[int]]:
+        """
+        Group the positions of the names, without scoring any pair again.
+
+        Args:
+            threshold (float, optional): Minimum score of a match. Defaults to min_threshold.
+            linkage (str, optional): One of LINKAGES. Defaults to CENTER_LINKAGE.
+
+        Returns:
+            list: Sorted positions of each group, including single name groups, ordered by
+                their first position
+        """
+        threshold = self._check_threshold(threshold)
+
+        if linkage == SINGLE_LINKAGE:
+            sets = UnionFind(len(self.names))
+            for i, j, _ in self.edges(threshold):
+                sets.union(i, j)
+            return sets.sets()
+
+        if linkage == CENTER_LINKAGE:
+            clusters = []
+            processed = set()
+            for i in range(len(self.names)):
+                if i in processed:
+                    continue
+                cluster = [i]
+                processed.add(i)
+                for j, score in self.matches.get(i, ()):
+                    if j not in processed and score >= threshold:
+                        cluster.append(j)
+                        processed.add(j)
+                clusters.append(cluster)
+            return clusters
+
+        raise ValueError(f"Unknown linkage: {linkage}")
+
+    def groups(self, threshold: Optional[float] = None, linkage: str = CENTER_LINKAGE,
+               canonical: str = FIRST_NAME,
+               approvals: Optional[Mapping[str, int]] = None) -> List[Tuple[str, List[str]]]:
+        """
+        Group the names, choosing a canonical name for each group.
+
+        Args:
+            threshold (float, optional): Minimum score of a match. Defaults to min_threshold.
+            linkage (str, optional): One of LINKAGES. Defaults to CENTER_LINKAGE.
+            canonical (str, optional): One of CANONICAL_RULES. Defaults to FIRST_NAME.
+            approvals (Mapping[str, int], optional): Number of approvals of each name.
+
+        Returns:
+            list: List of (canonical name, group) tuples, including single name groups
+        """
+        company_groups = []
+        for cluster in self.clusters(threshold, linkage):
+            group = [self.names[i] for i in cluster]
+            company_groups.append((choose_canonical(group, canonical, approvals), group))
+        return company_groups
@@ -0,0 +1,188 @@
+"""
+Company Name Incremental Clustering
+
+This module keeps the result of grouping company names between runs, so that a new
+fiscal year file can be added without loading and grouping the previous years again.
+The state holds the canonical name of every name seen, the normalized form of each
+canonical name, and the approval and denial counts aggregated per canonical company.
+
+Groups are built like group_similar_names: each canonical name is the center of its
+group, and a later name joins the first center it is similar to. Since the names of a
+new file come after every name already seen, a new name joins the first existing center
+it matches, and the new names matching none of them are grouped among themselves. This
+gives the same groups as grouping every file again, with the new files last, while only
+the new names are normalized and scored.
+
+Usage:
+    from company_name_incremental import ClusterState
+
+    state = ClusterState.load('Data/clusters.json')
+    state.add_names(df['Employer (Petitioner) Name'].dropna().unique())
+    df['Canonical Company'] = df['Employer (Petitioner) Name'].map(state.canonical)
+    state.fold(aggregated)
+    state.save('Data/clusters.json')
+"""
+
+import json
+import os
+from typing import Dict, Iterable, List, Optional
+import pandas as pd
+from company_data_stream import COUNT_COLUMNS, NAICS_COLUMN
+from company_name_blocking import CompanyNameIndex, group_similar_names
+from company_name_cache import normalize_many
+from company_name_match_cache import rules_version
+
+# Version of the file format
+STATE_FORMAT = 1
+
+
+class ClusterState:
+    """Canonical names and per-company aggregates of the files grouped so far"""
+
+    def __init__(self, params: Optional[Dict] = None, version: Optional[str] = None):
+        """
+        Create an empty state.
+
+        Args:
+            params (dict, optional): Options the groups depend on, such as the similarity
+                threshold and the filters. Adding data with other options is refused.
+            version (str, optional): Version of the normalizer and scorer rules. Defaults to
+                rules_version().
+        """
+        self.params = dict(params or {})
+        self.version = version or rules_version()
+        self.sources: List[str] = []
+        self.canonical: Dict[str, str] = {}
+        self.centers: List[str] = []
+        self.center_norms: List[str] = []
+        self.aggregates: Dict[str, Dict] = {}
+
+    @classmethod
+    def load(cls, path: str, params: Optional[Dict] = None) -> 'ClusterState':
+        """
+        Load the state saved in a file, or create an empty one if the file does not exist.
+
+        Args:
+            path (str): Path to the JSON state file
+            params (dict, optional): Options of the current run, checked against the saved ones
+
+        Returns:
+            ClusterState: State of the previous runs
+
+        Raises:
+            ValueError: If the file was created with other options or other rules
+        """
+        state = cls(params)
+        if not os.path.exists(path):
+            return state
+
+        with open(path, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+        if saved.get('format') != STATE_FORMAT or saved['version'] != state.version:
+            raise ValueError(f"State file {path} was created with other normalization rules, delete it to rebuild it")
+        if params is not None and saved['params'] != state.params:
+            raise ValueError(f"State file {path} was created with other options: {saved['params']}")
+
+        state.params = saved['params']
+        state.sources = saved['sources']
+        state.canonical = saved['canonical']
+        state.centers = saved['centers']
+        state.center_norms = saved['center_norms']
+        state.aggregates = {
+            company: {**counts, NAICS_COLUMN: set(counts[NAICS_COLUMN])}
+            for company, counts in saved['aggregates'].items()
+        }
+        return state
+
+    def save(self, path: str):
+        """Save the state to a JSON file."""
+        saved = {
+            'format': STATE_FORMAT,
+            'version': self.version,
+            'params': self.params,
+            'sources': self.sources,
+            'canonical': self.canonical,
+            'centers': self.centers,
+            'center_norms': self.center_norms,
+            'aggregates': {
+                company: {**counts, NAICS_COLUMN: sorted(counts[NAICS_COLUMN])}
+                for company, counts in self.aggregates.items()
+            },
+        }
+        # Write next to the file first, so an interrupted run keeps the previous state
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(saved, f)
+        os.replace(temp_path, path)
+
+    def new_sources(self, sources: Iterable[str]) -> List[str]:
+        """Get the sources that were not added yet, in order."""
+        return [source for source in sources if source not in self.sources]
+
+    def add_names(self, company_names: Iterable[str]) -> List[str]:
+        """
+        Assign a canonical name to every name not seen yet.
+
+        Args:
+            company_names (Iterable[str]): Company names of the new data, in order
+
+        Returns:
+            list: New names, in order
+        """
+        threshold = self.params.get('similarity_threshold', 85)
+        new_names = [name for name in dict.fromkeys(company_names) if name not in self.canonical]
+        if not new_names:
+            return new_names
+
+        # New names first, so the existing centers are their later candidates
+        new_norms = normalize_many(new_names)
+        index = CompanyNameIndex(new_names + self.centers, new_norms + self.center_norms)
+        unmatched = []
+        for i, name in enumerate(new_names):
+            for j in index.candidates(i, threshold):
+                if j >= len(new_names) and index.score(i, j) >= threshold:
+                    # Candidates are sorted, so this is the first center matching the name
+                    self.canonical[name] = self.centers[j - len(new_names)]
+                    break
+            else:
+                unmatched.append(i)
+
+        # The remaining names are grouped among themselves, after every existing center
+        unmatched_index = CompanyNameIndex([new_names[i] for i in unmatched], [new_norms[i] for i in unmatched])
+        norm_of = dict(zip(unmatched_index.names, unmatched_index.normalized))
+        for center, group in group_similar_names(unmatched_index.names, threshold, index=unmatched_index):
+            self.centers.append(center)
+            self.center_norms.append(norm_of[center])
+            for name in group:
+                self.canonical[name] = center
+
+        return new_names
+
+    def fold(self, aggregated: pd.DataFrame, sources: Iterable[str] = ()):
+        """
+        Add the counts of new data to the aggregates of their canonical companies.
+
+        Args:
+            aggregated (pd.DataFrame): Counts and NAICS codes of the new data, per 'Canonical Company'
+            sources (Iterable[str], optional): Sources of the new data, recorded as added
+        """
+        for row in aggregated.to_dict('records'):
+            counts = self.aggregates.get(row['Canonical Company'])
+            if counts is None:
+                counts = self.aggregates[row['Canonical Company']] = {column: 0 for column in COUNT_COLUMNS}
+                counts[NAICS_COLUMN] = set()
+            for column in COUNT_COLUMNS:
+                counts[column] += int(row[column])
+            counts[NAICS_COLUMN].update(row[NAICS_COLUMN])
+        self.sources.extend(sources)
+
+    def aggregates_frame(self) -> pd.DataFrame:
+        """Get the aggregates as a frame with one row per canonical company."""
+        # Sorted by company, like the result of a groupby
+        return pd.DataFrame(
+            [
+                {'Canonical Company': company, **counts, NAICS_COLUMN: sorted(counts[NAICS_COLUMN])}
+                for company, counts in sorted(self.aggregates.items())
+            ],
+            columns=['Canonical Company'] + COUNT_COLUMNS + [NAICS_COLUMN],
+        )
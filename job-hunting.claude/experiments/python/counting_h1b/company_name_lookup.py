@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Company Name Lookup
+
+This module answers "is this employer an H-1B sponsor, and which company is it?" for
+single names, without running the batch matcher again. A lookup index is built once from
+the output of get_top_companies and saved to a JSON file with the normalized form of
+every canonical name. A lookup normalizes the raw name, gets the indexed names that can
+reach the threshold from the token index of CompanyNameIndex, scores them like
+calculate_similarity does, and returns the best match with its approvals.
+
+The index can be used in-process, queried in batches, or served over HTTP on a local
+port, so that scripts in other environments can share one loaded index.
+
+HTTP API:
+    GET /lookup?name=ACME+INC
+        {"name": "ACME INC", "canonical": "ACME INC", "similarity": 1.0, "approvals": 12}
+    POST /lookup with {"names": ["ACME INC", "UNKNOWN LLC"]}
+        {"results": [{"name": "ACME INC", ...}, {"name": "UNKNOWN LLC", "canonical": null, ...}]}
+
+Usage:
+    python company_name_lookup.py build Data/*.tsv --output Data/sponsors.json
+    python company_name_lookup.py lookup Data/sponsors.json "Acme, Inc."
+    python company_name_lookup.py serve Data/sponsors.json --port 8765
+
+    from company_name_lookup import CompanyLookup
+
+    lookup = CompanyLookup.load('Data/sponsors.json')
+    canonical, similarity, approvals = lookup.lookup("Acme, Inc.")
+"""
+
+import argparse
+import json
+import os
+from collections import namedtuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+from urllib.parse import parse_qs, urlparse
+import pandas as pd
+from company_name_blocking import CompanyNameIndex
+from company_name_cache import normalize_cached, normalize_many
+from company_name_match_cache import rules_version
+from company_name_similarity import score_normalized, tokenize_name
+
+# Version of the file format
+LOOKUP_FORMAT = 1
+
+# Minimum similarity score of a lookup match
+DEFAULT_LOOKUP_THRESHOLD = 0.85
+
+# Address the server listens on by default, only reachable from this machine
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# Best match of a looked up name, with the total approvals of the matched company
+LookupResult = namedtuple('LookupResult', ['canonical', 'similarity', 'approvals'])
+
+
+class CompanyLookup:
+    """Index of canonical company names and their counts, for looking up single names"""
+
+    def __init__(self, companies: Dict[str, Dict], threshold: float = DEFAULT_LOOKUP_THRESHOLD,
+                 normalized: Optional[Sequence[str]] = None):
+        """
+        Build the lookup index.
+
+        Args:
+            companies (dict): Counts of each canonical company, with 'approvals', 'denials'
+                and 'approval_rate' keys
+            threshold (float, optional): Minimum similarity score of a match. Defaults to
+                DEFAULT_LOOKUP_THRESHOLD.
+            normalized (Sequence[str], optional): Normalized form of each company name.
+                Defaults to normalizing the names.
+        """
+        self.companies = companies
+        self.threshold = threshold
+        self.index = CompanyNameIndex(list(companies), normalized)
+
+    @classmethod
+    def from_companies(cls, top_companies: Union[pd.DataFrame, Iterable[Dict]],
+                       threshold: float = DEFAULT_LOOKUP_THRESHOLD) -> 'CompanyLookup':
+        """
+        Build the lookup index from the result of get_top_companies.
+
+        Args:
+            top_companies (pd.DataFrame or list): Rows with 'Canonical Company', 'Total Approvals',
+                'Total Denials' and 'Approval Rate' columns
+            threshold (float, optional): Minimum similarity score of a match. Defaults to
+                DEFAULT_LOOKUP_THRESHOLD.
+
+        Returns:
+            CompanyLookup: Index of the companies
+        """
+        if isinstance(top_companies, pd.DataFrame):
+            top_companies = top_companies.to_dict('records')
+        companies = {
+            row['Canonical Company']: {
+                'approvals': int(row['Total Approvals']),
+                'denials': int(row['Total Denials']),
+                'approval_rate': float(row['Approval Rate']),
+            }
+            for row in top_companies
+        }
+        return cls(companies, threshold)
+
+    @classmethod
+    def load(cls, path: str, threshold: Optional[float] = None) -> 'CompanyLookup':
+        """
+        Load a lookup index saved with save.
+
+        Args:
+            path (str): Path to the JSON index file
+            threshold (float, optional): Minimum similarity score of a match. Defaults to the
+                saved threshold.
+
+        Returns:
+            CompanyLookup: Index of the companies
+
+        Raises:
+            ValueError: If the file was created with other normalization rules
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+        if saved.get('format') != LOOKUP_FORMAT or saved['version'] != rules_version():
+            raise ValueError(f"Lookup index {path} was created with other normalization rules, build it again")
+        return cls(dict(zip(saved['names'], saved['companies'])),
+                   saved['threshold'] if threshold is None else threshold, saved['normalized'])
+
+    def save(self, path: str):
+        """Save the index to a JSON file, with the normalized names so loading does not normalize again."""
+        saved = {
+            'format': LOOKUP_FORMAT,
+            'version': rules_version(),
+            'threshold': self.threshold,
+            'names': self.index.names,
+            'normalized': self.index.normalized,
+            'companies': [self.companies[name] for name in self.index.names],
+        }
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(saved, f)
+        os.replace(temp_path, path)
+
+    def __len__(self):
+        return len(self.index)
+
+    def lookup_normalized(self, norm: str) -> Optional[LookupResult]:
+        """
+        Find the best match of a normalized name.
+
+        Args:
+            norm (str): Normalized company name
+
+        Returns:
+            LookupResult: Best match, the most approved company among equal scores, or None
+                when no company reaches the threshold
+        """
+        name = tokenize_name(norm)
+        best = None
+        best_key = None
+        for j in self.index.query(name, self.threshold):
+            similarity = score_normalized(name, self.index.tokenized[j])
+            if similarity < self.threshold:
+                continue
+            company = self.index.names[j]
+            key = (similarity, self.companies[company]['approvals'])
+            if best_key is None or key > best_key:
+                best, best_key = company, key
+        if best is None:
+            return None
+        return LookupResult(best, best_key[0], best_key[1])
+
+    def lookup(self, raw_name: str) -> Optional[LookupResult]:
+        """
+        Find the company a raw employer name refers to.
+
+        Args:
+            raw_name (str): Company name, as written in a job posting
+
+        Returns:
+            LookupResult: (canonical, similarity, approvals) of the best match, or None
+        """
+        return self.lookup_normalized(normalize_cached(raw_name))
+
+    def lookup_many(self, raw_names: Iterable[str]) -> List[Optional[LookupResult]]:
+        """
+        Find the companies of many raw names, normalizing and matching each distinct name once.
+
+        Args:
+            raw_names (Iterable[str]): Company names
+
+        Returns:
+            list: Best match of each name, or None
+        """
+        raw_names = list(raw_names)
+        results = {}
+        matches = []
+        for norm in normalize_many(raw_names):
+            if norm not in results:
+                results[norm] = self.lookup_normalized(norm)
+            matches.append(results[norm])
+        return matches
+
+    def company(self, canonical: str) -> Dict:
+        """Get the counts of a canonical company: 'approvals', 'denials' and 'approval_rate'."""
+        return self.companies[canonical]
+
+
+def result_json(raw_name: str, result: Optional[LookupResult]) -> Dict:
+    """Convert a lookup result to the JSON object returned by the server."""
+    if result is None:
+        return {'name': raw_name, 'canonical': None, 'similarity': 0.0, 'approvals': 0}
+    return {'name': raw_name, **result._asdict()}
+
+
+def make_server(lookup: CompanyLookup, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    """
+    Create an HTTP server answering lookups, see the HTTP API of this module.
+
+    Args:
+        lookup (CompanyLookup): Loaded lookup index
+        host (str, optional): Address to listen on. Defaults to DEFAULT_HOST.
+        port (int, optional): Port to listen on, 0 for any free port. Defaults to DEFAULT_PORT.
+
+    Returns:
+        ThreadingHTTPServer: Server, started with serve_forever
+    """
+    class LookupHandler(BaseHTTPRequestHandler):
+        def send_json(self, status, body):
+            data = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            names = parse_qs(url.query).get('name')
+            if url.path != '/lookup' or not names:
+                self.send_json(404, {'error': 'expected GET /lookup?name=...'})
+                return
+            self.send_json(200, result_json(names[0], lookup.lookup(names[0])))
+
+        def do_POST(self):
+            if urlparse(self.path).path != '/lookup':
+                self.send_json(404, {'error': 'expected POST /lookup'})
+                return
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                names = json.loads(self.rfile.read(length))['names']
+                if not isinstance(names, list) or not all(isinstance(name, str) for name in names):
+                    raise ValueError("names must be a list of strings")
+            except (ValueError, KeyError, TypeError) as e:
+                self.send_json(400, {'error': f"expected a JSON object with a list of names: {e}"})
+                return
+            results = lookup.lookup_many(names)
+            self.send_json(200, {'results': [result_json(name, result) for name, result in zip(names, results)]})
+
+        def log_message(self, format, *args):
+            # Lookups are too frequent to log each request
+            pass
+
+    return ThreadingHTTPServer((host, port), LookupHandler)
+
+
+def build_lookup(file_paths: List[str], output: str, threshold: float = DEFAULT_LOOKUP_THRESHOLD,
+                 **options) -> CompanyLookup:
+    """
+    Build a lookup index from data files and save it.
+
+    Args:
+        file_paths (list): Data files, URLs or folders, as accepted by get_top_companies
+        output (str): Path to the JSON index file
+        threshold (float, optional): Minimum similarity score of a lookup match. Defaults to
+            DEFAULT_LOOKUP_THRESHOLD.
+        **options: Other arguments of get_top_companies, such as state_filter or workers
+
+    Returns:
+        CompanyLookup: Index of the companies
+    """
+    # Only needed to build the index, not to load one
+    from company_name_matcher import get_top_companies
+
+    lookup = CompanyLookup.from_companies(get_top_companies(file_paths, **options), threshold)
+    lookup.save(output)
+    return lookup
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Look up company names in the H1B employer data')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help='Build a lookup index from data files')
+    build.add_argument('file_paths', nargs='+', help='Data files, URLs or folders of TSV files')
+    build.add_argument('--output', required=True, help='Path to the JSON index file')
+    build.add_argument('--state', type=str, nargs='+', default=None, help='Only count these states')
+    build.add_argument('--year', type=int, nargs='+', default=None, help='Only count these fiscal years')
+    build.add_argument('--similarity_threshold', type=float, default=85,
+                       help='Threshold for grouping similar companies in the data')
+    build.add_argument('--lookup_threshold', type=float, default=DEFAULT_LOOKUP_THRESHOLD,
+                       help='Minimum similarity score of a lookup match')
+    build.add_argument('--workers', type=int, default=1, help='Number of processes used to group similar companies')
+    build.add_argument('--cache_dir', type=str, default=None, help='Folder keeping copies of the data files')
+
+    lookup = commands.add_parser('lookup', help='Look up company names')
+    lookup.add_argument('index_file', help='Path to the JSON index file')
+    lookup.add_argument('names', nargs='+', help='Company names to look up')
+
+    serve = commands.add_parser('serve', help='Answer lookups over HTTP')
+    serve.add_argument('index_file', help='Path to the JSON index file')
+    serve.add_argument('--host', type=str, default=DEFAULT_HOST, help='Address to listen on')
+    serve.add_argument('--port', type=int, default=DEFAULT_PORT, help='Port to listen on')
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        built = build_lookup(args.file_paths, args.output, args.lookup_threshold, year_filter=args.year,
+                             state_filter=args.state, similarity_threshold=args.similarity_threshold,
+                             workers=args.workers, cache_dir=args.cache_dir)
+        print(f"Indexed {len(built)} companies in {args.output}")
+    elif args.command == 'lookup':
+        loaded = CompanyLookup.load(args.index_file)
+        for name, result in zip(args.names, loaded.lookup_many(args.names)):
+            print(json.dumps(result_json(name, result)))
+    else:
+        server = make_server(CompanyLookup.load(args.index_file), args.host, args.port)
+        print(f"Serving lookups on http://{args.host}:{server.server_address[1]}/lookup")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+
+
+if __name__ == "__main__":
+    main()
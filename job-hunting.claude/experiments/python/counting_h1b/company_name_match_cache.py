@@ -0,0 +1,215 @@
+"""
+Company Name Match Cache
+
+This module persists the work of the matcher between runs in an SQLite file. It stores
+the normalized form of every raw name seen, and every pair of normalized names whose
+similarity reaches the lowest threshold used so far. A rerun over names that are already
+in the cache does not normalize or score anything: the similarity graph of the names is
+read back from the file, and grouping it at any threshold at or above the stored one is
+near-linear in its number of edges. Only the pairs involving new names are scored.
+
+Every entry depends on the rules of company_name_normalizer and company_name_similarity,
+so the cache is keyed by a hash of both modules, and emptied when any of them changes.
+
+Usage:
+    from company_name_match_cache import MatchCache
+
+    with MatchCache('Data/match_cache.sqlite') as cache:
+        graph = cache.similarity_graph(company_names, threshold=0.85)
+        groups = graph.groups(0.85)
+"""
+
+import hashlib
+import sqlite3
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence
+import company_name_normalizer
+import company_name_similarity
+from company_name_blocking import CompanyNameIndex
+from company_name_cache import normalize_distinct
+from company_name_clustering import SimilarityGraph
+from company_name_parallel import find_matches
+
+# Modules whose rules decide normalized names and scores
+RULE_MODULES = [company_name_normalizer, company_name_similarity]
+
+# Number of rows sent to SQLite at once
+BATCH_SIZE = 10_000
+
+
+def rules_version() -> str:
+    """Get a hash of the normalizer and scorer modules, changing whenever their rules do."""
+    digest = hashlib.sha256()
+    for module in RULE_MODULES:
+        with open(module.__file__, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _batches(rows: Iterable, size: int = BATCH_SIZE) -> Iterable[List]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class MatchCache:
+    """SQLite file of normalized names and scored pairs of normalized names"""
+
+    def __init__(self, path: str, version: Optional[str] = None, workers: int = 1):
+        """
+        Open the cache, creating it if needed and emptying it if its rules are outdated.
+
+        Args:
+            path (str): Path to the SQLite file
+            version (str, optional): Version of the rules. Defaults to rules_version().
+            workers (int, optional): Number of processes used to score new pairs. Defaults to 1.
+        """
+        self.path = path
+        self.version = version or rules_version()
+        self.workers = workers
+        self.connection = sqlite3.connect(path)
+        self._prepare()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Commit pending changes and close the file."""
+        self.connection.commit()
+        self.connection.close()
+
+    def _prepare(self):
+        with self.connection:
+            self.connection.executescript("""
+                CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+                CREATE TABLE IF NOT EXISTS normalized (name TEXT PRIMARY KEY, norm TEXT NOT NULL);
+                CREATE TABLE IF NOT EXISTS scored (norm TEXT PRIMARY KEY);
+                CREATE TABLE IF NOT EXISTS pairs (
+                    norm1 TEXT NOT NULL, norm2 TEXT NOT NULL, score REAL NOT NULL,
+                    PRIMARY KEY (norm1, norm2)
+                );
+            """)
+            if self._get_meta('version') != self.version:
+                self.connection.executescript("""
+                    DELETE FROM normalized;
+                    DELETE FROM scored;
+                    DELETE FROM pairs;
+                    DELETE FROM meta;
+                """)
+                self._set_meta('version', self.version)
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self.connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str):
+        self.connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    @property
+    def min_threshold(self) -> Optional[float]:
+        """Threshold the stored pairs were scored with, None if no pair was scored yet."""
+        value = self._get_meta('min_threshold')
+        return float(value) if value is not None else None
+
+    def normalize_distinct(self, names: Iterable[str]) -> Dict[str, str]:
+        """
+        Normalize every distinct name, reading the names normalized by earlier runs.
+
+        Args:
+            names (Iterable[str]): Raw company names, possibly repeated
+
+        Returns:
+            dict: Mapping from each distinct raw name to its normalized name
+        """
+        names = list(dict.fromkeys(names))
+        mapping = {}
+        for batch in _batches(names, 900):
+            placeholders = ','.join('?' * len(batch))
+            mapping.update(self.connection.execute(
+                f"SELECT name, norm FROM normalized WHERE name IN ({placeholders})", batch))
+
+        missing = normalize_distinct(name for name in names if name not in mapping)
+        with self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO normalized (name, norm) VALUES (?, ?)",
+                                        missing.items())
+        mapping.update(missing)
+        return mapping
+
+    def _score_new(self, norms: Sequence[str], threshold: float):
+        """Score the pairs of normalized names involving a name not scored yet."""
+        min_threshold = self.min_threshold
+        if min_threshold is None or threshold < min_threshold:
+            # Pairs below the stored threshold were never kept, so everything is scored again
+            with self.connection:
+                self.connection.execute("DELETE FROM scored")
+                self.connection.execute("DELETE FROM pairs")
+                self._set_meta('min_threshold', repr(threshold))
+            min_threshold = threshold
+
+        known = {norm for (norm,) in self.connection.execute("SELECT norm FROM scored")}
+        new = [norm for norm in norms if norm not in known]
+        if not new:
+            return
+
+        # Known names first, so only pairs with a name after them are scored
+        ordered = list(known) + new
+        index = CompanyNameIndex(ordered, ordered)
+        matches = find_matches(index, min_threshold, self.workers, first_new=len(known))
+
+        rows = ((ordered[i], ordered[j], score) if ordered[i] < ordered[j] else (ordered[j], ordered[i], score)
+                for i, matching in matches.items() for j, score in matching)
+        with self.connection:
+            for batch in _batches(rows):
+                self.connection.executemany("INSERT OR REPLACE INTO pairs (norm1, norm2, score) VALUES (?, ?, ?)",
+                                            batch)
+            self.connection.executemany("INSERT INTO scored (norm) VALUES (?)", ((norm,) for norm in new))
+
+    def similarity_graph(self, company_names: Sequence[str], threshold: float) -> SimilarityGraph:
+        """
+        Get the similarity graph of company names, scoring only the pairs not cached yet.
+
+        Args:
+            company_names (Sequence[str]): Company names, possibly repeated
+            threshold (float): Minimum similarity score of the pairs in the graph
+
+        Returns:
+            SimilarityGraph: Graph of the distinct names, the same as scoring every pair
+        """
+        names = list(dict.fromkeys(company_names))
+        norm_of = self.normalize_distinct(names)
+        positions = defaultdict(list)
+        for i, name in enumerate(names):
+            positions[norm_of[name]].append(i)
+
+        self._score_new(list(positions), threshold)
+
+        matches = defaultdict(list)
+
+        # Names with the same normalized name score 1.0, or 0 when it is empty
+        for norm, same in positions.items():
+            score = 1.0 if norm else 0.0
+            if len(same) > 1 and score >= threshold:
+                for k, i in enumerate(same):
+                    matches[i].extend((j, score) for j in same[k + 1:])
+
+        for norm1, norm2, score in self.connection.execute("SELECT norm1, norm2, score FROM pairs"):
+            if score < threshold or norm1 not in positions or norm2 not in positions:
+                continue
+            for i in positions[norm1]:
+                for j in positions[norm2]:
+                    if i < j:
+                        matches[i].append((j, score))
+                    else:
+                        matches[j].append((i, score))
+
+        for matching in matches.values():
+            matching.sort()
+        return SimilarityGraph(names, dict(matches), threshold)
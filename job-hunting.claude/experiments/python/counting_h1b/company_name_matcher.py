@@ -9,7 +9,7 @@ Usage:
     import company_name_matcher as cnm
 
     # Normalize a company name
-    normalized = cnm.normalize_company_name("ACME Corp. LLC")
+    normalized = cnm.normalize_cached("ACME Corp. LLC")
 
     # Calculate similarity between two company names
     similarity = cnm.calculate_similarity("ACME Corp.", "ACME Corporation")
@@ -21,100 +21,28 @@ Usage:
     top_companies = cnm.get_top_companies("companies.tsv", top_n=20, state_filter="CA")
 """
 
+import heapq
 import pandas as pd
 import re
-import requests
-from io import StringIO
 from thefuzz import fuzz
 from difflib import SequenceMatcher
 from collections import defaultdict
-from company_name_normalizer import normalize_company_name
+from company_name_cache import normalize_cached
+from company_name_series import normalize_series
+from company_name_similarity import DEFAULT_LCS_BACKEND, LCS_BACKENDS, calculate_similarity, set_lcs_backend
+from company_name_blocking import find_similar_pairs, group_similar_names
+from company_name_parallel import group_similar_names_parallel
+from company_name_match_cache import MatchCache
+from company_name_incremental import ClusterState
+from company_data_stream import (CACHE_FORMATS, UTF8_CACHE, NameAggregates, expand_sources, iter_chunks, iter_rows,
+                                 parse_counts)
+from company_naics_codes import NAICS_PATTERN, naics_code_lists, naics_codes
+from company_name_clustering import CANONICAL_RULES, CENTER_LINKAGE, FIRST_NAME, LINKAGES, MOST_APPROVALS, canonical_name_map
 import argparse
 import os
 import glob
-from urllib.parse import urlparse
 
 
-def calculate_similarity(name1: str, name2: str) -> float:
-    """
-    Calculate similarity between two company names.
-
-    Args:
-        name1 (str): First company name
-        name2 (str): Second company name
-
-    Returns:
-        float: Similarity score between 0 and 1
-    """
-    # Normalize both names
-    norm1 = normalize_company_name(name1)
-    norm2 = normalize_company_name(name2)
-
-    # Handle special cases
-    if not norm1 or not norm2:
-        return 0.0
-
-    if norm1 == norm2:
-        return 1.0
-
-    # Define specific corporate families and their known subsidiaries
-    amazon_pattern = r'^AMAZON\W'
-    apple_pattern = r'^APPLE(?:\s+(?:PAYMENTS|INC))?$'
-
-    # Check if the names match specific corporate family patterns
-    if bool(re.match(amazon_pattern, norm1)) and "PRODUCE" not in norm1 and bool(re.match(amazon_pattern, norm2)) and "PRODUCE" not in norm2:
-        return 1.0
-
-    if bool(re.match(apple_pattern, norm1)) and bool(re.match(apple_pattern, norm2)):
-        return 1.0
-
-    # Calculate longest common substring
-    matcher = SequenceMatcher(None, norm1, norm2)
-    lcs = matcher.find_longest_match(0, len(norm1), 0, len(norm2))
-    lcs_ratio = lcs.size / max(len(norm1), len(norm2))
-
-   # Get tokens from both names and remove common business words
-    tokens1 = set(norm1.split())
-    tokens2 = set(norm2.split())
-
-    COMMON_BUSINESS_WORDS = {
-        'TECH', 'HLTH', 'SRVCS', 'SRVC', 'OF', 'SOLNS', 'SOLN', 'CONSULTING', 'WA', 'SEATTLE', 'USA', 'CTR', 'MANAGEMENT',
-        'B', 'PS', 'D', 'A', 'THE', 'LABS', 'LAB', 'NW', 'CONSTRUCTION', 'COM', 'SCHOOL', 'INSTITUTE', 'RESEARCH', 'FOR',
-        'US', 'S', 'ASSOCIATES', 'ENGINEERING', 'ARCHITECTURE', 'DEVELOPMENT', 'AMERICA', 'COMMUNITY', 'CAPITAL', 'AI',
-        'INTL', 'MED', 'L', 'FOUNDATION', 'DESIGN', 'AI', 'SYS', 'GROUP',  'CAPITAL', 'CORP', 'GLOBAL', 'WORLD', 'AMERICAN',
-        'ENTERPRISES', 'INDUSTRIES', 'ASSOCIATES', 'CARE', 'HIGH', 'NORTH', 'SOUTH', 'EAST', 'WEST', 'REGIONAL', 'PLAN'
-    }
-
-    # Get tokens from both names, excluding common words
-    unique_words1 = {w for w in tokens1 if w not in COMMON_BUSINESS_WORDS}
-    unique_words2 = {w for w in tokens2 if w not in COMMON_BUSINESS_WORDS}
-
-    # If either name has no unique words after removing common words, return 0
-    if not unique_words1 or not unique_words2:
-        return 0
-
-    # Calculate number of matching unique words
-    matching_tokens = unique_words1.intersection(unique_words2)
-    num_matching = len(matching_tokens)
-
-    # If no unique words match, return 0
-    if num_matching == 0:
-        return 0
-
-    # Require at least 2 matching unique words or a very long common substring
-    if num_matching < 2 and lcs_ratio < 0.5:
-        return 0.0
-
-    # Calculate the ratio of matching unique words to total unique words
-    min_unique_words = min(len(tokens1), len(tokens2))
-    # Calculate word-based similarity
-    unique_word_ratio = num_matching / min_unique_words
-
-    # Combine scores
-    similarity = 0.7 * unique_word_ratio + 0.3 * lcs_ratio
-
-    return similarity
-
 def one_name_contains_other(name1, name2):
     """
     Check if one name is contained within the other at word boundaries.
@@ -179,15 +107,8 @@ def find_similar_companies(file_paths, threshold=85, company_column_index=2):
     company_column = df.columns[company_column_index]
     company_names = df[company_column].dropna().unique()
 
-    # Store similar pairs
-    similar_pairs = []
-
-    # Compare each pair of companies
-    for i, name1 in enumerate(company_names):
-        for name2 in company_names[i+1:]:
-            similarity = calculate_similarity(name1, name2)
-            if similarity >= threshold:
-                similar_pairs.append((name1, name2, similarity))
+    # Compare each pair of candidate companies
+    similar_pairs = find_similar_pairs(company_names, threshold)
 
     # Sort by similarity score
     similar_pairs.sort(key=lambda x: x[2], reverse=True)
@@ -205,201 +126,190 @@ def group_similar_companies(company_names, threshold=85):
     Returns:
         list: List of groups (lists) containing similar company names
     """
-    # Initialize groups
-    groups = []
-    processed = set()
-
-    for i, name1 in enumerate(company_names):
-        if name1 in processed:
-            continue
-
-        # Create a new group with this company
-        group = [name1]
-        processed.add(name1)
-
-        # Find similar companies
-        for name2 in company_names[i+1:]:
-            if name2 not in processed:
-                similarity = calculate_similarity(name1, name2)
-                if similarity >= threshold:
-                    group.append(name2)
-                    processed.add(name2)
-
-        # Add the group to our groups list
-        if len(group) > 1:  # Only add groups with more than one company
-            groups.append(group)
+    # Only keep groups with more than one company
+    return [group for _, group in group_similar_names(company_names, threshold) if len(group) > 1]
 
-    return groups
+def extract_naics_codes(codes):
+    """
+    Extract the numeric part of NAICS codes from a series of codes.
+
+    Args:
+        codes (pandas.Series): Series containing NAICS codes
+
+    Returns:
+        list: Sorted list of unique numeric NAICS codes
+    """
+    return sorted(set(
+        code.group(1)
+        for c in codes.dropna()
+        if (code := re.match(NAICS_PATTERN, str(c))) and code.group(1)  # Only include if there was a match and we got a group
+    ))
+
+def group_company_names(company_names, similarity_threshold, workers=1, linkage=CENTER_LINKAGE,
+                        canonical=FIRST_NAME, approvals=None, match_cache=None):
+    """
+    Group similar company names.
+
+    Args:
+        company_names (list): Company names to group
+        similarity_threshold (float): Minimum similarity score to consider companies as matches
+        workers (int, optional): Number of processes used to score pairs. Defaults to 1.
+        linkage (str, optional): How similar companies are grouped, 'center' or 'single'. Defaults to 'center'.
+        canonical (str, optional): How the canonical name of a group is chosen. Defaults to 'first'.
+        approvals (dict, optional): Total approvals of each company name, for the 'approvals' rule.
+        match_cache (str, optional): Path to an SQLite file keeping normalized names and scored pairs
+            between runs. Defaults to None (no cache).
 
-def load_data(sources, use_pandas=True):
+    Returns:
+        list: List of (canonical name, group) tuples, including single name groups
+    """
+    if match_cache:
+        with MatchCache(match_cache, workers=workers) as cache:
+            graph = cache.similarity_graph(company_names, similarity_threshold)
+        return graph.groups(similarity_threshold, linkage, canonical, approvals)
+    return group_similar_names_parallel(company_names, similarity_threshold, workers=workers,
+                                        linkage=linkage, canonical=canonical, approvals=approvals)
+
+def aggregate_names(sources, year_filter=None, state_filter=None,
+                    employer_name_column='Employer (Petitioner) Name', use_normalized_names=False, cache_dir=None,
+                    cache_format=UTF8_CACHE):
     """
-    Load data from file paths or URLs.
+    Read sources in chunks and sum the approvals and denials of each company name.
+
+    Only the columns used to filter and aggregate are read, and each chunk is reduced to one row per
+    name before the next one is read, so memory grows with the number of distinct names rather than
+    with the number of rows. With Parquet copies, the rows of other years and states are not read.
 
     Args:
         sources (str or list): Single file path/URL, folder path, or list of file paths/URLs
-        use_pandas (bool, optional): Whether to use pandas for data loading. Defaults to True.
+        year_filter (int or list, optional): Filter by fiscal year(s). Defaults to None (all years).
+        state_filter (str or list, optional): Filter by state(s). Defaults to None (all states).
+        employer_name_column (str, optional): Name of the column containing employer names.
+        use_normalized_names (bool, optional): Whether to aggregate by normalized names. Defaults to False.
+        cache_dir (str, optional): Folder keeping copies of local files. Defaults to None.
+        cache_format (str, optional): Format of the copies, 'utf8' or 'parquet'. Defaults to 'utf8'.
 
     Returns:
-        pandas.DataFrame or list: Combined data from all sources
+        NameAggregates: Counts and NAICS codes of each company name
     """
-    if isinstance(sources, str):
-        sources = [sources]
+    aggregates = NameAggregates(employer_name_column)
+    for chunk in iter_chunks(sources, employer_name_column=employer_name_column, cache_dir=cache_dir,
+                             cache_format=cache_format, year_filter=year_filter, state_filter=state_filter):
+        aggregates.add(chunk)
 
-    if use_pandas:
-        dataframes = []
+    if use_normalized_names:
+        names = pd.Series(aggregates.names(), dtype=object)
+        aggregates.rename(dict(zip(names, normalize_series(names))))
 
-        def is_url(path):
-            try:
-                result = urlparse(path)
-                return all([result.scheme, result.netloc])
-            except:
-                return False
-
-        for source in sources:
-            # Check if source is a URL
-            if is_url(source):
-                # Load from URL
-                response = requests.get(source)
-                response.raise_for_status()  # Raise exception for bad responses
-                data = StringIO(response.text)
-                df = pd.read_csv(data, sep='\t')
-                dataframes.append(df)
-                continue
+    return aggregates
 
-            # Check if source is a directory
-            if os.path.isdir(source):
-                # Get all TSV files in the directory
-                files = glob.glob(os.path.join(source, "*.tsv"))
-                if not files:
-                    print(f"Warning: No .tsv files found in directory: {source}")
-                    continue
-                sources.extend(files)
-                continue
+def aggregate_companies(df):
+    """
+    Sum the approvals and denials of each canonical company and collect its NAICS codes.
 
-            # Handle local file paths
-            # Try different encodings for local files
-            encodings = ['utf-16', 'utf-8', 'latin1', 'cp1252', 'iso-8859-1']
-            for encoding in encodings:
-                try:
-                    # First try to read just the first few lines to debug
-                    with open(source, 'r', encoding=encoding) as f:
-                        first_lines = [next(f) for _ in range(5)]
-                    print(f"Successfully read file with encoding: {encoding}")
-                    print("First few lines of the file:")
-                    for line in first_lines:
-                        print(line.strip())
-
-                    # Now read the full file
-                    df = pd.read_csv(source, sep='\t', encoding=encoding)
-                    print(f"\nDataFrame columns: {df.columns.tolist()}")
-                    print(f"DataFrame shape: {df.shape}")
-                    break
-                except UnicodeDecodeError:
-                    print(f"Failed to read with encoding: {encoding}")
-                    continue
-                except Exception as e:
-                    print(f"Error with encoding {encoding}: {str(e)}")
-                    continue
-            else:
-                raise ValueError(f"Could not read file {source} with any of the attempted encodings: {encodings}")
+    Args:
+        df (pandas.DataFrame): Company data with a 'Canonical Company' column
+
+    Returns:
+        pandas.DataFrame: One row per canonical company
+    """
+    # Convert numeric columns to integers
+    numeric_columns = ['Initial Approval', 'Initial Denial', 'Continuing Approval', 'Continuing Denial']
+    for col in numeric_columns:
+        df[col] = parse_counts(df[col])
+
+    # Aggregate data by canonical company name, parsing each distinct NAICS value once
+    aggregated = df.groupby('Canonical Company')[numeric_columns].sum()
+    aggregated['Industry (NAICS) Code'] = naics_code_lists(df['Canonical Company'],
+                                                           naics_codes(df['Industry (NAICS) Code']),
+                                                           aggregated.index)
+    return aggregated.reset_index()
+
+def summarize_companies(aggregated, top_n=0):
+    """
+    Compute the totals and approval rate of aggregated companies and sort them by total approvals.
 
-            dataframes.append(df)
+    Companies with the same total approvals keep their order in aggregated. With top_n, the top
+    companies are selected without sorting the others, and only their rates are computed.
 
-        # Combine all dataframes
-        if len(dataframes) == 1:
-            return dataframes[0]
-        else:
-            return pd.concat(dataframes, ignore_index=True)
+    Args:
+        aggregated (pandas.DataFrame): Counts per canonical company, from aggregate_companies
+        top_n (int, optional): Number of top companies to return. Use 0 for all companies.
+
+    Returns:
+        pandas.DataFrame: Companies with at least one approval, sorted by total approvals
+    """
+    # Calculate total approvals and filter out companies with 0 total approvals
+    aggregated['Total Approvals'] = aggregated['Initial Approval'] + aggregated['Continuing Approval']
+    aggregated = aggregated[aggregated['Total Approvals'] > 0]
+
+    # Sort by total approvals
+    if top_n > 0:
+        aggregated = aggregated.nlargest(top_n, 'Total Approvals', keep='first')
     else:
-        # Manual data loading without pandas
-        data = []
-        headers = None
+        aggregated = aggregated.sort_values('Total Approvals', ascending=False, kind='stable')
 
-        def is_url(path):
-            try:
-                result = urlparse(path)
-                return all([result.scheme, result.netloc])
-            except:
-                return False
-
-        for source in sources:
-            # Check if source is a URL
-            if is_url(source):
-                # Load from URL
-                response = requests.get(source)
-                response.raise_for_status()
-                content = response.text
-                lines = content.split('\n')
-            else:
-                # Check if source is a directory
-                if os.path.isdir(source):
-                    files = glob.glob(os.path.join(source, "*.tsv"))
-                    if not files:
-                        print(f"Warning: No .tsv files found in directory: {source}")
-                        continue
-                    sources.extend(files)
-                    continue
-
-                # Handle local file paths
-                encodings = ['utf-16', 'utf-8', 'latin1', 'cp1252', 'iso-8859-1']
-                for encoding in encodings:
-                    try:
-                        with open(source, 'r', encoding=encoding) as f:
-                            lines = f.readlines()
-                        break
-                    except UnicodeDecodeError:
-                        continue
-                    except Exception as e:
-                        print(f"Error with encoding {encoding}: {str(e)}")
-                        continue
-                else:
-                    raise ValueError(f"Could not read file {source} with any of the attempted encodings: {encodings}")
-
-            # Process lines
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-
-                # Split by tab and handle potential encoding issues
-                try:
-                    fields = line.split('\t')
-                except:
-                    continue
-
-                if headers is None:
-                    headers = fields
-                    continue
-
-                if fields[0] == "Line by line":
-                    continue
-
-                if len(fields) != len(headers):
-                    continue
-
-                data.append(dict(zip(headers, fields)))
-
-        return data
+    aggregated['Total Denials'] = aggregated['Initial Denial'] + aggregated['Continuing Denial']
 
-def extract_naics_codes(codes):
+    # Calculate approval rate
+    aggregated['total_cases'] = aggregated['Total Approvals'] + aggregated['Total Denials']
+    aggregated['Approval Rate'] = (aggregated['Total Approvals'] / aggregated['total_cases'] * 100).round(1)
+
+    # compute name lengths
+    aggregated['name_len'] = aggregated['Canonical Company'].str.len()
+
+    return aggregated
+
+def get_top_companies_incremental(sources, state_file, top_n=0, year_filter=None, state_filter=None,
+                                  similarity_threshold=85, employer_name_column='Employer (Petitioner) Name',
+                                  use_normalized_names=False, cache_dir=None, cache_format=UTF8_CACHE):
     """
-    Extract the numeric part of NAICS codes from a series of codes.
+    Get top companies like get_top_companies, only loading and grouping the sources not seen by previous runs.
+
+    The canonical names and aggregated counts of the previous runs are kept in a state file. The names of
+    the new sources are matched against the existing groups and their counts are added to the aggregates,
+    which gives the same result as processing every source again, with the new sources last.
 
     Args:
-        codes (pandas.Series): Series containing NAICS codes
+        sources (str or list): Single file path/URL, folder path, or list of file paths/URLs
+        state_file (str): Path to the JSON file keeping the state between runs
+        top_n (int, optional): Number of top companies to return. Use 0 for all companies.
+        year_filter (int or list, optional): Filter by fiscal year(s). Defaults to None (all years).
+        state_filter (str or list, optional): Filter by state(s). Defaults to None (all states).
+        similarity_threshold (int, optional): Threshold for grouping similar companies. Defaults to 85.
+        employer_name_column (str, optional): Name of the column containing employer names.
+        use_normalized_names (bool, optional): Whether to use normalized names throughout. Defaults to False.
+        cache_dir (str, optional): Folder keeping copies of local files. Defaults to None.
+        cache_format (str, optional): Format of the copies, 'utf8' or 'parquet'. Defaults to 'utf8'.
 
     Returns:
-        list: Sorted list of unique numeric NAICS codes
+        pandas.DataFrame: Top companies with aggregated approval/denial counts
     """
-    return sorted(set(
-        code.group(1) if (code := re.match(r"^(?:(\d\d(?:-\d\d)?) - .*)?$", str(c))) else None
-        for c in codes.dropna()
-        if code and code.group(1)  # Only include if there was a match and we got a group
-    ))
+    # The state can only be extended with data processed the same way
+    params = {
+        'similarity_threshold': similarity_threshold,
+        'year_filter': [int(year_filter)] if isinstance(year_filter, (int, str)) else year_filter,
+        'state_filter': [state_filter] if isinstance(state_filter, str) else state_filter,
+        'employer_name_column': employer_name_column,
+        'use_normalized_names': use_normalized_names,
+    }
+    state = ClusterState.load(state_file, params)
+
+    new_sources = state.new_sources(expand_sources(sources))
+    if new_sources:
+        aggregates = aggregate_names(new_sources, year_filter, state_filter, employer_name_column,
+                                     use_normalized_names, cache_dir, cache_format)
+        state.add_names(aggregates.names())
+        state.fold(aggregates.by_canonical(state.canonical), new_sources)
+        state.save(state_file)
+
+    return summarize_companies(state.aggregates_frame(), top_n)
 
 def get_top_companies(sources, top_n=0, year_filter=None, state_filter=None,
                       similarity_threshold=85, employer_name_column='Employer (Petitioner) Name',
-                      use_normalized_names=False, whitelist_file=None, use_pandas=True):
+                      use_normalized_names=False, whitelist_file=None, use_pandas=True, workers=1,
+                      linkage=CENTER_LINKAGE, canonical=FIRST_NAME, match_cache=None, state_file=None,
+                      cache_dir=None, cache_format=UTF8_CACHE):
     """
     Get top companies by total approvals (Initial + Continuing), with grouped similar company names.
 
@@ -412,115 +322,54 @@ def get_top_companies(sources, top_n=0, year_filter=None, state_filter=None,
         use_normalized_names (bool, optional): Whether to use normalized names throughout. Defaults to False.
         whitelist_file (str, optional): Path to file containing whitelisted company names. Defaults to None.
         use_pandas (bool, optional): Whether to use pandas for data processing. Defaults to True.
+        workers (int, optional): Number of processes used to group similar companies. Defaults to 1.
+        linkage (str, optional): How similar companies are grouped, 'center' or 'single'. Defaults to 'center'.
+        canonical (str, optional): How the canonical name of a group is chosen, 'first', 'shortest' or
+            'approvals'. Defaults to 'first'.
+        match_cache (str, optional): Path to an SQLite file keeping scored pairs between runs. Defaults to None.
+        state_file (str, optional): Path to a JSON file keeping the groups and counts of previous runs, so that
+            only new sources are processed. See get_top_companies_incremental. Defaults to None.
+        cache_dir (str, optional): Folder keeping copies of local files, read instead of the UTF-16
+            originals. Defaults to None.
+        cache_format (str, optional): Format of the copies with pandas, 'utf8' or 'parquet'. Defaults to 'utf8'.
 
     Returns:
         pandas.DataFrame or list: Top companies with aggregated approval/denial counts
     """
-    # Load data from sources
-    data = load_data(sources, use_pandas=use_pandas)
+    if use_pandas and state_file:
+        # Incremental groups are only equal to regrouping everything with the default policies
+        if linkage != CENTER_LINKAGE or canonical != FIRST_NAME:
+            raise ValueError("A state file can only be used with the 'center' linkage and 'first' canonical names")
+        return get_top_companies_incremental(sources, state_file, top_n=top_n, year_filter=year_filter,
+                                             state_filter=state_filter, similarity_threshold=similarity_threshold,
+                                             employer_name_column=employer_name_column,
+                                             use_normalized_names=use_normalized_names, cache_dir=cache_dir,
+                                             cache_format=cache_format)
 
     if use_pandas:
-        df = data
-        # Apply filters if provided
-        if year_filter is not None:
-            if isinstance(year_filter, (int, str)):
-                year_filter = [int(year_filter)]
-            df = df[df['Fiscal Year'].astype(int).isin(year_filter)]
-
-        if state_filter is not None:
-            if isinstance(state_filter, str):
-                state_filter = [state_filter]
-            df = df[df['Petitioner State'].isin(state_filter)]
-
-        # If using normalized names, normalize the canonical names
-        if use_normalized_names:
-            df[employer_name_column] = df[employer_name_column].apply(normalize_company_name)
+        # Read sources in chunks, keeping one row per company name
+        aggregates = aggregate_names(sources, year_filter, state_filter, employer_name_column,
+                                     use_normalized_names, cache_dir, cache_format)
 
         # Extract company names and create a mapping
-        company_names = df[employer_name_column].dropna().unique()
-
-        # Group similar companies
-        company_groups = []
-        processed = set()
+        company_names = aggregates.names()
 
-        for i, name1 in enumerate(company_names):
-            if name1 in processed:
-                continue
-
-            # Create a new group with this company
-            group = [name1]
-            processed.add(name1)
-
-            # Find similar companies
-            for name2 in company_names[i+1:]:
-                if name2 not in processed:
-                    similarity = calculate_similarity(name1, name2)
-                    if similarity >= similarity_threshold:
-                        group.append(name2)
-                        processed.add(name2)
-
-            # Add the group to our groups list
-            company_groups.append((name1, group))  # Use first name as canonical name
-
-        # Create a mapping from each company name to its canonical name
-        company_map = {}
-        for canonical, group in company_groups:
-            for name in group:
-                company_map[name] = canonical
+        # Group similar companies and create a mapping from each company name to its canonical name
+        approvals = aggregates.approvals() if canonical == MOST_APPROVALS else None
+        company_groups = group_company_names(company_names, similarity_threshold, workers=workers, linkage=linkage,
+                                             canonical=canonical, approvals=approvals, match_cache=match_cache)
+        company_map = canonical_name_map(company_groups)
 
         # For companies not in any group, map to themselves
         for name in company_names:
             if name not in company_map:
                 company_map[name] = name
 
-        # Add canonical company name to dataframe
-        df['Canonical Company'] = df[employer_name_column].map(company_map)
-
-        # Convert numeric columns to integers
-        numeric_columns = ['Initial Approval', 'Initial Denial', 'Continuing Approval', 'Continuing Denial']
-        for col in numeric_columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
-
-        # Aggregate data by canonical company name
-        aggregated = df.groupby('Canonical Company').agg({
-            'Initial Approval': 'sum',
-            'Initial Denial': 'sum',
-            'Continuing Approval': 'sum',
-            'Continuing Denial': 'sum',
-            'Industry (NAICS) Code': extract_naics_codes
-        }).reset_index()
-
-        # Calculate total approvals and denials and filter out companies with 0 total approvals
-        aggregated['Total Approvals'] = aggregated['Initial Approval'] + aggregated['Continuing Approval']
-        aggregated = aggregated[aggregated['Total Approvals'] > 0]
-        aggregated['Total Denials'] = aggregated['Initial Denial'] + aggregated['Continuing Denial']
-
-        # Calculate approval rate
-        aggregated['total_cases'] = aggregated['Total Approvals'] + aggregated['Total Denials']
-        aggregated['Approval Rate'] = (aggregated['Total Approvals'] / aggregated['total_cases'] * 100).round(1)
-
-        # compute name lengths
-        aggregated['name_len'] = aggregated['Canonical Company'].str.len()
-
-        # Sort by total approvals
-        result = aggregated.sort_values('Total Approvals', ascending=False)
-
-        if top_n > 0:
-            return result.head(top_n)
-        else:
-            return result
+        return summarize_companies(aggregates.by_canonical(company_map, top_n), top_n)
     else:
-        # Manual processing without pandas
-        # Apply filters
-        if year_filter is not None:
-            if isinstance(year_filter, (int, str)):
-                year_filter = [int(year_filter)]
-            data = [row for row in data if int(row.get('Fiscal Year', 0)) in year_filter]
-
-        if state_filter is not None:
-            if isinstance(state_filter, str):
-                state_filter = [state_filter]
-            data = [row for row in data if row.get('Petitioner State') in state_filter]
+        # Manual processing without pandas, reading rows one at a time
+        # Filters are applied while reading, before rows are split
+        data = iter_rows(sources, cache_dir, year_filter, state_filter)
 
         # Group by company name
         company_data = {}
@@ -530,7 +379,7 @@ def get_top_companies(sources, top_n=0, year_filter=None, state_filter=None,
                 continue
 
             if use_normalized_names:
-                company_name = normalize_company_name(company_name)
+                company_name = normalize_cached(company_name)
 
             if company_name not in company_data:
                 company_data[company_name] = {
@@ -554,41 +403,45 @@ def get_top_companies(sources, top_n=0, year_filter=None, state_filter=None,
             # Process NAICS code
             naics_code = row.get('Industry (NAICS) Code')
             if naics_code:
-                if match := re.match(r"^(?:(\d\d(?:-\d\d)?) - .*)?$", str(naics_code)):
+                if match := re.match(NAICS_PATTERN, str(naics_code)):
                     if match.group(1):
                         company_data[company_name]['Industry (NAICS) Code'].add(match.group(1))
 
-        # Convert to list of dictionaries
-        result = []
-        for company, stats in company_data.items():
-            total_approvals = stats['Initial Approval'] + stats['Continuing Approval']
-            if total_approvals > 0:
-                total_denials = stats['Initial Denial'] + stats['Continuing Denial']
-                total_cases = total_approvals + total_denials
-                approval_rate = (total_approvals / total_cases * 100) if total_cases > 0 else 0
-
-                result.append({
-                    'Canonical Company': company,
-                    'Initial Approval': stats['Initial Approval'],
-                    'Initial Denial': stats['Initial Denial'],
-                    'Continuing Approval': stats['Continuing Approval'],
-                    'Continuing Denial': stats['Continuing Denial'],
-                    'Total Approvals': total_approvals,
-                    'Total Denials': total_denials,
-                    'Approval Rate': round(approval_rate, 1),
-                    'Industry (NAICS) Code': sorted(stats['Industry (NAICS) Code']),
-                    'name_len': len(company)
-                })
-
-        # Sort by total approvals
-        result.sort(key=lambda x: x['Total Approvals'], reverse=True)
-
+        # Keep companies with approvals, selecting the top ones with a heap instead of sorting them all
+        approved = ((company, stats) for company, stats in company_data.items()
+                    if stats['Initial Approval'] + stats['Continuing Approval'] > 0)
+        total_approvals_of = lambda item: item[1]['Initial Approval'] + item[1]['Continuing Approval']
         if top_n > 0:
-            return result[:top_n]
+            approved = heapq.nlargest(top_n, approved, key=total_approvals_of)
         else:
-            return result
+            approved = sorted(approved, key=total_approvals_of, reverse=True)
 
-def get_companies_by_distinct_names(sources, top_n=20, year_filter=None, state_filter=None, similarity_threshold=85, employer_name_column='Employer (Petitioner) Name'):
+        # Convert to list of dictionaries
+        result = []
+        for company, stats in approved:
+            total_approvals = stats['Initial Approval'] + stats['Continuing Approval']
+            total_denials = stats['Initial Denial'] + stats['Continuing Denial']
+            total_cases = total_approvals + total_denials
+            approval_rate = (total_approvals / total_cases * 100) if total_cases > 0 else 0
+
+            result.append({
+                'Canonical Company': company,
+                'Initial Approval': stats['Initial Approval'],
+                'Initial Denial': stats['Initial Denial'],
+                'Continuing Approval': stats['Continuing Approval'],
+                'Continuing Denial': stats['Continuing Denial'],
+                'Total Approvals': total_approvals,
+                'Total Denials': total_denials,
+                'Approval Rate': round(approval_rate, 1),
+                'Industry (NAICS) Code': sorted(stats['Industry (NAICS) Code']),
+                'name_len': len(company)
+            })
+
+        return result
+
+def get_companies_by_distinct_names(sources, top_n=20, year_filter=None, state_filter=None, similarity_threshold=85, employer_name_column='Employer (Petitioner) Name', workers=1,
+                                    linkage=CENTER_LINKAGE, canonical=FIRST_NAME, match_cache=None, cache_dir=None,
+                                    cache_format=UTF8_CACHE):
     """
     Get top companies by number of distinct name variations.
 
@@ -598,55 +451,29 @@ def get_companies_by_distinct_names(sources, top_n=20, year_filter=None, state_f
         year_filter (int or list, optional): Filter by fiscal year(s). Defaults to None (all years).
         state_filter (str or list, optional): Filter by state(s). Defaults to None (all states).
         similarity_threshold (int, optional): Threshold for grouping similar companies. Defaults to 85.
+        workers (int, optional): Number of processes used to group similar companies. Defaults to 1.
+        linkage (str, optional): How similar companies are grouped, 'center' or 'single'. Defaults to 'center'.
+        canonical (str, optional): How the canonical name of a group is chosen, 'first', 'shortest' or
+            'approvals'. Defaults to 'first'.
+        match_cache (str, optional): Path to an SQLite file keeping scored pairs between runs. Defaults to None.
+        cache_dir (str, optional): Folder keeping copies of local files. Defaults to None.
+        cache_format (str, optional): Format of the copies, 'utf8' or 'parquet'. Defaults to 'utf8'.
 
     Returns:
         pandas.DataFrame: Top companies with their distinct name variations
     """
-    # Load data from sources
-    df = load_data(sources)
-
-    # Apply filters if provided
-    if year_filter is not None:
-        if isinstance(year_filter, (int, str)):
-            year_filter = [int(year_filter)]
-        df = df[df['Fiscal Year'].astype(int).isin(year_filter)]
-
-    if state_filter is not None:
-        if isinstance(state_filter, str):
-            state_filter = [state_filter]
-        df = df[df['Petitioner State'].isin(state_filter)]
+    # Read sources in chunks, keeping one row per company name
+    aggregates = aggregate_names(sources, year_filter, state_filter, employer_name_column, cache_dir=cache_dir,
+                                 cache_format=cache_format)
 
     # Extract company names and create a mapping
-    company_names = df[employer_name_column].dropna().unique()
-
-    # Group similar companies
-    company_groups = []
-    processed = set()
-
-    for i, name1 in enumerate(company_names):
-        if name1 in processed:
-            continue
-
-        # Create a new group with this company
-        group = [name1]
-        processed.add(name1)
-
-        # Find similar companies
-        for name2 in company_names[i+1:]:
-            if name2 not in processed:
-                similarity = calculate_similarity(name1, name2)
-                if similarity >= similarity_threshold:
-                    group.append(name2)
-                    processed.add(name2)
-
-        # Add the group to our groups list
-        company_groups.append((name1, group))  # Use first name as canonical name
+    company_names = aggregates.names()
 
-    # Create a mapping from each company name to its canonical name
-    company_map = {}
-    for canonical, group in company_groups:
-        for name in group:
-            company_map[name] = canonical
+    # Group similar companies and create a mapping from each company name to its canonical name
+    approvals = aggregates.approvals() if canonical == MOST_APPROVALS else None
+    company_groups = group_company_names(company_names, similarity_threshold, workers=workers, linkage=linkage,
+                                         canonical=canonical, approvals=approvals, match_cache=match_cache)
+    company_map = canonical_name_map(company_groups)
 
     # For companies not in any group, map to themselves
     for name in company_names:
@@ -668,8 +495,8 @@ def get_companies_by_distinct_names(sources, top_n=20, year_filter=None, state_f
         for canonical, names in name_counts.items()
     ])
 
-    # Sort by number of distinct names and get top N
-    result = result.sort_values('Distinct Names', ascending=False).head(top_n)
+    # Select the top N by number of distinct names, without sorting the others
+    result = result.nlargest(top_n, 'Distinct Names', keep='first')
 
     return result
 
@@ -690,12 +517,14 @@ def test_examples():
         print(f"Similarity: {similarity:.2f}%")
         print(f"  - {name1}")
         print(f"  - {name2}")
-        print(f"  - Normalized: {normalize_company_name(name1)} | {normalize_company_name(name2)}")
+        print(f"  - Normalized: {normalize_cached(name1)} | {normalize_cached(name2)}")
         print()
 
 def display_company_statistics(file_paths="d:/Downloads/Employer Information.2022-2024.WA.KingSnohomish.tsv", top_n=0, state=None,
                         year=None, multiline=False, employer_name_column='Employer (Petitioner) Name', output_file=None,
-                        use_normalized_names=False, column_divider=' ', whitelist_file=None, use_pandas=True):
+                        use_normalized_names=False, column_divider=' ', whitelist_file=None, use_pandas=True, workers=1,
+                        linkage=CENTER_LINKAGE, canonical=FIRST_NAME, match_cache=None, state_file=None, cache_dir=None,
+                        cache_format=UTF8_CACHE):
     """
     Display company statistics in a formatted table, showing approvals, denials, and NAICS codes.
 
@@ -711,10 +540,19 @@ def display_company_statistics(file_paths="d:/Downloads/Employer Information.202
         column_divider (str, optional): Character to use as column divider. Defaults to ' '.
         whitelist_file (str, optional): Path to file containing whitelisted company names. Defaults to None.
         use_pandas (bool, optional): Whether to use pandas for data processing. Defaults to True.
+        workers (int, optional): Number of processes used to group similar companies. Defaults to 1.
+        linkage (str, optional): How similar companies are grouped, 'center' or 'single'. Defaults to 'center'.
+        canonical (str, optional): How the canonical name of a group is chosen. Defaults to 'first'.
+        match_cache (str, optional): Path to an SQLite file keeping scored pairs between runs. Defaults to None.
+        state_file (str, optional): Path to a JSON file keeping the groups and counts of previous runs. Defaults to None.
+        cache_dir (str, optional): Folder keeping copies of the data files. Defaults to None.
+        cache_format (str, optional): Format of the copies, 'utf8' or 'parquet'. Defaults to 'utf8'.
     """
     top = get_top_companies(file_paths, top_n=top_n, year_filter=year, state_filter=state,
                            employer_name_column=employer_name_column, use_normalized_names=use_normalized_names,
-                           whitelist_file=whitelist_file, use_pandas=use_pandas)
+                           whitelist_file=whitelist_file, use_pandas=use_pandas, workers=workers,
+                           linkage=linkage, canonical=canonical, match_cache=match_cache, state_file=state_file,
+                           cache_dir=cache_dir, cache_format=cache_format)
 
     # Create a context manager for output
     import sys
@@ -918,8 +756,8 @@ def test_group_similar_companies():
         for j, name1 in enumerate(group):
             for name2 in group[j+1:]:
                 # Calculate individual metrics
-                norm_name1 = normalize_company_name(name1)
-                norm_name2 = normalize_company_name(name2)
+                norm_name1 = normalize_cached(name1)
+                norm_name2 = normalize_cached(name2)
                 ratio = fuzz.ratio(norm_name1, norm_name2)
                 partial_ratio = fuzz.partial_ratio(norm_name1, norm_name2)
                 token_sort_ratio = fuzz.token_sort_ratio(norm_name1, norm_name2)
@@ -998,6 +836,10 @@ if __name__ == "__main__":
                         help='Regex pattern to filter files when a directory is provided')
     parser.add_argument('--top_n', type=int, default=0,
                         help='Number of top companies to display. Use 0 to show all companies.')
+    parser.add_argument('--state', type=str, nargs='+', default=None,
+                        help='Only count the petitions of these states, skipping the other rows while reading')
+    parser.add_argument('--year', type=int, nargs='+', default=None,
+                        help='Only count the petitions of these fiscal years, skipping the other rows while reading')
     parser.add_argument('--employer_name_column', type=str, default='Employer (Petitioner) Name',
                         help='Name of the column containing employer names')
     parser.add_argument('--output_file', type=str, default=None,
@@ -1010,8 +852,25 @@ if __name__ == "__main__":
                         help='Path to file containing whitelisted company names (one per line)')
     parser.add_argument('--no_use_pandas', action='store_true', default=False,
                         help='Do not use pandas for data processing (default: False)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of processes used to group similar companies (default: 1)')
+    parser.add_argument('--linkage', choices=LINKAGES, default=CENTER_LINKAGE,
+                        help='Group names similar to the first name of a group (center) or transitively (single)')
+    parser.add_argument('--canonical', choices=CANONICAL_RULES, default=FIRST_NAME,
+                        help='Use the first, shortest or most approved name of a group as its canonical name')
+    parser.add_argument('--match_cache', type=str, default=None,
+                        help='Path to an SQLite file keeping normalized names and scored pairs between runs')
+    parser.add_argument('--state_file', type=str, default=None,
+                        help='Path to a JSON file keeping the groups and counts of previous runs, only new files are processed')
+    parser.add_argument('--cache_dir', type=str, default=None,
+                        help='Folder keeping copies of the data files, read by later runs instead of the UTF-16 originals')
+    parser.add_argument('--cache_format', choices=CACHE_FORMATS, default=UTF8_CACHE,
+                        help='Keep UTF-8 copies, or Parquet copies reading only the filtered states and years (needs pyarrow)')
+    parser.add_argument('--lcs_backend', choices=sorted(LCS_BACKENDS), default=DEFAULT_LCS_BACKEND,
+                        help='Longest common substring implementation of the similarity score, difflib being the reference')
 
     args = parser.parse_args()
+    set_lcs_backend(args.lcs_backend)
 
     if os.path.isdir(args.file_paths) and args.file_pattern:
         args.file_paths = get_matching_tsv_files(args.file_paths, args.file_pattern)
@@ -1019,10 +878,19 @@ if __name__ == "__main__":
     display_company_statistics(
         file_paths=args.file_paths,
         top_n=args.top_n,
+        state=args.state,
+        year=args.year,
         employer_name_column=args.employer_name_column,
         output_file=args.output_file,
         use_normalized_names=args.normalized_names,
         column_divider=args.column_divider,
         whitelist_file=args.whitelist,
-        use_pandas = not args.no_use_pandas
+        use_pandas = not args.no_use_pandas,
+        workers=args.workers,
+        linkage=args.linkage,
+        canonical=args.canonical,
+        match_cache=args.match_cache,
+        state_file=args.state_file,
+        cache_dir=args.cache_dir,
+        cache_format=args.cache_format
     )
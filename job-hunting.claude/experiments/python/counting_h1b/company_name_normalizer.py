@@ -3,124 +3,208 @@ Company Name Normalizer
 
 This module provides functions to normalize company names by removing entity types,
 punctuation, and standardizing formats.
+
+All rule tables are compiled once at import time. Stages whose rules must run one after
+the other first check a single combined pattern and are skipped when no rule can match,
+and the abbreviation table is applied in a single pass with a dict-based replacement.
 """
 
 import re
 from typing import Dict, List, Set
 
+# DBA (Doing Business As) and FKA (Formerly Known As) variations, removed up to the end of the name
+DBA_PATTERNS = [
+    # DBA variations
+    r' D\W?B\W?A\W?( .*)?$',
+    r' DOING BUSINESS AS .*$',
+    r' D/B/A .*$',
+    r' DBA .*$',
+    # FKA variations
+    r' PREVIOUSLY N.*$',
+    r' P\W?K\W?A\W?( .*)?$',
+    r' F\W?K\W?A\W?( .*)?$',
+    r' FORMERLY KNOWN AS .*$',
+    r' F/K/A .*$',
+    r' FKA .*$'
+]
+
+# Entity type identifiers, removed keeping the space or end that follows them
+ENTITY_TYPE_PATTERNS = [
+    r' ?P\W*L\W*L\W*C\W*($| )',
+    r' ?L\W*L\W*C\W*($| )',
+    r' ?L\W*L\W*P\W*($| )',
+    r' ?L\W*P\W*($| )',
+    r' ?P\W*[ACS]\W*($| )',
+    r' ?INC\W*( |$)',
+    r' ?CORP\W*( |$)',
+    r' ?LTD\W*( |$)',
+]
+
+# Words and their standardized abbreviation, in the order the rules apply
+ABBREVIATIONS = [
+    (['CORPORATION'], 'CORP'),
+    (['CORPORAT'], 'CORP'),
+    (['LIMITED'], 'LTD'),
+    (['COMPANY'], 'CO'),
+    (['INTERNATIONAL'], 'INTL'),
+    (['SERVICE', 'SERVICES'], 'SVC'),
+    (['SERVIC', 'SERVICS'], 'SVC'),
+    (['SERVI', 'SERVIS'], 'SVC'),
+    (['SERV', 'SERVS'], 'SVC'),
+    (['HEALTH'], 'HLTH'),
+    (['TECHNOLOG', 'TECHNOLOGY', 'TECHNOLOGIES'], 'TECH'),
+    (['SOLUTION', 'SOLUTIONS'], 'SOLN'),
+    (['SYSTEM', 'SYSTEMS'], 'SYS'),
+    (['SOFTWARE'], 'SOFT'),
+    (['INCORPORATE', 'INCORPORATED'], 'INC'),
+    (['COMPUTER', 'COMPUTERS'], 'COMP'),
+    (['NORTHWEST'], 'NW'),
+    (['SOUTHWEST'], 'SW'),
+    (['NORTHEAST'], 'NE'),
+    (['SOUTHEAST'], 'SE'),
+    (['EASTERN'], 'EAST'),
+    (['WESTERN'], 'WEST'),
+    (['MIDWEST'], 'MW'),
+    (['MIDDLE'], 'MID'),
+    (['WASHINGTON'], 'WA'),
+    (['COOPERATIVE'], 'COOP'),
+    (['MEDICAL', 'MEDICINE', 'MEDICINAL'], 'MED'),
+    (['LABORATORY', 'LABORATORIES'], 'LAB'),
+    (['CENT', 'CENTS', 'CENTER', 'CENTERS'], 'CTR'),
+    (['SAINT', 'SAINTS'], 'ST'),
+    (['CHURCH', 'CHURCHES'], 'CH'),
+    (['PRODUCE'], 'PROD'),
+    (['PRODUCTION', 'PRODUCTIONS'], 'PROD'),
+]
+
+# Words that keep their plural S after being abbreviated
+PLURAL_ABBREVIATIONS = {'SERVICES', 'SERVICS', 'SERVIS', 'SERVS', 'SOLUTIONS', 'CENTS', 'CENTERS', 'PRODUCTIONS'}
+
+SPECIAL_CASES = [
+    (r'^FACEBOOK\W.*$', 'META'),
+    (r'^ALPHABET\W.*$', 'GOOGLE')
+]
+
+BIG_CORP_FIRST_NAMES = ['MICROSOFT', 'GOOGLE', 'META', 'CISCO', 'ORACLE', 'IBM',
+                        'INTEL', 'NVIDIA', 'AMD', 'QUALCOMM', 'NINTENDO', 'SONY',
+                        'APPLE PAYMENTS', 'PROVIDENCE']
+
+COMMON_WORDS = [' AND ', ' OF ', ' THE ', ' FOR ', ' IN ', ' AT ']
+
+# Characters replaced by a space, dots between words and their replacement, and remaining punctuation
+SEPARATORS = '&+,%-'
+DOT_PATTERNS = [
+    (r'(\w)\.(\w{2})', r'\1 \2'),
+    (r'(\w{2})\.(\w)', r'\1 \2'),
+    (r'(\w)\.(\w)', r'\1\2'),
+]
+PUNCTUATION_PATTERN = r'[^\w ]'
+
+
+def _any_of(patterns: List[str]) -> re.Pattern:
+    """Compile a pattern matching wherever any of the given patterns matches."""
+    return re.compile('|'.join(f'(?:{pattern})' for pattern in patterns))
+
+
+def _keep_group(m: re.Match) -> str:
+    """Replace a match with its first group, or nothing if the group did not match."""
+    return m.group(1) if m.group(1) else ''
+
+
+_DBA_RULES = [re.compile(pattern) for pattern in DBA_PATTERNS]
+_DBA_TRIGGER = _any_of(DBA_PATTERNS)
+
+_ENTITY_TYPE_RULES = [re.compile(pattern) for pattern in ENTITY_TYPE_PATTERNS]
+_ENTITY_TYPE_TRIGGER = _any_of(ENTITY_TYPE_PATTERNS)
+
+# Word -> (abbreviation, rule number); the rules never share a word
+_ABBREVIATION_TABLE: Dict[str, tuple] = {
+    word: (abbreviation + ('S' if word in PLURAL_ABBREVIATIONS else ''), rule)
+    for rule, (words, abbreviation) in enumerate(ABBREVIATIONS)
+    for word in words
+}
+# The trailing space is not consumed, so the next word can still be abbreviated
+_ABBREVIATION_PATTERN = re.compile(
+    r' (' + '|'.join(sorted(_ABBREVIATION_TABLE, key=len, reverse=True)) + r')\W?(?= |$)')
+
+_SPECIAL_CASE_RULES = [(re.compile(pattern), replacement) for pattern, replacement in SPECIAL_CASES]
+
+_SEPARATORS = str.maketrans(SEPARATORS, ' ' * len(SEPARATORS))
+_DOT_RULES = [(re.compile(pattern), replacement) for pattern, replacement in DOT_PATTERNS]
+_PUNCTUATION = re.compile(PUNCTUATION_PATTERN)
+
+_BIG_CORPORATION = re.compile('^(?:' + '|'.join(BIG_CORP_FIRST_NAMES) + r')\W')
+_FIRST_WORD = re.compile(r"^(\w+)\W.*")
+
+
+class _AbbreviationReplacer:
+    """
+    Replacement function of the single-pass abbreviation pattern.
+
+    Applying each rule with its own re.sub consumes the space after every replaced word,
+    so a word right after another word of the same rule is left as is. This keeps track
+    of the previous match to give the same result.
+    """
+
+    def __init__(self):
+        self.end = -1
+        self.rule = -1
+        self.replaced = False
+
+    def __call__(self, m: re.Match) -> str:
+        abbreviation, rule = _ABBREVIATION_TABLE[m.group(1)]
+        blocked = self.replaced and rule == self.rule and m.start() == self.end
+        self.end, self.rule, self.replaced = m.end(), rule, not blocked
+        return m.group(0) if blocked else ' ' + abbreviation
+
+
 def remove_dba(name: str) -> str:
     """Remove DBA (Doing Business As) and FKA (Formerly Known As) variations from company name."""
-    patterns = [
-        # DBA variations
-        r' D\W?B\W?A\W?( .*)?$',
-        r' DOING BUSINESS AS .*$',
-        r' D/B/A .*$',
-        r' DBA .*$',
-        # FKA variations
-        r' PREVIOUSLY N.*$',
-        r' P\W?K\W?A\W?( .*)?$',
-        r' F\W?K\W?A\W?( .*)?$',
-        r' FORMERLY KNOWN AS .*$',
-        r' F/K/A .*$',
-        r' FKA .*$'
-    ]
-    for pattern in patterns:
-        name = re.sub(pattern, '', name)
+    if not _DBA_TRIGGER.search(name):
+        return name
+    for pattern in _DBA_RULES:
+        name = pattern.sub('', name)
     return name
 
 def remove_entity_types(name: str) -> str:
     """Remove common entity type identifiers from company name."""
-    patterns = [
-        (r' ?P\W*L\W*L\W*C\W*($| )', lambda m: m.group(1) if m.group(1) else ''),
-        (r' ?L\W*L\W*C\W*($| )', lambda m: m.group(1) if m.group(1) else ''),
-        (r' ?L\W*L\W*P\W*($| )', lambda m: m.group(1) if m.group(1) else ''),
-        (r' ?L\W*P\W*($| )', lambda m: m.group(1) if m.group(1) else ''),
-        (r' ?P\W*[ACS]\W*($| )', lambda m: m.group(1) if m.group(1) else ''),
-        (r' ?INC\W*( |$)', lambda m: m.group(1) if m.group(1) else ''),
-        (r' ?CORP\W*( |$)', lambda m: m.group(1) if m.group(1) else ''),
-        (r' ?LTD\W*( |$)', lambda m: m.group(1) if m.group(1) else ''),
-    ]
-    for pattern, replacement in patterns:
-        name = re.sub(pattern, replacement, name)
+    if not _ENTITY_TYPE_TRIGGER.search(name):
+        return name
+    for pattern in _ENTITY_TYPE_RULES:
+        name = pattern.sub(_keep_group, name)
     return name
 
 def standardize_abbreviations(name: str) -> str:
     """Convert common words to their standardized abbreviations."""
-    replacements = [
-        (r' CORPORATION\W?( |$)', lambda m: ' CORP' + m.group(1)),
-        (r' CORPORAT\W?( |$)', lambda m: ' CORP' + m.group(1)),
-        (r' LIMITED\W?( |$)', lambda m: ' LTD' + m.group(1)),
-        (r' COMPANY\W?( |$)', lambda m: ' CO' + m.group(1)),
-        (r' INTERNATIONAL\W?( |$)', lambda m: ' INTL' + m.group(1)),
-        (r' SERVICE(S?)\W?( |$)', lambda m: ' SVC' + m.group(1) + m.group(2)),
-        (r' SERVIC(S?)\W?( |$)', lambda m: ' SVC' + m.group(1) + m.group(2)),
-        (r' SERVI(S?)\W?( |$)', lambda m: ' SVC' + m.group(1) + m.group(2)),
-        (r' SERV(S?)\W?( |$)', lambda m: ' SVC' + m.group(1) + m.group(2)),
-        (r' HEALTH\W?( |$)', lambda m: ' HLTH' + m.group(1)),
-        (r' TECHNOLOG(?:IES|Y)?\W?( |$)', lambda m: ' TECH' + m.group(1)),
-        (r' SOLUTION(S?)\W?( |$)', lambda m: ' SOLN' + m.group(1) + m.group(2)),
-        (r' SYSTEMS?\W?( |$)', lambda m: ' SYS' + m.group(1)),
-        (r' SOFTWARE\W?( |$)', lambda m: ' SOFT' + m.group(1)),
-        (r' INCORPORATED?\W?( |$)', lambda m: ' INC' + m.group(1)),
-        (r' COMPUTERS?\W?( |$)', lambda m: ' COMP' + m.group(1)),
-        (r' NORTHWEST\W?( |$)', lambda m: ' NW' + m.group(1)),
-        (r' SOUTHWEST\W?( |$)', lambda m: ' SW' + m.group(1)),
-        (r' NORTHEAST\W?( |$)', lambda m: ' NE' + m.group(1)),
-        (r' SOUTHEAST\W?( |$)', lambda m: ' SE' + m.group(1)),
-        (r' EASTERN\W?( |$)', lambda m: ' EAST' + m.group(1)),
-        (r' WESTERN\W?( |$)', lambda m: ' WEST' + m.group(1)),
-        (r' MIDWEST\W?( |$)', lambda m: ' MW' + m.group(1)),
-        (r' MIDDLE\W?( |$)', lambda m: ' MID' + m.group(1)),
-        (r' WASHINGTON\W?( |$)', lambda m: ' WA' + m.group(1)),
-        (r' COOPERATIVE\W?( |$)', lambda m: ' COOP' + m.group(1)),
-        (r' (?:MEDICAL|MEDICINE|MEDICINAL)\W?( |$)', lambda m: ' MED' + m.group(1)),
-        (r' LABORATOR(?:Y|IES)\W?( |$)', lambda m: ' LAB' + m.group(1)),
-        (r' CENT(?:ER)?(S?)\W?( |$)', lambda m: ' CTR' + m.group(1) + m.group(2)),
-        (r' SAINTS?\W?( |$)', lambda m: ' ST' + m.group(1)),
-        (r' CHURCH(?:ES)?\W?( |$)', lambda m: ' CH' + m.group(1)),
-        (r' PRODUCE\W?( |$)', lambda m: ' PROD' + m.group(1)),
-        (r' PRODUCTION(S?)\W?( |$)', lambda m: ' PROD' + m.group(1) + m.group(2))
-    ]
-    for pattern, replacement in replacements:
-        name = re.sub(pattern, replacement, name)
-    return name
+    return _ABBREVIATION_PATTERN.sub(_AbbreviationReplacer(), name)
 
 def handle_special_cases(name: str) -> str:
     """Handle special cases like Facebook -> Meta, Alphabet -> Google."""
-    special_cases = [
-        (r'^FACEBOOK\W.*$', 'META'),
-        (r'^ALPHABET\W.*$', 'GOOGLE')
-    ]
-    for pattern, replacement in special_cases:
-        if re.match(pattern, name):
+    for pattern, replacement in _SPECIAL_CASE_RULES:
+        if pattern.match(name):
             return replacement
     return name
 
 def normalize_punctuation(name: str) -> str:
     """Normalize punctuation and spacing in company name."""
     # Replace common separators with spaces
-    name = re.sub(r'[&+,%-]', ' ', name)
+    name = name.translate(_SEPARATORS)
 
     # Handle dots between words
-    name = re.sub(r'(\w)\.(\w{2})', lambda m: m.group(1) + ' ' + m.group(2), name)
-    name = re.sub(r'(\w{2})\.(\w)', lambda m: m.group(1) + ' ' + m.group(2), name)
-    name = re.sub(r'(\w)\.(\w)', lambda m: m.group(1) + m.group(2), name)
+    if '.' in name:
+        for pattern, replacement in _DOT_RULES:
+            name = pattern.sub(replacement, name)
 
     # Remove remaining punctuation
-    name = re.sub(r'[^\w ]', '', name)
+    name = _PUNCTUATION.sub('', name)
 
     # Normalize spaces
-    name = re.sub(r'\s+', ' ', name)
-    return name.strip()
+    return ' '.join(name.split())
 
 def handle_big_corporations(name: str) -> str:
     """Handle special cases for big corporations."""
-    big_corp_first_names = ['MICROSOFT', 'GOOGLE', 'META', 'CISCO', 'ORACLE', 'IBM',
-                           'INTEL', 'NVIDIA', 'AMD', 'QUALCOMM', 'NINTENDO', 'SONY',
-                           'APPLE PAYMENTS', 'PROVIDENCE']
-
-    if any(bool(re.match(f"^{corp}\\W", name)) for corp in big_corp_first_names):
-        return re.sub(r"^(\w+)\W.*", lambda m: m.group(1), name)
+    if _BIG_CORPORATION.match(name):
+        return _FIRST_WORD.sub(lambda m: m.group(1), name)
     return name
 
 def handle_amazon_cases(name: str) -> str:
@@ -138,20 +222,10 @@ def remove_common_words(name: str) -> str:
     if name.startswith("AT T"):
         return name
 
-    patterns = [
-        r' AND ',
-        r' OF ',
-        r' THE ',
-        r' FOR ',
-        r' IN ',
-        r' AT ',
-    ]
-
-
-    for pattern in patterns:
+    for pattern in COMMON_WORDS:
         name = name.replace(pattern, ' ')
     # Clean up any double spaces created
-    return re.sub(r'\s+', ' ', re.sub(r'THE ', '', name)).strip()
+    return ' '.join(name.replace('THE ', '').split())
 
 def normalize_company_name(name: str) -> str:
     """
@@ -169,8 +243,20 @@ def normalize_company_name(name: str) -> str:
     # Convert to uppercase
     name = name.upper()
 
+    # First normalize punctuation so D/B/A becomes DBA
+    return normalize_punctuated_name(normalize_punctuation(name))
+
+def normalize_punctuated_name(name: str) -> str:
+    """
+    Apply the transformations that follow normalize_punctuation.
+
+    Args:
+        name (str): Uppercase company name, already passed through normalize_punctuation
+
+    Returns:
+        str: Normalized company name
+    """
     # Apply transformations in order
-    name = normalize_punctuation(name)  # First normalize punctuation so D/B/A becomes DBA
     name = remove_dba(name)  # Then remove DBA and variants
     name = handle_special_cases(name)
     name = remove_common_words(name)
@@ -180,5 +266,4 @@ def normalize_company_name(name: str) -> str:
     name = handle_amazon_cases(name)
 
     # Final cleanup
-    name = re.sub(r'\s+', ' ', name)
-    return name.strip()
+    return ' '.join(name.split())
@@ -0,0 +1,154 @@
+"""
+Company Name Parallel Grouping
+
+This module spreads the scoring of candidate pairs over several processes. The names
+and their normalized form are sent to each worker once, when the pool starts, and every
+worker builds its own CompanyNameIndex. Work units are ranges of name positions: a
+worker returns, for each name of its range, the later names that reach the threshold.
+
+The partial results are merged in the main process into a SimilarityGraph, which groups
+the names in name order, so the groups do not depend on the number of workers or on the
+order in which the work units finish.
+
+Usage:
+    from company_name_parallel import group_similar_names_parallel
+
+    groups = group_similar_names_parallel(company_names, threshold=0.85, workers=8)
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Mapping, Optional, Sequence, Tuple
+from company_name_blocking import CompanyNameIndex, group_similar_names
+from company_name_cache import normalize_many
+from company_name_similarity import get_lcs_backend, set_lcs_backend
+from company_name_clustering import (
+    CENTER_LINKAGE,
+    FIRST_NAME,
+    Matches,
+    SimilarityGraph,
+    match_range,
+)
+
+# Number of work units per worker, so that slow ranges do not leave workers idle
+CHUNKS_PER_WORKER = 8
+
+# Workers start a fresh interpreter, forking a process that runs threads can deadlock
+MP_CONTEXT = 'spawn'
+
+# Index of the worker process, built once by _init_worker
+_worker_index: Optional[CompanyNameIndex] = None
+
+
+def default_workers() -> int:
+    """Get the number of CPU cores available to this process."""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _init_worker(names: List[str], normalized: List[str], lcs_backend: str):
+    """Build the index of the worker process from the pre-normalized names."""
+    global _worker_index
+    set_lcs_backend(lcs_backend)
+    _worker_index = CompanyNameIndex(names, normalized)
+
+
+def _match_chunk(bounds: Tuple[int, int], threshold: float,
+                 first_new: int) -> List[Tuple[int, List[Tuple[int, float]]]]:
+    """Find the matches of a range of positions in the worker process."""
+    start, stop = bounds
+    return match_range(_worker_index, start, stop, threshold, first_new)
+
+
+def find_matches(index: CompanyNameIndex, threshold: float, workers: int,
+                 chunk_size: Optional[int] = None, first_new: int = 0) -> Matches:
+    """
+    Find the later names that reach the threshold with each name, using a process pool.
+
+    Args:
+        index (CompanyNameIndex): Index of the names
+        threshold (float): Minimum similarity score for a match
+        workers (int): Number of worker processes
+        chunk_size (int, optional): Number of positions per work unit. Defaults to
+            splitting the names in CHUNKS_PER_WORKER units per worker.
+        first_new (int, optional): Only pairs with at least one name at or after this
+            position are scored. Defaults to 0.
+
+    Returns:
+        dict: Mapping from each position with matches to the (later position, score)
+            tuples of the names it matches, sorted by position
+    """
+    count = len(index)
+    if workers <= 1:
+        return dict(match_range(index, 0, count, threshold, first_new))
+    if chunk_size is None:
+        chunk_size = max(1, -(-count // (workers * CHUNKS_PER_WORKER)))
+    chunks = [(start, min(start + chunk_size, count)) for start in range(0, count, chunk_size)]
+
+    matches = {}
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(MP_CONTEXT),
+                             initializer=_init_worker, initargs=(index.names, index.normalized, get_lcs_backend())) as executor:
+        for partial in executor.map(_match_chunk, chunks, [threshold] * len(chunks), [first_new] * len(chunks)):
+            matches.update(partial)
+    return matches
+
+
+def build_similarity_graph(company_names: Sequence[str], threshold: float,
+                           workers: Optional[int] = None,
+                           chunk_size: Optional[int] = None) -> SimilarityGraph:
+    """
+    Score the candidate pairs of company names, in several processes.
+
+    Args:
+        company_names (Sequence[str]): Company names, possibly repeated
+        threshold (float): Minimum similarity score of the pairs kept
+        workers (int, optional): Number of worker processes. Defaults to the number of
+            CPU cores. With 1 worker, pairs are scored in this process.
+        chunk_size (int, optional): Number of names per work unit. Defaults to None.
+
+    Returns:
+        SimilarityGraph: Graph of the distinct names and the pairs reaching the threshold
+    """
+    if workers is None:
+        workers = default_workers()
+
+    names = list(dict.fromkeys(company_names))
+    index = CompanyNameIndex(names, normalize_many(names))
+    return SimilarityGraph(names, find_matches(index, threshold, workers, chunk_size), threshold)
+
+
+def group_similar_names_parallel(company_names: Sequence[str], threshold: float,
+                                 workers: Optional[int] = None,
+                                 chunk_size: Optional[int] = None,
+                                 linkage: str = CENTER_LINKAGE, canonical: str = FIRST_NAME,
+                                 approvals: Optional[Mapping[str, int]] = None) -> List[Tuple[str, List[str]]]:
+    """
+    Group similar company names like group_similar_names, scoring pairs in several processes.
+
+    Args:
+        company_names (Sequence[str]): Company names to group
+        threshold (float): Minimum similarity score to consider companies as matches
+        workers (int, optional): Number of worker processes. Defaults to the number of
+            CPU cores. With 1 worker, names are grouped in this process.
+        chunk_size (int, optional): Number of names per work unit. Defaults to None.
+        linkage (str, optional): Linkage policy, see company_name_clustering. Defaults to
+            CENTER_LINKAGE.
+        canonical (str, optional): Canonical name rule, see company_name_clustering.
+            Defaults to FIRST_NAME.
+        approvals (Mapping[str, int], optional): Number of approvals of each name, for the
+            MOST_APPROVALS rule. Defaults to None.
+
+    Returns:
+        list: List of (canonical name, group) tuples, including single name groups
+    """
+    if workers is None:
+        workers = default_workers()
+
+    # The greedy pass alone skips the pairs of names already grouped
+    if workers <= 1 and linkage == CENTER_LINKAGE and canonical == FIRST_NAME:
+        return group_similar_names(company_names, threshold)
+
+    graph = build_similarity_graph(company_names, threshold, workers, chunk_size)
+    return graph.groups(threshold, linkage, canonical, approvals)
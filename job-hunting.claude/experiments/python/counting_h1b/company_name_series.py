@@ -0,0 +1,74 @@
+"""
+Company Name Series
+
+This module normalizes whole pandas columns of company names. Employer names repeat a
+lot across fiscal years and states, so only the distinct values of a column are
+normalized and the results are mapped back to every row. The uppercase, punctuation and
+whitespace stages run as pandas .str operations over the distinct values, and the
+remaining stages of company_name_normalizer run once per distinct value.
+
+Usage:
+    from company_name_series import normalize_series
+
+    df['Employer (Petitioner) Name'] = normalize_series(df['Employer (Petitioner) Name'])
+"""
+
+import pandas as pd
+from company_name_normalizer import (
+    DOT_PATTERNS,
+    PUNCTUATION_PATTERN,
+    SEPARATORS,
+    normalize_punctuated_name,
+)
+
+_SEPARATORS = str.maketrans(SEPARATORS, ' ' * len(SEPARATORS))
+
+
+def normalize_punctuation_series(names: pd.Series) -> pd.Series:
+    """
+    Normalize punctuation and spacing of a column of company names.
+
+    Args:
+        names (pd.Series): Company names, without missing values
+
+    Returns:
+        pd.Series: Same result as normalize_punctuation applied to each name
+    """
+    # Object dtype keeps Python regex semantics, string dtypes may use another engine
+    names = names.astype(object)
+
+    # Replace common separators with spaces
+    names = names.str.translate(_SEPARATORS)
+
+    # Handle dots between words
+    for pattern, replacement in DOT_PATTERNS:
+        names = names.str.replace(pattern, replacement, regex=True)
+
+    # Remove remaining punctuation
+    names = names.str.replace(PUNCTUATION_PATTERN, '', regex=True)
+
+    # Normalize spaces
+    return names.str.replace(r'\s+', ' ', regex=True).str.strip()
+
+
+def normalize_series(names: pd.Series) -> pd.Series:
+    """
+    Normalize a column of company names, running the normalizer once per distinct name.
+
+    Args:
+        names (pd.Series): Raw company names, possibly repeated or missing
+
+    Returns:
+        pd.Series: Normalized name of each row, with the index and name of the input.
+            Missing names stay missing.
+    """
+    codes, uniques = pd.factorize(names)
+    uniques = pd.Series(uniques, dtype=object)
+
+    # Empty names are returned as is by normalize_company_name
+    prepared = normalize_punctuation_series(uniques.str.upper())
+    normalized = [normalize_punctuated_name(name) if raw else ""
+                  for raw, name in zip(uniques, prepared)]
+
+    values = pd.api.extensions.take(pd.array(normalized, dtype=object), codes, allow_fill=True)
+    return pd.Series(values, index=names.index, name=names.name, dtype=object)
@@ -0,0 +1,267 @@
+"""
+Company Name Similarity
+
+This module provides the similarity score used to decide whether two company names
+refer to the same employer. It combines the ratio of shared non-common words with the
+longest common substring of the normalized names.
+
+Names can be scored from their raw form with calculate_similarity, or tokenized once
+with tokenize_name and scored with score_normalized, which does no regex work.
+
+The longest common substring is computed by a pluggable backend, chosen once per process
+with set_lcs_backend. Every backend returns the length difflib.SequenceMatcher finds:
+    difflib: SequenceMatcher.find_longest_match, the reference
+    fast: grows the longest match while scanning the shorter name, with substring
+        searches done by str.__contains__ (default)
+    rapidfuzz: the longest common prefix of all the suffix pairs, computed by
+        rapidfuzz.process.cdist (only when rapidfuzz is installed)
+"""
+
+import re
+from collections import namedtuple
+from difflib import SequenceMatcher
+from typing import Callable, Dict
+from company_name_cache import normalize_cached
+
+try:
+    from rapidfuzz import process as rapidfuzz_process
+    from rapidfuzz.distance import Prefix
+except ImportError:
+    rapidfuzz_process = Prefix = None
+
+# Words too common in employer names to be evidence that two names match
+COMMON_BUSINESS_WORDS = {
+    'TECH', 'HLTH', 'SRVCS', 'SRVC', 'OF', 'SOLNS', 'SOLN', 'CONSULTING', 'WA', 'SEATTLE', 'USA', 'CTR', 'MANAGEMENT',
+    'B', 'PS', 'D', 'A', 'THE', 'LABS', 'LAB', 'NW', 'CONSTRUCTION', 'COM', 'SCHOOL', 'INSTITUTE', 'RESEARCH', 'FOR',
+    'US', 'S', 'ASSOCIATES', 'ENGINEERING', 'ARCHITECTURE', 'DEVELOPMENT', 'AMERICA', 'COMMUNITY', 'CAPITAL', 'AI',
+    'INTL', 'MED', 'L', 'FOUNDATION', 'DESIGN', 'AI', 'SYS', 'GROUP',  'CAPITAL', 'CORP', 'GLOBAL', 'WORLD', 'AMERICAN',
+    'ENTERPRISES', 'INDUSTRIES', 'ASSOCIATES', 'CARE', 'HIGH', 'NORTH', 'SOUTH', 'EAST', 'WEST', 'REGIONAL', 'PLAN'
+}
+
+# Weights of the word-based and substring-based parts of the score
+UNIQUE_WORD_WEIGHT = 0.7
+LCS_WEIGHT = 0.3
+
+# Below 2 matching unique words, the names must share a substring at least this long (relative)
+MIN_SINGLE_WORD_LCS_RATIO = 0.5
+
+# Names of the longest common substring backends
+DIFFLIB_LCS = 'difflib'
+FAST_LCS = 'fast'
+RAPIDFUZZ_LCS = 'rapidfuzz'
+
+# Second names this long make SequenceMatcher ignore popular characters, so the other
+# backends defer to it to return the same lengths
+AUTOJUNK_LENGTH = 200
+
+# Specific corporate families and their known subsidiaries
+AMAZON_PATTERN = re.compile(r'^AMAZON\W')
+APPLE_PATTERN = re.compile(r'^APPLE(?:\s+(?:PAYMENTS|INC))?$')
+
+
+def corporate_family(norm: str) -> str:
+    """
+    Get the corporate family a normalized name always matches, if any.
+
+    Args:
+        norm (str): Normalized company name
+
+    Returns:
+        str: 'AMAZON' or 'APPLE' for names in those families, otherwise an empty string
+    """
+    if AMAZON_PATTERN.match(norm) and "PRODUCE" not in norm:
+        return 'AMAZON'
+    if APPLE_PATTERN.match(norm):
+        return 'APPLE'
+    return ''
+
+
+def difflib_longest_common_substring(norm1: str, norm2: str) -> int:
+    """
+    Get the length of the longest common substring with difflib, the reference backend.
+
+    Args:
+        norm1 (str): First normalized company name
+        norm2 (str): Second normalized company name
+
+    Returns:
+        int: Length of the longest common substring
+    """
+    matcher = SequenceMatcher(None, norm1, norm2)
+    return matcher.find_longest_match(0, len(norm1), 0, len(norm2)).size
+
+
+def fast_longest_common_substring(norm1: str, norm2: str) -> int:
+    """
+    Get the length of the longest common substring by growing the longest match.
+
+    Each position of the shorter name only has to be checked for a match one character
+    longer than the longest one found so far, so there are at most as many substring
+    searches as characters in the shorter name plus the length of the match.
+
+    Args:
+        norm1 (str): First normalized company name
+        norm2 (str): Second normalized company name
+
+    Returns:
+        int: Length of the longest common substring
+    """
+    if len(norm2) >= AUTOJUNK_LENGTH:
+        return difflib_longest_common_substring(norm1, norm2)
+    shorter, longer = (norm1, norm2) if len(norm1) <= len(norm2) else (norm2, norm1)
+    best = 0
+    for start in range(len(shorter)):
+        if len(shorter) - start <= best:
+            break
+        while start + best < len(shorter) and shorter[start:start + best + 1] in longer:
+            best += 1
+    return best
+
+
+def rapidfuzz_longest_common_substring(norm1: str, norm2: str) -> int:
+    """
+    Get the length of the longest common substring with rapidfuzz.
+
+    The longest common substring is the longest common prefix of a suffix of each name,
+    and rapidfuzz compares every pair of suffixes in a single call.
+
+    Args:
+        norm1 (str): First normalized company name
+        norm2 (str): Second normalized company name
+
+    Returns:
+        int: Length of the longest common substring
+    """
+    if len(norm2) >= AUTOJUNK_LENGTH:
+        return difflib_longest_common_substring(norm1, norm2)
+    if not norm1 or not norm2:
+        return 0
+    prefixes = rapidfuzz_process.cdist([norm1[i:] for i in range(len(norm1))], [norm2[j:] for j in range(len(norm2))],
+                                       scorer=Prefix.similarity)
+    return int(prefixes.max())
+
+
+# Longest common substring backends, by name
+LCS_BACKENDS: Dict[str, Callable[[str, str], int]] = {
+    DIFFLIB_LCS: difflib_longest_common_substring,
+    FAST_LCS: fast_longest_common_substring,
+}
+if rapidfuzz_process is not None:
+    LCS_BACKENDS[RAPIDFUZZ_LCS] = rapidfuzz_longest_common_substring
+
+DEFAULT_LCS_BACKEND = FAST_LCS
+
+# Backend used by score_normalized, chosen with set_lcs_backend
+_lcs_backend = DEFAULT_LCS_BACKEND
+
+
+def set_lcs_backend(name: str):
+    """
+    Choose the longest common substring backend of this process.
+
+    Args:
+        name (str): One of LCS_BACKENDS
+    """
+    global _lcs_backend
+    if name not in LCS_BACKENDS:
+        raise ValueError(f"Unknown longest common substring backend {name!r}, expected one of {sorted(LCS_BACKENDS)}")
+    _lcs_backend = name
+
+
+def get_lcs_backend() -> str:
+    """Get the name of the longest common substring backend of this process."""
+    return _lcs_backend
+
+
+# Normalized company name with the parts the score is computed from
+NormalizedName = namedtuple('NormalizedName', ['norm', 'tokens', 'unique_words', 'family'])
+
+
+def tokenize_name(norm: str) -> NormalizedName:
+    """
+    Split a normalized company name into the tokens used by the score.
+
+    Args:
+        norm (str): Normalized company name
+
+    Returns:
+        NormalizedName: The name, its tokens, its non-common tokens and its corporate family
+    """
+    tokens = frozenset(norm.split())
+    unique_words = frozenset(w for w in tokens if w not in COMMON_BUSINESS_WORDS)
+    return NormalizedName(norm, tokens, unique_words, corporate_family(norm) if norm else '')
+
+
+def calculate_similarity(name1: str, name2: str) -> float:
+    """
+    Calculate similarity between two company names.
+
+    Args:
+        name1 (str): First company name
+        name2 (str): Second company name
+
+    Returns:
+        float: Similarity score between 0 and 1
+    """
+    # Normalize both names, once per distinct name
+    return score_normalized(tokenize_name(normalize_cached(name1)), tokenize_name(normalize_cached(name2)))
+
+
+def score_normalized(name1: NormalizedName, name2: NormalizedName) -> float:
+    """
+    Calculate similarity between two tokenized company names.
+
+    Args:
+        name1 (NormalizedName): First company name, from tokenize_name
+        name2 (NormalizedName): Second company name, from tokenize_name
+
+    Returns:
+        float: Similarity score between 0 and 1
+    """
+    norm1 = name1.norm
+    norm2 = name2.norm
+
+    # Handle special cases
+    if not norm1 or not norm2:
+        return 0.0
+
+    if norm1 == norm2:
+        return 1.0
+
+    # Check if the names match specific corporate family patterns
+    if name1.family and name1.family == name2.family:
+        return 1.0
+
+    # Get tokens from both names, excluding common words
+    unique_words1 = name1.unique_words
+    unique_words2 = name2.unique_words
+
+    # If either name has no unique words after removing common words, return 0
+    if not unique_words1 or not unique_words2:
+        return 0
+
+    # Calculate number of matching unique words
+    matching_tokens = unique_words1.intersection(unique_words2)
+    num_matching = len(matching_tokens)
+
+    # If no unique words match, return 0
+    if num_matching == 0:
+        return 0
+
+    # Calculate longest common substring, only for names sharing unique words
+    lcs_size = LCS_BACKENDS[_lcs_backend](norm1, norm2)
+    lcs_ratio = lcs_size / max(len(norm1), len(norm2))
+
+    # Require at least 2 matching unique words or a very long common substring
+    if num_matching < 2 and lcs_ratio < MIN_SINGLE_WORD_LCS_RATIO:
+        return 0.0
+
+    # Calculate the ratio of matching unique words to total unique words
+    min_unique_words = min(len(name1.tokens), len(name2.tokens))
+    # Calculate word-based similarity
+    unique_word_ratio = num_matching / min_unique_words
+
+    # Combine scores
+    similarity = UNIQUE_WORD_WEIGHT * unique_word_ratio + LCS_WEIGHT * lcs_ratio
+
+    return similarity
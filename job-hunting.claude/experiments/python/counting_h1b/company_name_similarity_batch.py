@@ -0,0 +1,200 @@
+"""
+Company Name Similarity Batch
+
+This module scores whole blocks of candidate pairs with NumPy instead of calling
+score_normalized once per pair. Each tokenized name is encoded once: its non-common
+tokens as sorted token IDs (a sparse row of a name x token matrix), its token count, its
+corporate family and its characters as a row of code points padded to the longest name.
+
+For a block of pairs, the shared unique words are counted by sorting the token IDs of
+both names of every pair together, and the longest common substring is computed with a
+dynamic programming pass that walks the characters of the left names and updates the
+common suffix lengths of all the pairs at once. The special cases of score_normalized
+are then applied as masks, so the scores match the scalar function. Pairs whose second
+name has AUTOJUNK_LENGTH characters or more are scored by score_normalized.
+
+Usage:
+    from company_name_similarity_batch import NameMatrix
+
+    matrix = NameMatrix([tokenize_name(norm) for norm in normalized_names])
+    scores = matrix.score_pairs(left_positions, right_positions)
+"""
+
+from typing import Sequence
+import numpy as np
+from company_name_similarity import (
+    AUTOJUNK_LENGTH,
+    LCS_WEIGHT,
+    MIN_SINGLE_WORD_LCS_RATIO,
+    UNIQUE_WORD_WEIGHT,
+    NormalizedName,
+    score_normalized,
+)
+
+# Pairs scored at once
+DEFAULT_BLOCK_SIZE = 4096
+
+# Pairs whose longest common substrings are computed at once, bounding the memory of
+# their character arrays
+SUBSTRING_BLOCK_SIZE = 512
+
+# Padding of the character arrays, different for each side so padding never matches
+LEFT_PADDING = -1
+RIGHT_PADDING = -2
+
+
+class NameMatrix:
+    """Tokenized company names encoded as arrays for batched scoring"""
+
+    def __init__(self, names: Sequence[NormalizedName]):
+        """
+        Encode the names.
+
+        Args:
+            names (Sequence[NormalizedName]): Names from tokenize_name
+        """
+        self.names = list(names)
+
+        # Equal names and families only need to be compared as integers
+        norm_ids = {}
+        family_ids = {'': 0}
+        self.norm_ids = np.array([norm_ids.setdefault(name.norm, len(norm_ids)) for name in self.names], dtype=np.int64)
+        self.family_ids = np.array([family_ids.setdefault(name.family, len(family_ids)) for name in self.names],
+                                   dtype=np.int64)
+        self.token_counts = np.array([len(name.tokens) for name in self.names], dtype=np.int64)
+        self.lengths = np.array([len(name.norm) for name in self.names], dtype=np.int64)
+
+        # Sparse rows of unique word IDs, sorted within each row
+        vocabulary = {}
+        rows = [sorted(vocabulary.setdefault(word, len(vocabulary)) for word in name.unique_words)
+                for name in self.names]
+        self.vocabulary_size = max(len(vocabulary), 1)
+        self.word_counts = np.array([len(row) for row in rows], dtype=np.int64)
+        self.word_offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(self.word_counts, out=self.word_offsets[1:])
+        self.word_ids = np.array([word for row in rows for word in row], dtype=np.int64)
+
+        # Code points padded to the longest name
+        width = int(self.lengths.max()) if len(self.names) else 0
+        self.characters = np.full((len(self.names), width), LEFT_PADDING, dtype=np.int32)
+        for i, name in enumerate(self.names):
+            self.characters[i, :len(name.norm)] = [ord(c) for c in name.norm]
+
+    def __len__(self):
+        return len(self.names)
+
+    def _gather_words(self, rows: np.ndarray):
+        """Get the unique word IDs of some rows, with the position of their row in rows."""
+        counts = self.word_counts[rows]
+        owners = np.repeat(np.arange(len(rows)), counts)
+        starts = np.repeat(self.word_offsets[rows] - np.cumsum(counts) + counts, counts)
+        return owners, self.word_ids[starts + np.arange(len(owners))]
+
+    def matching_words(self, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+        """
+        Count the unique words each pair of names has in common.
+
+        Args:
+            left (np.ndarray): Positions of the first name of each pair
+            right (np.ndarray): Positions of the second name of each pair
+
+        Returns:
+            np.ndarray: Number of shared unique words of each pair
+        """
+        left_owners, left_words = self._gather_words(left)
+        right_owners, right_words = self._gather_words(right)
+
+        # Words are distinct within a name, so repeated keys are the shared words
+        keys = np.concatenate([left_owners * self.vocabulary_size + left_words,
+                               right_owners * self.vocabulary_size + right_words])
+        keys.sort()
+        shared = keys[1:][keys[1:] == keys[:-1]]
+        return np.bincount(shared // self.vocabulary_size, minlength=len(left))
+
+    def longest_common_substrings(self, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+        """
+        Get the length of the longest common substring of each pair of names.
+
+        Args:
+            left (np.ndarray): Positions of the first name of each pair
+            right (np.ndarray): Positions of the second name of each pair
+
+        Returns:
+            np.ndarray: Longest common substring length of each pair
+        """
+        if not len(left):
+            return np.zeros(0, dtype=np.int64)
+        left_width = int(self.lengths[left].max())
+        right_width = int(self.lengths[right].max())
+        left_chars = self.characters[left, :left_width]
+        right_chars = self.characters[right, :right_width]
+        right_chars = np.where(right_chars == LEFT_PADDING, RIGHT_PADDING, right_chars)
+
+        # suffix[p, b] is the length of the common suffix ending at the current left
+        # character and at character b - 1 of the right name
+        suffix = np.zeros((len(left), right_width + 1), dtype=np.int32)
+        best = np.zeros(len(left), dtype=np.int32)
+        for a in range(left_width):
+            equal = right_chars == left_chars[:, a:a + 1]
+            suffix[:, 1:] = np.where(equal, suffix[:, :-1] + 1, 0)
+            np.maximum(best, suffix.max(axis=1), out=best)
+        return best.astype(np.int64)
+
+    def score_pairs(self, left: Sequence[int], right: Sequence[int],
+                    block_size: int = DEFAULT_BLOCK_SIZE) -> np.ndarray:
+        """
+        Score pairs of names like score_normalized.
+
+        Args:
+            left (Sequence[int]): Positions of the first name of each pair
+            right (Sequence[int]): Positions of the second name of each pair
+            block_size (int, optional): Pairs scored at once. Defaults to DEFAULT_BLOCK_SIZE.
+
+        Returns:
+            np.ndarray: Similarity score of each pair
+        """
+        left = np.asarray(left, dtype=np.int64)
+        right = np.asarray(right, dtype=np.int64)
+        scores = np.zeros(len(left), dtype=np.float64)
+        for start in range(0, len(left), block_size):
+            block = slice(start, start + block_size)
+            scores[block] = self._score_block(left[block], right[block])
+        return scores
+
+    def _score_block(self, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+        """Score a block of pairs, computing substrings only for pairs sharing unique words."""
+        scores = np.zeros(len(left), dtype=np.float64)
+        left_lengths = self.lengths[left]
+        right_lengths = self.lengths[right]
+        non_empty = (left_lengths > 0) & (right_lengths > 0)
+
+        # Equal names and names of the same corporate family always match
+        same = non_empty & ((self.norm_ids[left] == self.norm_ids[right])
+                            | ((self.family_ids[left] > 0) & (self.family_ids[left] == self.family_ids[right])))
+        scores[same] = 1.0
+
+        num_matching = self.matching_words(left, right)
+        pending = np.flatnonzero(non_empty & ~same & (num_matching > 0))
+        if not len(pending):
+            return scores
+
+        # SequenceMatcher ignores popular characters of long second names, so score_normalized scores them
+        fallback = right_lengths[pending] >= AUTOJUNK_LENGTH
+        for p in pending[fallback]:
+            scores[p] = score_normalized(self.names[left[p]], self.names[right[p]])
+        pending = pending[~fallback]
+
+        # Similar lengths share a block, so the character arrays are not padded much
+        pending = pending[np.argsort(np.maximum(left_lengths[pending], right_lengths[pending]), kind='stable')]
+        for start in range(0, len(pending), SUBSTRING_BLOCK_SIZE):
+            part = pending[start:start + SUBSTRING_BLOCK_SIZE]
+            lcs = self.longest_common_substrings(left[part], right[part])
+            lcs_ratio = lcs / np.maximum(left_lengths[part], right_lengths[part])
+            matching = num_matching[part]
+            unique_word_ratio = matching / np.minimum(self.token_counts[left[part]], self.token_counts[right[part]])
+            similarity = UNIQUE_WORD_WEIGHT * unique_word_ratio + LCS_WEIGHT * lcs_ratio
+
+            # Require at least 2 matching unique words or a very long common substring
+            similarity[(matching < 2) & (lcs_ratio < MIN_SINGLE_WORD_LCS_RATIO)] = 0.0
+            scores[part] = similarity
+        return scores
@@ -7,7 +7,7 @@ a file containing only the unique normalized versions of those names.
 """
 
 import argparse
-from company_name_normalizer import normalize_company_name
+from company_name_cache import cache_info, normalize_cached, normalize_distinct
 
 def normalize_names(input_file, output_file):
     """
@@ -26,10 +26,10 @@ def normalize_names(input_file, output_file):
         print("\nDebug: First 5 names before normalization:")
         for name in list(names)[:6]:
             print(f"Before: {name}")
-            normalized = normalize_company_name(name)
+            normalized = normalize_cached(name)
             print(f"After:  {normalized}\n")
 
-        normalized_names = {normalize_company_name(name) for name in names}
+        normalized_names = set(normalize_distinct(names).values())
 
         # Sort the normalized names
         sorted_names = sorted(list(normalized_names))
@@ -41,6 +41,7 @@ def normalize_names(input_file, output_file):
 
         print(f"Processed {len(names)} names")
         print(f"Found {len(normalized_names)} unique normalized names")
+        print(f"Normalization cache: {cache_info()}")
         print(f"Output written to {output_file}")
 
     except Exception as e:
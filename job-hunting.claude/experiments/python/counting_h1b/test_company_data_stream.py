@@ -0,0 +1,199 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+from .company_data_stream import (COUNT_COLUMNS, NAICS_COLUMN, PARQUET_CACHE, NameAggregates, apply_filters,
+                                  detect_encoding, iter_chunks, iter_rows, parquet_copy, pq, read_parquet,
+                                  sniff_encoding, utf8_copy)
+from .company_name_matcher import aggregate_companies, get_top_companies, summarize_companies
+
+HEADER = ['Line by line', 'Fiscal Year', 'Employer (Petitioner) Name', 'Tax ID', NAICS_COLUMN,
+          'Petitioner City', 'Petitioner State'] + COUNT_COLUMNS
+
+ROWS = [
+    ['1', '2023', 'ACME INC', '1234', '54 - Professional', 'SEATTLE', 'WA', '1', '0', '2', '1'],
+    ['2', '2023', 'GLOBEX LLC', '', '51 - Information', 'AUSTIN', 'TX', '3', '1', '0', '0'],
+    ['3', '2024', 'ACME INC', '1234', '51 - Information', 'SEATTLE', 'WA', '2', '0', '1,234', '0'],
+    ['4', '2024', 'ACME, INC.', '', '', 'BOTHELL', 'WA', '1', '1', '1', '1'],
+    ['5', '2024', '', '', '54 - Professional', 'SEATTLE', 'WA', '5', '0', '0', '0'],
+    ['6', '2024', 'INITECH', '', 'Unknown', 'AUSTIN', 'TX', '0', '2', '0', '0'],
+]
+
+
+class TestCompanyDataStream(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'Employer Information.tsv')
+        with open(self.path, 'w', encoding='utf-16') as f:
+            for row in [HEADER] + ROWS:
+                f.write('\t'.join(row) + '\n')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_chunks_keep_used_columns(self):
+        chunks = list(iter_chunks(self.path, chunksize=4))
+        self.assertEqual([len(chunk) for chunk in chunks], [4, 2])
+        chunk = chunks[0]
+        self.assertNotIn('Petitioner City', chunk)
+        self.assertNotIn('Tax ID', chunk)
+        self.assertEqual(chunk['Fiscal Year'].tolist(), ['2023', '2023', '2024', '2024'])
+        # Thousands separators are dropped, and counts that are still not integers count as 0
+        self.assertEqual(chunk['Continuing Approval'].tolist(), [2, 0, 1234, 1])
+
+    def test_aggregates_match_whole_frame(self):
+        df = pd.read_csv(self.path, sep='\t', encoding='utf-16')
+        for chunksize in [1, 2, 4, 10]:
+            for compact_rows in [1, 100]:
+                for state_filter in [None, 'WA']:
+                    with self.subTest(chunksize=chunksize, compact_rows=compact_rows, state_filter=state_filter):
+                        aggregates = NameAggregates(compact_rows=compact_rows)
+                        for chunk in iter_chunks(self.path, chunksize=chunksize):
+                            aggregates.add(apply_filters(chunk, state_filter=state_filter))
+
+                        expected = apply_filters(df, state_filter=state_filter).copy()
+                        names = expected['Employer (Petitioner) Name'].dropna().unique().tolist()
+                        self.assertEqual(aggregates.names(), names)
+
+                        company_map = {name: name.replace(',', '').replace('.', '') for name in names}
+                        expected['Canonical Company'] = expected['Employer (Petitioner) Name'].map(company_map)
+                        pd.testing.assert_frame_equal(aggregates.by_canonical(company_map),
+                                                      aggregate_companies(expected))
+
+    def test_top_companies(self):
+        aggregates = NameAggregates()
+        for chunk in iter_chunks([self.path] * 3):
+            aggregates.add(chunk)
+        company_map = {name: name for name in aggregates.names()}
+        everything = summarize_companies(aggregates.by_canonical(company_map))
+        self.assertEqual(everything['Canonical Company'].tolist(), ['ACME INC', 'GLOBEX LLC', 'ACME, INC.'])
+
+        everything_rows = get_top_companies([self.path] * 3, use_pandas=False)
+        for top_n in [1, 2, 3, 5]:
+            with self.subTest(top_n=top_n):
+                top = summarize_companies(aggregates.by_canonical(company_map, top_n), top_n)
+                pd.testing.assert_frame_equal(top.reset_index(drop=True), everything.head(top_n).reset_index(drop=True))
+                self.assertEqual(get_top_companies([self.path] * 3, top_n=top_n, use_pandas=False),
+                                 everything_rows[:top_n])
+
+    def test_rename_merges_names(self):
+        aggregates = NameAggregates()
+        for chunk in iter_chunks(self.path):
+            aggregates.add(chunk)
+        aggregates.rename({'ACME INC': 'ACME', 'ACME, INC.': 'ACME', 'GLOBEX LLC': 'GLOBEX', 'INITECH': 'INITECH'})
+        self.assertEqual(aggregates.names(), ['ACME', 'GLOBEX', 'INITECH'])
+        self.assertEqual(aggregates.approvals(), {'ACME': 1241, 'GLOBEX': 3, 'INITECH': 0})
+
+    def test_filters_while_reading(self):
+        with open(self.path, 'a', encoding='utf-16') as f:
+            f.write('7\t2023\t"TX WA, INC"\t\t\tAUSTIN\tTX\t1\t0\t0\t0\n')
+        rows = list(iter_rows(self.path))
+        chunks = pd.concat(iter_chunks(self.path))
+        for year_filter, state_filter in [(2024, None), (None, 'TX'), ('2023', ['WA', 'TX']), ([2023], 'CA')]:
+            with self.subTest(year_filter=year_filter, state_filter=state_filter):
+                years = [int(year_filter)] if isinstance(year_filter, (int, str)) else year_filter
+                states = [state_filter] if isinstance(state_filter, str) else state_filter
+                expected = [row for row in rows
+                            if (years is None or int(row['Fiscal Year']) in years)
+                            and (states is None or row['Petitioner State'] in states)]
+                self.assertEqual(list(iter_rows(self.path, year_filter=year_filter, state_filter=state_filter)), expected)
+
+                # Skipped lines are not numbered
+                filtered = pd.concat(iter_chunks(self.path, chunksize=2, year_filter=year_filter, state_filter=state_filter))
+                pd.testing.assert_frame_equal(filtered.reset_index(drop=True),
+                                              apply_filters(chunks, year_filter, state_filter).reset_index(drop=True))
+
+    def test_rows_skip_line_numbers_header(self):
+        rows = list(iter_rows([self.path, self.path]))
+        self.assertEqual(len(rows), 2 * len(ROWS))
+        self.assertEqual(rows[2]['Employer (Petitioner) Name'], 'ACME INC')
+        self.assertEqual(rows[2]['Continuing Approval'], '1,234')
+
+
+class TestEncoding(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.text = '\t'.join(HEADER) + '\n' + '1\t2024\tCAFÉ SOCIÉTÉ INC\t\t\t\tWA\t1\t0\t0\t0\n'
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, encoding, name='Employer Information.tsv'):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', encoding=encoding) as f:
+            f.write(self.text)
+        return path
+
+    def test_sniff_encoding(self):
+        for encoding in ['utf-16', 'utf-16-le', 'utf-16-be', 'utf-8', 'utf-8-sig', 'cp1252']:
+            with self.subTest(encoding=encoding):
+                path = self.write(encoding)
+                with open(path, 'r', encoding=detect_encoding(path)) as f:
+                    self.assertEqual(f.read(), self.text)
+
+    def test_sample_cut_in_character(self):
+        sample = 'CAFÉ'.encode('utf-8')
+        self.assertEqual(sniff_encoding(sample[:-1]), 'utf-8')
+        self.assertEqual(sniff_encoding(b''), 'utf-8')
+
+    def test_utf8_copy(self):
+        path = self.write('utf-16')
+        cache_dir = os.path.join(self.directory.name, 'cache')
+        copy_path = utf8_copy(path, cache_dir)
+        with open(copy_path, 'rb') as f:
+            self.assertEqual(f.read(), self.text.encode('utf-8'))
+        self.assertEqual(detect_encoding(copy_path), 'utf-8')
+        self.assertEqual(utf8_copy(path, cache_dir), copy_path)
+
+        # A changed file is transcoded again and its old copy deleted
+        self.text = self.text.replace('SOCIÉTÉ', 'SOCIETE')
+        os.utime(self.write('utf-16'), ns=(0, 0))
+        new_copy_path = utf8_copy(path, cache_dir)
+        self.assertNotEqual(new_copy_path, copy_path)
+        self.assertEqual(os.listdir(cache_dir), [os.path.basename(new_copy_path)])
+
+        chunk = next(iter_chunks(path, cache_dir=cache_dir))
+        self.assertEqual(chunk['Employer (Petitioner) Name'].tolist(), ['CAFÉ SOCIETE INC'])
+
+
+@unittest.skipIf(pq is None, "pyarrow is not installed")
+class TestParquetCopy(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.directory.name, 'cache')
+        self.path = os.path.join(self.directory.name, 'Employer Information.tsv')
+        with open(self.path, 'w', encoding='utf-16') as f:
+            for row in [HEADER] + ROWS * 3:
+                f.write('\t'.join(row) + '\n')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_chunks_match_text(self):
+        for year_filter, state_filter in [(None, None), (2024, None), (None, 'WA'), ([2023, 2024], ['TX', 'CA'])]:
+            with self.subTest(year_filter=year_filter, state_filter=state_filter):
+                expected = pd.concat(iter_chunks(self.path, year_filter=year_filter, state_filter=state_filter))
+                chunks = list(iter_chunks(self.path, chunksize=4, cache_dir=self.cache_dir, cache_format=PARQUET_CACHE,
+                                          year_filter=year_filter, state_filter=state_filter))
+                self.assertTrue(all(len(chunk) <= 4 for chunk in chunks))
+                actual = pd.concat(chunks) if chunks else expected.iloc[:0]
+                for column in expected.columns.drop('Fiscal Year'):
+                    self.assertEqual(actual[column].tolist(), expected[column].tolist())
+                self.assertEqual(actual['Fiscal Year'].tolist(), expected['Fiscal Year'].astype(int).tolist())
+
+    def test_row_groups_hold_few_states(self):
+        copy_path = parquet_copy(self.path, self.cache_dir, row_group_size=4)
+        metadata = pq.ParquetFile(copy_path).metadata
+        state = metadata.schema.names.index('Petitioner State')
+        ranges = [(metadata.row_group(i).column(state).statistics.min, metadata.row_group(i).column(state).statistics.max)
+                  for i in range(metadata.num_row_groups)]
+        self.assertEqual(ranges, [('TX', 'TX'), ('TX', 'WA'), ('WA', 'WA'), ('WA', 'WA'), ('WA', 'WA')])
+
+        df = read_parquet(copy_path, ['Employer (Petitioner) Name', 'Petitioner City'], state_filter='TX')
+        self.assertEqual(df.columns.tolist(), ['Employer (Petitioner) Name', 'Petitioner City'])
+        self.assertEqual(df['Employer (Petitioner) Name'].tolist(), ['GLOBEX LLC', 'INITECH'] * 3)
+        self.assertIsInstance(df['Employer (Petitioner) Name'].dtype, pd.CategoricalDtype)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import random
+import unittest
+import numpy as np
+import pandas as pd
+from .company_naics_codes import naics_code_lists, naics_codes
+from .company_name_matcher import extract_naics_codes
+
+VALUES = ["54 - Professional, Scientific, and Technical Services", "51 - Information", "31-33 - Manufacturing",
+          "44-45 - Retail Trade", "Unknown", "", "5 - Short", "54 -", "54 - ", " 54 - Leading space", "54", 54,
+          None, np.nan, "62 - Health Care\nand Social Assistance"]
+
+
+def random_rows(values, rows, keys, seed):
+    generator = random.Random(seed)
+    return pd.DataFrame({
+        'key': [f"COMPANY {generator.randrange(keys)}" for _ in range(rows)],
+        'naics': pd.Series([generator.choice(values) for _ in range(rows)], dtype=object),
+    })
+
+
+class TestNaicsCodes(unittest.TestCase):
+    def assertSameLists(self, df):
+        expected = df.groupby('key')['naics'].agg(extract_naics_codes)
+        actual = naics_code_lists(df['key'], naics_codes(df['naics']), expected.index)
+        self.assertEqual(actual.tolist(), expected.tolist())
+        self.assertEqual(actual.index.tolist(), expected.index.tolist())
+
+    def test_codes_match_regex(self):
+        codes = naics_codes(pd.Series(VALUES, dtype=object))
+        for value, code in zip(VALUES, codes):
+            with self.subTest(value=value):
+                self.assertEqual([] if pd.isna(code) else [code], extract_naics_codes(pd.Series([value])))
+
+    def test_lists_match_regex(self):
+        for seed in range(5):
+            with self.subTest(seed=seed):
+                self.assertSameLists(random_rows(VALUES, 2000, 300, seed))
+
+    def test_many_codes(self):
+        # More codes than bits in a mask
+        values = [f"{code} - Sector" for code in range(10, 100)] + ["Unknown", None]
+        for seed in range(3):
+            with self.subTest(seed=seed):
+                self.assertSameLists(random_rows(values, 3000, 100, seed))
+
+    def test_keys_without_codes(self):
+        df = pd.DataFrame({'key': ['A', 'B', 'B'], 'naics': pd.Series([None, 'Unknown', None], dtype=object)})
+        self.assertEqual(naics_code_lists(df['key'], naics_codes(df['naics']), pd.Index(['A', 'B'])).tolist(), [[], []])
+        self.assertEqual(len(naics_code_lists(df['key'], naics_codes(df['naics']))), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
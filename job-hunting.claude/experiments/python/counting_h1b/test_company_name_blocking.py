@@ -0,0 +1,132 @@
+import os
+import unittest
+from functools import lru_cache
+from .company_name_blocking import (
+    CompanyNameIndex,
+    character_ngrams,
+    find_similar_pairs,
+    group_similar_names,
+    min_matching_words,
+)
+from .company_name_similarity import calculate_similarity
+
+DATA_FILE = os.path.join(os.path.dirname(__file__), 'Data', 'NormalizedCompanyNames.2024.txt')
+
+TEST_COMPANIES = [
+    "1UP HEALTH INC", "1UPHEALTH INC", "3 GIS LLC", "3-GIS LLC",
+    "42 NORTH DENTAL CARE LLC", "42 NORTH DENTAL CARE PLLC", "84 51 LLC", "84.51 LLC",
+    "Acme Technology Inc", "ACME TECHNOLOGY INC", "Acme Tecnology Inc",
+    "Global Software Solutions", "Global Software", "The Global Software Solutions Company",
+    "Blue Ocean Consulting Group", "Consulting Group Blue Ocean",
+    "Northern California Healthcare Partners", "Northern California Medical Group",
+    "International Digital Security Systems Associates", "Advanced Digital Security Systems LLC",
+    "Smith & Johnson Legal Services", "Smith and Johnson Legal",
+    "APPLE INC", "APPLE PAYMENTS SERVICES LLC", "APPLEGREEN ELECTRIC US INC", "BIG APPLE SIGN CORPORATION DBA BIG",
+    "AMAZON ADVERTISING LLC", "AMAZON COM SERVICES LLC", "AMAZON PRODUCE NETWORK LLC", "AMAZON.COM SERVICES LLC",
+    "AMAZON WEB SERVICES INC", "AMAZON DEVELOPMENT CENTER U S INC", "AMAZON DEVELOPMENT CENTER US INC",
+]
+
+THRESHOLDS = [0, 0.3, 0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 1.0, 85]
+
+
+@lru_cache(maxsize=None)
+def cached_similarity(name1, name2):
+    """Score each pair once, since the same pairs are compared at every threshold."""
+    return calculate_similarity(name1, name2)
+
+
+def brute_force_groups(company_names, threshold):
+    """Reference grouping comparing every name with every later name."""
+    groups = []
+    processed = set()
+    for i, name1 in enumerate(company_names):
+        if name1 in processed:
+            continue
+        group = [name1]
+        processed.add(name1)
+        for name2 in company_names[i+1:]:
+            if name2 not in processed and cached_similarity(name1, name2) >= threshold:
+                group.append(name2)
+                processed.add(name2)
+        groups.append((name1, group))
+    return groups
+
+
+def load_sample():
+    """Load a slice of real employer names with many close variations."""
+    with open(DATA_FILE) as f:
+        names = [line.strip() for line in f if line.strip()]
+    start = names.index('APPALACHIAN COLLEGE PHARMACY')
+    return TEST_COMPANIES + names[start:start + 60]
+
+
+class TestCharacterNgrams(unittest.TestCase):
+    def test_repeated_ngrams_are_numbered(self):
+        self.assertEqual(character_ngrams("AAAA"), {("AAA", 1), ("AAA", 2)})
+        self.assertEqual(len(character_ngrams("ACME") & character_ngrams("ACMES")), 2)
+        self.assertEqual(character_ngrams("AB"), frozenset())
+
+
+class TestMinMatchingWords(unittest.TestCase):
+    def test_min_matching_words(self):
+        test_cases = [
+            ((0.85, 1), 1),
+            ((0.85, 2), 2),
+            ((0.85, 5), 4),
+            ((0.5, 3), 1),
+            ((0.2, 10), 1),
+        ]
+        for (threshold, token_count), expected in test_cases:
+            with self.subTest(threshold=threshold, token_count=token_count):
+                self.assertEqual(min_matching_words(threshold, token_count), expected)
+
+
+class TestCompanyNameIndex(unittest.TestCase):
+    def test_candidates_cover_all_matches(self):
+        names = load_sample()
+        index = CompanyNameIndex(names)
+        for threshold in THRESHOLDS:
+            for i, name1 in enumerate(names):
+                candidates = set(index.candidates(i, threshold))
+                for j in range(i + 1, len(names)):
+                    if cached_similarity(name1, names[j]) >= threshold:
+                        with self.subTest(threshold=threshold, name1=name1, name2=names[j]):
+                            self.assertIn(j, candidates)
+
+    def test_candidates_are_later_and_sorted(self):
+        index = CompanyNameIndex(TEST_COMPANIES)
+        for i in range(len(TEST_COMPANIES)):
+            candidates = index.candidates(i, 0.5)
+            self.assertEqual(candidates, sorted(candidates))
+            self.assertTrue(all(j > i for j in candidates))
+
+    def test_skip(self):
+        index = CompanyNameIndex(["ACME WIDGETS", "ACME WIDGETS INC", "ACME WIDGETS LLC"])
+        self.assertEqual(index.candidates(0, 0.8), [1, 2])
+        self.assertEqual(index.candidates(0, 0.8, skip={1}), [2])
+
+
+class TestGroupSimilarNames(unittest.TestCase):
+    def test_same_groups_as_brute_force(self):
+        names = load_sample()
+        for threshold in THRESHOLDS:
+            with self.subTest(threshold=threshold):
+                self.assertEqual(group_similar_names(names, threshold, similarity=cached_similarity),
+                                 brute_force_groups(names, threshold))
+
+    def test_repeated_names(self):
+        names = ["ACME WIDGETS INC", "ACME WIDGETS LLC", "ACME WIDGETS INC", "OTHER"]
+        self.assertEqual(group_similar_names(names, 0.8), brute_force_groups(names, 0.8))
+
+    def test_find_similar_pairs(self):
+        names = load_sample()
+        for threshold in [0.5, 0.8]:
+            expected = [(name1, name2, score)
+                        for i, name1 in enumerate(names) for name2 in names[i+1:]
+                        if (score := cached_similarity(name1, name2)) >= threshold]
+            with self.subTest(threshold=threshold):
+                self.assertEqual(find_similar_pairs(names, threshold, similarity=cached_similarity), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+from .company_name_cache import NormalizationCache
+from .company_name_normalizer import normalize_company_name
+from .company_name_similarity import calculate_similarity, score_normalized, tokenize_name
+
+
+class CountingNormalizer:
+    """Normalizer that records the names it was called with."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, name):
+        self.calls.append(name)
+        return normalize_company_name(name)
+
+
+class TestNormalizationCache(unittest.TestCase):
+    def test_normalizes_each_name_once(self):
+        normalizer = CountingNormalizer()
+        cache = NormalizationCache(normalizer=normalizer)
+        names = ["ACME CORP", "ACME CORPORATION", "ACME CORP", "ACME CORP"]
+
+        self.assertEqual(cache.normalize_many(names), [normalize_company_name(name) for name in names])
+        self.assertEqual(normalizer.calls, ["ACME CORP", "ACME CORPORATION"])
+        self.assertEqual(cache.cache_info(), (2, 2, cache.maxsize, 2))
+
+    def test_normalize_distinct(self):
+        cache = NormalizationCache()
+        mapping = cache.normalize_distinct(["MICROSOFT CORPORATION", "GOOGLE INC", "MICROSOFT CORPORATION"])
+        self.assertEqual(mapping, {"MICROSOFT CORPORATION": "MICROSOFT", "GOOGLE INC": "GOOGLE"})
+        self.assertEqual(cache.misses, 2)
+        self.assertEqual(cache.hits, 0)
+
+    def test_evicts_least_recently_used(self):
+        normalizer = CountingNormalizer()
+        cache = NormalizationCache(maxsize=2, normalizer=normalizer)
+        cache.normalize("A CORP")
+        cache.normalize("B CORP")
+        cache.normalize("A CORP")
+        cache.normalize("C CORP")
+
+        self.assertIn("A CORP", cache)
+        self.assertNotIn("B CORP", cache)
+        self.assertEqual(len(cache), 2)
+
+        cache.normalize("B CORP")
+        self.assertEqual(normalizer.calls, ["A CORP", "B CORP", "C CORP", "B CORP"])
+
+    def test_clear(self):
+        cache = NormalizationCache()
+        cache.normalize("ACME CORP")
+        cache.normalize("ACME CORP")
+        cache.clear()
+        self.assertEqual(cache.cache_info(), (0, 0, cache.maxsize, 0))
+
+
+class TestScoreNormalized(unittest.TestCase):
+    def test_same_score_as_raw_names(self):
+        test_cases = [
+            ("1UP HEALTH INC", "1UPHEALTH INC"),
+            ("42 NORTH DENTAL CARE LLC", "42 NORTH DENTAL CARE PLLC"),
+            ("AMAZON WEB SERVICES INC", "AMAZON.COM SERVICES LLC"),
+            ("APPLE INC", "APPLE PAYMENTS SERVICES LLC"),
+            ("Global Software Solutions", "The Global Software Solutions Company"),
+            ("Northern California Healthcare Partners", "Northern California Medical Group"),
+            ("XYZ Industries Ltd", "ABC Financial Group"),
+            ("", "ACME"),
+        ]
+        for name1, name2 in test_cases:
+            with self.subTest(name1=name1, name2=name2):
+                tokens1 = tokenize_name(normalize_company_name(name1))
+                tokens2 = tokenize_name(normalize_company_name(name2))
+                self.assertEqual(score_normalized(tokens1, tokens2), calculate_similarity(name1, name2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import random
+import unittest
+from .company_name_blocking import CompanyNameIndex, group_similar_names
+from .company_name_clustering import (
+    MOST_APPROVALS,
+    SHORTEST_NAME,
+    SINGLE_LINKAGE,
+    SimilarityGraph,
+    UnionFind,
+    canonical_name_map,
+    choose_canonical,
+)
+from .company_name_parallel import group_similar_names_parallel
+from .test_company_name_blocking import cached_similarity, load_sample
+
+THRESHOLDS = [0.3, 0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 1.0, 85]
+
+
+def brute_force_components(company_names, threshold):
+    """Reference single linkage grouping, following every matching pair."""
+    groups = []
+    grouped = set()
+    for name in company_names:
+        if name in grouped:
+            continue
+        group = {name}
+        pending = [name]
+        while pending:
+            name1 = pending.pop()
+            for name2 in company_names:
+                if name2 not in group and cached_similarity(*sorted([name1, name2], key=company_names.index)) >= threshold:
+                    group.add(name2)
+                    pending.append(name2)
+        grouped.update(group)
+        groups.append(sorted(group, key=company_names.index))
+    return groups
+
+
+class TestUnionFind(unittest.TestCase):
+    def test_union_and_find(self):
+        sets = UnionFind(6)
+        sets.union(0, 3)
+        sets.union(4, 3)
+        sets.union(1, 5)
+        self.assertEqual(sets.find(4), sets.find(0))
+        self.assertNotEqual(sets.find(1), sets.find(0))
+        self.assertEqual(sets.sets(), [[0, 3, 4], [1, 5], [2]])
+
+
+class TestSimilarityGraph(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.names = list(dict.fromkeys(load_sample()))
+        cls.graph = SimilarityGraph.from_index(CompanyNameIndex(cls.names), THRESHOLDS[0])
+
+    def test_center_linkage_matches_greedy_grouping(self):
+        for threshold in THRESHOLDS:
+            with self.subTest(threshold=threshold):
+                self.assertEqual(self.graph.groups(threshold), group_similar_names(self.names, threshold))
+
+    def test_single_linkage_matches_connected_components(self):
+        for threshold in THRESHOLDS:
+            with self.subTest(threshold=threshold):
+                groups = [group for _, group in self.graph.groups(threshold, linkage=SINGLE_LINKAGE)]
+                self.assertEqual(groups, brute_force_components(self.names, threshold))
+
+    def test_single_linkage_does_not_depend_on_order(self):
+        shuffled = self.names[:]
+        random.Random(0).shuffle(shuffled)
+        graph = SimilarityGraph.from_index(CompanyNameIndex(shuffled), 0.5)
+        for threshold in [0.5, 0.7, 0.85]:
+            with self.subTest(threshold=threshold):
+                expected = sorted(self.graph.groups(threshold, SINGLE_LINKAGE, SHORTEST_NAME))
+                groups = graph.groups(threshold, SINGLE_LINKAGE, SHORTEST_NAME)
+                self.assertEqual(sorted((canonical, sorted(group, key=self.names.index))
+                                        for canonical, group in groups), expected)
+
+    def test_threshold_below_scored_pairs(self):
+        with self.assertRaises(ValueError):
+            self.graph.clusters(0.1)
+
+    def test_parallel_single_linkage(self):
+        expected = self.graph.groups(0.5, SINGLE_LINKAGE, SHORTEST_NAME)
+        self.assertEqual(group_similar_names_parallel(self.names, 0.5, workers=2, linkage=SINGLE_LINKAGE,
+                                                      canonical=SHORTEST_NAME), expected)
+
+
+class TestCanonicalNames(unittest.TestCase):
+    def test_rules(self):
+        group = ["AMAZON COM SERVICES LLC", "AMAZON WEB SERVICES INC", "AMAZON", "AMAZON INC"]
+        approvals = {"AMAZON COM SERVICES LLC": 10, "AMAZON WEB SERVICES INC": 25, "AMAZON INC": 25}
+        self.assertEqual(choose_canonical(group), "AMAZON COM SERVICES LLC")
+        self.assertEqual(choose_canonical(group, SHORTEST_NAME), "AMAZON")
+        self.assertEqual(choose_canonical(group, MOST_APPROVALS, approvals), "AMAZON INC")
+        with self.assertRaises(ValueError):
+            choose_canonical(group, "longest")
+
+    def test_canonical_name_map(self):
+        groups = [("ACME", ["ACME", "ACME INC"]), ("GLOBEX", ["GLOBEX"])]
+        self.assertEqual(canonical_name_map(groups), {"ACME": "ACME", "ACME INC": "ACME", "GLOBEX": "GLOBEX"})
+
+
+if __name__ == '__main__':
+    unittest.main()
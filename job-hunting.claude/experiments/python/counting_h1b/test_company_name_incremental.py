@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+from .company_name_blocking import group_similar_names
+from .company_name_clustering import canonical_name_map
+from .company_name_incremental import ClusterState
+from .test_company_name_blocking import load_sample
+
+THRESHOLDS = [0.5, 0.7, 0.85, 1.0, 85]
+
+
+def aggregated_frame(rows):
+    """Build counts per canonical company like aggregate_companies does."""
+    return pd.DataFrame(rows, columns=['Canonical Company', 'Initial Approval', 'Initial Denial',
+                                       'Continuing Approval', 'Continuing Denial', 'Industry (NAICS) Code'])
+
+
+class TestClusterState(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'clusters.json')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_adding_names_matches_grouping_everything(self):
+        names = load_sample()
+        for threshold in THRESHOLDS:
+            for split in [len(names) // 3, len(names) // 2]:
+                with self.subTest(threshold=threshold, split=split):
+                    state = ClusterState({'similarity_threshold': threshold})
+                    state.add_names(names[:split])
+                    state.add_names(names[split // 2:])
+                    expected = group_similar_names(names, threshold)
+                    self.assertEqual(state.canonical, canonical_name_map(expected))
+                    self.assertEqual(state.centers, [canonical for canonical, _ in expected])
+
+    def test_fold_and_save(self):
+        state = ClusterState({'similarity_threshold': 0.85})
+        state.add_names(["ACME TECHNOLOGY INC", "Acme Technology Inc", "GLOBEX LLC"])
+        state.fold(aggregated_frame([("ACME TECHNOLOGY INC", 1, 0, 2, 1, ["54"]),
+                                     ("GLOBEX LLC", 3, 1, 0, 0, [])]), ["2023.tsv"])
+        state.save(self.path)
+
+        state = ClusterState.load(self.path, {'similarity_threshold': 0.85})
+        self.assertEqual(state.new_sources(["2023.tsv", "2024.tsv"]), ["2024.tsv"])
+        self.assertEqual(state.add_names(["Acme Technology Inc", "ACME TECHNOLOGY, INC."]), ["ACME TECHNOLOGY, INC."])
+        self.assertEqual(state.canonical["ACME TECHNOLOGY, INC."], "ACME TECHNOLOGY INC")
+        state.fold(aggregated_frame([("ACME TECHNOLOGY INC", 2, 1, 0, 0, ["51", "54"])]), ["2024.tsv"])
+
+        frame = state.aggregates_frame()
+        self.assertEqual(frame['Canonical Company'].tolist(), ["ACME TECHNOLOGY INC", "GLOBEX LLC"])
+        self.assertEqual(frame['Initial Approval'].tolist(), [3, 3])
+        self.assertEqual(frame['Continuing Denial'].tolist(), [1, 0])
+        self.assertEqual(frame['Industry (NAICS) Code'].tolist(), [["51", "54"], []])
+        self.assertEqual(state.sources, ["2023.tsv", "2024.tsv"])
+
+    def test_refuses_other_options(self):
+        ClusterState({'similarity_threshold': 0.85}).save(self.path)
+        with self.assertRaises(ValueError):
+            ClusterState.load(self.path, {'similarity_threshold': 0.7})
+
+    def test_refuses_other_rules(self):
+        ClusterState({'similarity_threshold': 0.85}, version='old').save(self.path)
+        with self.assertRaises(ValueError):
+            ClusterState.load(self.path, {'similarity_threshold': 0.85})
+
+
+if __name__ == '__main__':
+    unittest.main()
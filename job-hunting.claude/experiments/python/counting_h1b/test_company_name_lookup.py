@@ -0,0 +1,85 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from urllib.parse import quote
+from urllib.request import Request, urlopen
+from .company_name_blocking import CompanyNameIndex
+from .company_name_cache import normalize_cached
+from .company_name_lookup import CompanyLookup, LookupResult, make_server
+from .company_name_similarity import calculate_similarity, tokenize_name
+from .test_company_name_blocking import load_sample
+
+COMPANIES = [
+    {'Canonical Company': "ACME TECHNOLOGY INC", 'Total Approvals': 12, 'Total Denials': 2, 'Approval Rate': 85.7},
+    {'Canonical Company': "AMAZON COM SERVICES LLC", 'Total Approvals': 900, 'Total Denials': 10, 'Approval Rate': 98.9},
+    {'Canonical Company': "BLUE OCEAN CONSULTING GROUP", 'Total Approvals': 3, 'Total Denials': 0, 'Approval Rate': 100.0},
+]
+
+
+class TestCompanyNameIndexQuery(unittest.TestCase):
+    def test_query_finds_every_match(self):
+        names = load_sample()
+        index = CompanyNameIndex(names[::2])
+        for threshold in [0.3, 0.5, 0.7, 0.85, 1.0]:
+            for name in names[1::2]:
+                with self.subTest(threshold=threshold, name=name):
+                    candidates = set(index.query(tokenize_name(normalize_cached(name)), threshold))
+                    expected = {j for j, other in enumerate(index.names) if calculate_similarity(name, other) >= threshold}
+                    self.assertLessEqual(expected, candidates)
+
+
+class TestCompanyLookup(unittest.TestCase):
+    def setUp(self):
+        self.lookup = CompanyLookup.from_companies(COMPANIES)
+
+    def test_lookup(self):
+        self.assertEqual(self.lookup.lookup("Acme Technology, Inc."), LookupResult("ACME TECHNOLOGY INC", 1.0, 12))
+        self.assertEqual(self.lookup.lookup("Amazon.com Services, LLC").canonical, "AMAZON COM SERVICES LLC")
+        self.assertIsNone(self.lookup.lookup("Globex LLC"))
+        self.assertIsNone(self.lookup.lookup(""))
+        self.assertEqual(self.lookup.company("ACME TECHNOLOGY INC")['approval_rate'], 85.7)
+
+    def test_lookup_many(self):
+        names = ["Acme Technology Inc", "Globex LLC", "ACME TECHNOLOGY INC", "Amazon Web Services Inc"]
+        self.assertEqual(self.lookup.lookup_many(names), [self.lookup.lookup(name) for name in names])
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'sponsors.json')
+            self.lookup.save(path)
+            loaded = CompanyLookup.load(path)
+            self.assertEqual(loaded.index.normalized, self.lookup.index.normalized)
+            self.assertEqual(loaded.lookup("Acme Technology Inc"), self.lookup.lookup("Acme Technology Inc"))
+
+            with open(path) as f:
+                saved = json.load(f)
+            saved['version'] = 'old'
+            with open(path, 'w') as f:
+                json.dump(saved, f)
+            with self.assertRaises(ValueError):
+                CompanyLookup.load(path)
+
+    def test_server(self):
+        server = make_server(self.lookup, port=0)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/lookup"
+            with urlopen(f"{url}?name={quote('Acme Technology, Inc.')}") as response:
+                self.assertEqual(json.load(response), {'name': "Acme Technology, Inc.", 'canonical': "ACME TECHNOLOGY INC",
+                                                       'similarity': 1.0, 'approvals': 12})
+
+            request = Request(url, data=json.dumps({'names': ["Globex LLC", "Acme Technology Inc"]}).encode('utf-8'),
+                              headers={'Content-Type': 'application/json'})
+            with urlopen(request) as response:
+                results = json.load(response)['results']
+            self.assertEqual([result['canonical'] for result in results], [None, "ACME TECHNOLOGY INC"])
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == '__main__':
+    unittest.main()
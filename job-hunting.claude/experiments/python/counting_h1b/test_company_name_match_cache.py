@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from .company_name_blocking import group_similar_names
+from .company_name_match_cache import MatchCache, rules_version
+from .test_company_name_blocking import load_sample
+
+THRESHOLDS = [0.5, 0.7, 0.85, 1.0]
+
+
+class TestMatchCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'match_cache.sqlite')
+        self.names = load_sample()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def assertSameGroups(self, cache, names, threshold):
+        graph = cache.similarity_graph(names, threshold)
+        self.assertEqual(graph.groups(threshold), group_similar_names(names, threshold))
+
+    def test_groups_match_scoring_every_pair(self):
+        with MatchCache(self.path) as cache:
+            for threshold in THRESHOLDS:
+                with self.subTest(threshold=threshold):
+                    self.assertSameGroups(cache, self.names, threshold)
+
+    def test_rerun_does_not_score(self):
+        with MatchCache(self.path) as cache:
+            self.assertSameGroups(cache, self.names, 0.7)
+
+        with MatchCache(self.path) as cache:
+            with mock.patch(f'{MatchCache.__module__}.find_matches', side_effect=AssertionError("scored")):
+                for threshold in [0.7, 0.85]:
+                    with self.subTest(threshold=threshold):
+                        self.assertSameGroups(cache, self.names, threshold)
+                        self.assertSameGroups(cache, self.names[::2], threshold)
+
+    def test_new_names_are_added(self):
+        half = len(self.names) // 2
+        with MatchCache(self.path) as cache:
+            self.assertSameGroups(cache, self.names[half:], 0.6)
+            self.assertSameGroups(cache, self.names, 0.6)
+            self.assertSameGroups(cache, self.names[::-1], 0.6)
+
+    def test_lower_threshold_rescores(self):
+        with MatchCache(self.path) as cache:
+            self.assertSameGroups(cache, self.names, 0.85)
+            self.assertSameGroups(cache, self.names, 0.5)
+            self.assertEqual(cache.min_threshold, 0.5)
+
+    def test_rules_change_empties_cache(self):
+        with MatchCache(self.path, version='old') as cache:
+            cache.similarity_graph(self.names, 0.85)
+            self.assertEqual(cache.min_threshold, 0.85)
+
+        with MatchCache(self.path) as cache:
+            self.assertEqual(cache.version, rules_version())
+            self.assertIsNone(cache.min_threshold)
+            self.assertEqual(cache.connection.execute("SELECT COUNT(*) FROM normalized").fetchone()[0], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -70,6 +70,22 @@ class TestStandardizeAbbreviations(unittest.TestCase):
             with self.subTest(input_name=input_name):
                 self.assertEqual(standardize_abbreviations(input_name), expected)
 
+    def test_repeated_words(self):
+        test_cases = [
+            # A word right after a replaced word of the same rule is kept
+            ("X COMPANY COMPANY", "X CO COMPANY"),
+            ("X HEALTH HEALTH HEALTH", "X HLTH HEALTH HLTH"),
+            ("A SERVICE SERVICES CENTER", "A SVC SERVICES CTR"),
+            ("A SERVICES. SERVICE", "A SVCS SERVICE"),
+            # Words of different rules are all replaced
+            ("NAME COMPANY LIMITED", "NAME CO LTD"),
+            ("A CORPORATION CORPORAT LIMITED", "A CORP CORP LTD"),
+            ("ACME SERV SERVS CENTERS CENT", "ACME SVC SERVS CTRS CENT"),
+        ]
+        for input_name, expected in test_cases:
+            with self.subTest(input_name=input_name):
+                self.assertEqual(standardize_abbreviations(input_name), expected)
+
 class TestHandleSpecialCases(unittest.TestCase):
     def test_special_cases(self):
         test_cases = [
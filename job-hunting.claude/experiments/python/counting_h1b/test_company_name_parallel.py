@@ -0,0 +1,31 @@
+import unittest
+from .company_name_blocking import group_similar_names
+from .company_name_parallel import group_similar_names_parallel
+from .test_company_name_blocking import load_sample
+
+THRESHOLDS = [0, 0.5, 0.85, 85]
+
+
+class TestGroupSimilarNamesParallel(unittest.TestCase):
+    def test_same_groups_for_any_worker_count(self):
+        names = load_sample()
+        for threshold in THRESHOLDS:
+            expected = group_similar_names(names, threshold)
+            for workers in [1, 2, 3]:
+                with self.subTest(threshold=threshold, workers=workers):
+                    self.assertEqual(group_similar_names_parallel(names, threshold, workers=workers), expected)
+
+    def test_small_chunks(self):
+        names = load_sample()
+        expected = group_similar_names(names, 0.5)
+        self.assertEqual(group_similar_names_parallel(names, 0.5, workers=2, chunk_size=1), expected)
+
+    def test_repeated_names(self):
+        names = ["ACME TECHNOLOGY INC", "ACME TECHNOLOGY INC", "Acme Technology Inc", "GLOBEX LLC"]
+        self.assertEqual(group_similar_names_parallel(names, 0.85, workers=2),
+                         [("ACME TECHNOLOGY INC", ["ACME TECHNOLOGY INC", "Acme Technology Inc"]),
+                          ("GLOBEX LLC", ["GLOBEX LLC"])])
+
+
+if __name__ == '__main__':
+    unittest.main()
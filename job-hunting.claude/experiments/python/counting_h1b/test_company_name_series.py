@@ -0,0 +1,52 @@
+import unittest
+import pandas as pd
+from .company_name_normalizer import normalize_company_name, normalize_punctuation
+from .company_name_series import normalize_punctuation_series, normalize_series
+
+TEST_NAMES = [
+    "1 HOTEL KAUAI LLC DBA 1 HOTEL HANALEI BAY",
+    "Microsoft Corporation",
+    "AMAZON.COM SERVICES LLC",
+    "Amazon Web Services, Inc.",
+    "A.B.C. Technologies, L.L.C.",
+    "FACEBOOK, INC.",
+    "AT&T Services Inc",
+    "The Boeing Company",
+    "  Seattle   Children's  Hospital  ",
+    "Providence Health & Services - Washington",
+    "X COMPANY COMPANY",
+    "St. Joseph Medical Center, P.S.",
+    "",
+    "   ",
+]
+
+
+class TestNormalizePunctuationSeries(unittest.TestCase):
+    def test_matches_normalize_punctuation(self):
+        names = pd.Series([name.upper() for name in TEST_NAMES])
+        expected = [normalize_punctuation(name) for name in names]
+        self.assertEqual(normalize_punctuation_series(names).tolist(), expected)
+
+
+class TestNormalizeSeries(unittest.TestCase):
+    def test_matches_normalize_company_name(self):
+        names = pd.Series(TEST_NAMES)
+        expected = [normalize_company_name(name) for name in TEST_NAMES]
+        self.assertEqual(normalize_series(names).tolist(), expected)
+
+    def test_repeated_and_missing_names(self):
+        names = pd.Series(["Google LLC", None, "Google LLC", "Alphabet Inc.", float('nan'), "Google LLC"],
+                          index=[10, 11, 12, 13, 14, 15], name="Employer (Petitioner) Name")
+        result = normalize_series(names)
+
+        self.assertEqual(result.index.tolist(), names.index.tolist())
+        self.assertEqual(result.name, names.name)
+        self.assertEqual(result.dropna().tolist(), ["GOOGLE", "GOOGLE", "GOOGLE", "GOOGLE"])
+        self.assertEqual(result.isna().tolist(), [False, True, False, False, True, False])
+
+    def test_empty_series(self):
+        self.assertEqual(normalize_series(pd.Series([], dtype=object)).tolist(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
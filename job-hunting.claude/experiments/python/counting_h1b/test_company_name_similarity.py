@@ -0,0 +1,53 @@
+import random
+import unittest
+from .company_name_similarity import (
+    AUTOJUNK_LENGTH,
+    DEFAULT_LCS_BACKEND,
+    DIFFLIB_LCS,
+    LCS_BACKENDS,
+    calculate_similarity,
+    get_lcs_backend,
+    set_lcs_backend,
+)
+from .test_company_name_blocking import DATA_FILE, TEST_COMPANIES
+
+
+def data_pairs(count=20000, seed=0):
+    """Pair each name of the data file with the next one, which is often a variation, and with random names."""
+    with open(DATA_FILE) as f:
+        names = [line.strip() for line in f if line.strip()]
+    generator = random.Random(seed)
+    return list(zip(names, names[1:])) + [(generator.choice(names), generator.choice(names)) for _ in range(count)]
+
+
+class TestLcsBackends(unittest.TestCase):
+    def tearDown(self):
+        set_lcs_backend(DEFAULT_LCS_BACKEND)
+
+    def test_backends_match_difflib(self):
+        pairs = data_pairs()
+        pairs += [("", "ACME"), ("ACME", ""), ("AAAA", "AA"), ("ABCAB", "CABCA"), ("ÉCOLE ACME", "ECOLE ACME"),
+                  ("ACME", "ACME " + "E" * AUTOJUNK_LENGTH), ("ACME " + "E" * AUTOJUNK_LENGTH, "ACME")]
+        expected = [LCS_BACKENDS[DIFFLIB_LCS](name1, name2) for name1, name2 in pairs]
+        for backend, longest_common_substring in LCS_BACKENDS.items():
+            with self.subTest(backend=backend):
+                self.assertEqual([longest_common_substring(name1, name2) for name1, name2 in pairs], expected)
+
+    def test_scores_do_not_depend_on_backend(self):
+        pairs = [(name1, name2) for name1 in TEST_COMPANIES for name2 in TEST_COMPANIES]
+        set_lcs_backend(DIFFLIB_LCS)
+        expected = [calculate_similarity(name1, name2) for name1, name2 in pairs]
+        for backend in LCS_BACKENDS:
+            with self.subTest(backend=backend):
+                set_lcs_backend(backend)
+                self.assertEqual(get_lcs_backend(), backend)
+                self.assertEqual([calculate_similarity(name1, name2) for name1, name2 in pairs], expected)
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            set_lcs_backend('suffix tree')
+        self.assertEqual(get_lcs_backend(), DEFAULT_LCS_BACKEND)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import random
+import unittest
+from .company_name_blocking import CompanyNameIndex
+from .company_name_cache import normalize_many
+from .company_name_similarity import score_normalized, tokenize_name
+from .company_name_similarity_batch import AUTOJUNK_LENGTH, NameMatrix
+from .test_company_name_blocking import load_sample
+
+
+class TestNameMatrix(unittest.TestCase):
+    def assertSameScores(self, names, pairs, **kwargs):
+        matrix = NameMatrix(names)
+        scores = matrix.score_pairs([i for i, _ in pairs], [j for _, j in pairs], **kwargs)
+        for (i, j), score in zip(pairs, scores):
+            self.assertAlmostEqual(score, score_normalized(names[i], names[j]), places=12,
+                                   msg=(names[i].norm, names[j].norm))
+
+    def test_matches_scalar_score(self):
+        names = [tokenize_name(norm) for norm in normalize_many(load_sample())]
+        pairs = [(i, j) for i in range(len(names)) for j in range(len(names))]
+        for block_size in [7, 4096]:
+            with self.subTest(block_size=block_size):
+                self.assertSameScores(names, pairs, block_size=block_size)
+
+    def test_special_cases(self):
+        norms = ["", "ACME", "ACME", "AMAZON WEB SERVICES INC", "AMAZON COM SERVICES LLC", "THE GROUP",
+                 "ACME " + "X" * AUTOJUNK_LENGTH, "ACME TECHNOLOGY " + "X" * AUTOJUNK_LENGTH, "ÉCOLE ACME"]
+        names = [tokenize_name(norm) for norm in norms]
+        pairs = [(i, j) for i in range(len(names)) for j in range(len(names))]
+        self.assertSameScores(names, pairs)
+        self.assertEqual(len(NameMatrix(names).score_pairs([], [])), 0)
+
+    def test_index_scores_pairs(self):
+        names = load_sample()
+        index = CompanyNameIndex(names)
+        generator = random.Random(0)
+        pairs = [(generator.randrange(len(names)), generator.randrange(len(names))) for _ in range(500)]
+        self.assertEqual(index.score_pairs([i for i, _ in pairs], [j for _, j in pairs]),
+                         [index.score(i, j) for i, j in pairs])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,3 @@
+"""
+Job search automation package
+"""
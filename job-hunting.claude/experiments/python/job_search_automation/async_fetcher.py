@@ -0,0 +1,141 @@
+"""
+Async Fetcher - concurrent HTTP fetching for the job scrapers
+
+Requests run on one requests.Session, whose keep-alive connections are pooled and shared
+by all the requests to a host, and are sent from a thread pool driven by asyncio, so
+that many pages are downloaded while others are parsed:
+- a semaphore bounds the number of requests in flight
+- a token bucket per host spaces the requests sent to the same site
+- connection errors, timeouts, 429 and 5xx responses are retried with exponential
+  backoff, waiting as long as a Retry-After header asks
+"""
+
+import asyncio
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Statuses worth retrying: rate limited, or a temporary server error
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_REQUESTS_PER_SECOND = 0.5
+DEFAULT_BURST = 2
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF = 1.0
+DEFAULT_TIMEOUT = 30
+
+class TokenBucket:
+    """Rate limiter letting `burst` requests through at once, then `rate` requests per second"""
+
+    def __init__(self, rate: float, burst: float = 1, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = burst
+        self.updated = clock()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a request may be sent"""
+        # Waiters are served in order, the lock is held while the first one sleeps
+        async with self._lock:
+            while True:
+                now = self.clock()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+def retry_after(response: requests.Response) -> Optional[float]:
+    """Get the delay a Retry-After header asks for, in seconds"""
+    value = response.headers.get('Retry-After')
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        # HTTP dates are not worth parsing for the sites we scrape
+        return None
+
+def new_session(pool_size: int = DEFAULT_CONCURRENCY) -> requests.Session:
+    """Create a session keeping up to pool_size connections open per host"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+class AsyncFetcher:
+    """Fetches pages concurrently with a shared connection pool, rate limiting and retries"""
+
+    def __init__(self, headers: Optional[Dict] = None, max_concurrency: int = DEFAULT_CONCURRENCY,
+                 requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND, burst: float = DEFAULT_BURST,
+                 max_retries: int = DEFAULT_MAX_RETRIES, backoff: float = DEFAULT_BACKOFF,
+                 timeout: float = DEFAULT_TIMEOUT, session: Optional[requests.Session] = None):
+        # A session passed in keeps its connections open for the caller
+        self._owns_session = session is None
+        self.session = session or new_session(max_concurrency)
+        if headers:
+            self.session.headers.update(headers)
+
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.stats = Counter()
+
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def _bucket(self, url: str) -> TokenBucket:
+        host = urlparse(url).netloc
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(self.requests_per_second, self.burst)
+        return self._buckets[host]
+
+    async def get(self, url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None) -> requests.Response:
+        """Fetch a URL, retrying temporary failures, and raise the last error if every attempt fails"""
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.max_retries + 1):
+            await self._bucket(url).acquire()
+            delay = None
+            async with self._semaphore:
+                self.stats['requests'] += 1
+                try:
+                    request = partial(self.session.get, url, params=params, headers=headers, timeout=self.timeout)
+                    response = await loop.run_in_executor(self._executor, request)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    error = e
+                else:
+                    if response.status_code not in RETRY_STATUSES:
+                        response.raise_for_status()
+                        return response
+                    delay = retry_after(response)
+                    error = requests.HTTPError(f"{response.status_code} for url: {response.url}", response=response)
+
+            if attempt == self.max_retries:
+                self.stats['failures'] += 1
+                raise error
+            self.stats['retries'] += 1
+            await asyncio.sleep(delay if delay is not None else self.backoff * 2 ** attempt)
+
+    def close(self):
+        """Stop the threads and close the pooled connections of a session created by the fetcher"""
+        self._executor.shutdown(wait=True)
+        if self._owns_session:
+            self.session.close()
+
+    async def __aenter__(self) -> 'AsyncFetcher':
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
@@ -1,53 +1,184 @@
 """
 Indeed Job Scraper - Phase 1 Implementation
-Includes company blacklisting, salary filtering, and all required filters
+Includes company blacklisting, salary filtering, H-1B sponsor filtering, and all required filters
 """
 
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+import os
 import re
+import sys
 import time
+from collections import Counter
 from datetime import datetime
-from typing import List, Dict, Optional
+from functools import lru_cache
+from typing import Callable, List, Dict, NamedTuple, Optional, Union
 import json
 from urllib.parse import quote
+from async_fetcher import AsyncFetcher, new_session
+from indeed_parser import DEFAULT_PARSER, declared_encoding, new_parser
+from job_requirements import extract_requirements
+from keyword_patterns import compile_keywords, find_keywords
+from response_cache import ResponseCache
+from seen_jobs import SeenJobs, digest
+
+# Sponsor data comes from the counting_h1b scripts, imported when the sponsor filter is used
+COUNTING_H1B_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'counting_h1b')
+
+# Lookup index built with: python company_name_lookup.py build <data files> --output Data/sponsors.json
+DEFAULT_SPONSOR_INDEX = os.path.join(COUNTING_H1B_DIR, 'Data', 'sponsors.json')
+
+# Job pages kept between daily runs
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'indeed')
+
+# Jobs found by earlier runs, only new or changed postings are returned
+DEFAULT_SEEN_JOBS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'seen_jobs.sqlite')
+
+DEFAULT_BLACKLIST = {
+    'permanent': {
+        'Meta': ['Meta', 'Facebook', 'Instagram', 'WhatsApp', 'Oculus', 'Reality Labs'],
+        'Amazon': ['Amazon', 'AWS', 'Audible', 'Twitch', 'Whole Foods', 'Zappos',
+                  'Ring', 'PillPack', 'Kiva Systems', 'Lab126', 'Amazon Web Services'],
+        'Microsoft': ['Microsoft', 'LinkedIn', 'GitHub', 'Xbox', 'Activision',
+                     'Activision Blizzard', 'Mojang', 'Nuance', 'Skype']
+    },
+    'industries': ['Aerospace', 'Defense', 'Aviation', 'Space', 'Military']
+}
+
+class BlacklistMatch(NamedTuple):
+    """Blacklist entry found in a job: the parent company, or None for an industry keyword"""
+    parent: Optional[str]
+    entry: str
 
 class CompanyBlacklist:
-    """Manages company blacklist with subsidiaries"""
+    """Manages company blacklist with subsidiaries, compiled into one regex per kind of entry"""
 
-    def __init__(self):
-        self.blacklist = {
-            'permanent': {
-                'Meta': ['Meta', 'Facebook', 'Instagram', 'WhatsApp', 'Oculus', 'Reality Labs'],
-                'Amazon': ['Amazon', 'AWS', 'Audible', 'Twitch', 'Whole Foods', 'Zappos',
-                          'Ring', 'PillPack', 'Kiva Systems', 'Lab126', 'Amazon Web Services'],
-                'Microsoft': ['Microsoft', 'LinkedIn', 'GitHub', 'Xbox', 'Activision',
-                             'Activision Blizzard', 'Mojang', 'Nuance', 'Skype']
-            },
-            'industries': ['Aerospace', 'Defense', 'Aviation', 'Space', 'Military']
-        }
+    def __init__(self, blacklist: Optional[Dict] = None):
+        self.blacklist = blacklist or DEFAULT_BLACKLIST
 
-    def is_blacklisted(self, company_name: str, job_description: str = "") -> bool:
-        """Check if company or job is blacklisted"""
-        if not company_name:
-            return False
+        # Lowercased entries, scanned at once over the lowercased company name or job text
+        self.companies = {}
+        for parent, subsidiaries in self.blacklist['permanent'].items():
+            for subsidiary in subsidiaries:
+                self.companies.setdefault(subsidiary.lower().strip(), BlacklistMatch(parent, subsidiary))
+        self.industries = {}
+        for industry in self.blacklist['industries']:
+            self.industries.setdefault(industry.lower().strip(), BlacklistMatch(None, industry))
+
+        self.company_pattern = compile_keywords(self.companies)
+        self.industry_pattern = compile_keywords(self.industries)
 
-        # Normalize company name
-        company_lower = company_name.lower().strip()
+    def match(self, company_name: str, job_description: str = "") -> Optional[BlacklistMatch]:
+        """Get the blacklist entry found in the company name, or the industry found in it or the description"""
+        if not company_name:
+            return None
 
         # Check against all blacklisted companies and subsidiaries
-        for parent, subsidiaries in self.blacklist['permanent'].items():
-            for subsidiary in subsidiaries:
-                if subsidiary.lower() in company_lower:
-                    return True
+        company_lower = company_name.lower()
+        if self.company_pattern:
+            found = next(find_keywords(self.company_pattern, company_lower), None)
+            if found:
+                return self.companies[found.group()]
 
         # Check industry keywords in company name or description
-        combined_text = f"{company_name} {job_description}".lower()
-        for industry in self.blacklist['industries']:
-            if industry.lower() in combined_text:
-                return True
+        if self.industry_pattern:
+            found = next(find_keywords(self.industry_pattern, company_lower), None) or \
+                    next(find_keywords(self.industry_pattern, job_description.lower()), None)
+            if found:
+                return self.industries[found.group()]
 
-        return False
+        return None
+
+    def is_blacklisted(self, company_name: str, job_description: str = "") -> bool:
+        """Check if company or job is blacklisted"""
+        return self.match(company_name, job_description) is not None
+
+class CountingH1B(NamedTuple):
+    """Parts of the counting_h1b scripts used by the sponsor filter"""
+    normalize_cached: Callable[[str], str]
+    CompanyLookup: type
+
+@lru_cache(maxsize=None)
+def load_counting_h1b() -> Optional[CountingH1B]:
+    """
+    Import the counting_h1b scripts, or return None if they or their dependencies are missing.
+
+    The scripts import each other as top-level modules, so their folder is added to sys.path,
+    once and only when sponsor data is needed.
+    """
+    if COUNTING_H1B_DIR not in sys.path:
+        sys.path.append(COUNTING_H1B_DIR)
+    try:
+        from company_name_cache import normalize_cached
+        from company_name_lookup import CompanyLookup
+    except ImportError:
+        return None
+    return CountingH1B(normalize_cached, CompanyLookup)
+
+class SponsorIndex:
+    """In-memory index of H-1B sponsors, loaded once per run from a company_name_lookup index"""
+
+    def __init__(self, lookup, min_approvals: int = 1, min_approval_rate: float = 0.0, fuzzy: bool = True,
+                 version: Optional[List] = None):
+        self.lookup = lookup
+        self.min_approvals = min_approvals
+        self.min_approval_rate = min_approval_rate
+        self.fuzzy = fuzzy
+        # Identifies the sponsor data, so jobs seen before are filtered again once it is rebuilt
+        self.version = version
+        self.normalize = load_counting_h1b().normalize_cached
+
+        # Exact matches of normalized names are a dict lookup, only other names go through the token index
+        self.by_norm = {}
+        for name, norm in zip(lookup.index.names, lookup.index.normalized):
+            if norm and (norm not in self.by_norm or
+                         lookup.company(name)['approvals'] > lookup.company(self.by_norm[norm])['approvals']):
+                self.by_norm[norm] = name
+        self._matches = {}
+
+    @classmethod
+    def load(cls, path: str, **options) -> Optional['SponsorIndex']:
+        """Load the sponsor index file, or return None if it or the counting_h1b scripts are missing"""
+        counting_h1b = load_counting_h1b()
+        if counting_h1b is None:
+            print("Sponsor filter disabled: the counting_h1b scripts could not be imported")
+            return None
+        if not path or not os.path.exists(path):
+            print(f"Sponsor filter disabled: no sponsor index at {path}")
+            return None
+        stat = os.stat(path)
+        version = [os.path.abspath(path), stat.st_mtime_ns, stat.st_size]
+        return cls(counting_h1b.CompanyLookup.load(path), version=version, **options)
+
+    def match(self, company_name: str) -> Optional[Dict]:
+        """Get the sponsor record of a company name, or None if it is not a known sponsor"""
+        norm = self.normalize(company_name or '')
+        if norm not in self._matches:
+            canonical = self.by_norm.get(norm)
+            similarity = 1.0
+            if canonical is None and self.fuzzy:
+                result = self.lookup.lookup_normalized(norm)
+                if result:
+                    canonical, similarity = result.canonical, result.similarity
+
+            if canonical is None:
+                self._matches[norm] = None
+            else:
+                company = self.lookup.company(canonical)
+                self._matches[norm] = {
+                    'company': canonical,
+                    'similarity': round(similarity, 3),
+                    'approvals': company['approvals'],
+                    'denials': company['denials'],
+                    'approval_rate': company['approval_rate'],
+                }
+        return self._matches[norm]
+
+    def annotate(self, job: Dict) -> bool:
+        """Add the sponsor record to a job and check it meets the minimum approvals and approval rate"""
+        sponsor = job['sponsor'] = self.match(job['company'])
+        if sponsor is None:
+            return self.min_approvals <= 0
+        return sponsor['approvals'] >= self.min_approvals and sponsor['approval_rate'] >= self.min_approval_rate
 
 class SalaryEstimator:
     """Estimates salary for jobs without listed compensation"""
@@ -84,8 +215,8 @@ class SalaryEstimator:
         """Estimate salary range based on title, company, and description"""
 
         # Determine level from title
-        level = self._extract_level(title, description)
-        base_min, base_max = self.base_ranges.get(level, (130, 180))
+        requirements = extract_requirements(title, description)
+        base_min, base_max = self.base_ranges.get(requirements.level, (130, 180))
 
         # Apply company multiplier if known
         company_lower = company.lower()
@@ -96,7 +227,7 @@ class SalaryEstimator:
                 break
 
         # Adjust for remote vs location
-        if 'remote' in title.lower() or 'remote' in description.lower():
+        if requirements.remote:
             multiplier *= 0.95  # Slight reduction for remote
 
         estimated_min = int(base_min * multiplier * 1000)
@@ -111,32 +242,20 @@ class SalaryEstimator:
 
     def _extract_level(self, title: str, description: str) -> str:
         """Extract seniority level from title and description"""
-        text = f"{title} {description}".lower()
-
-        if any(word in text for word in ['vp', 'vice president']):
-            return 'vp'
-        elif any(word in text for word in ['director']):
-            return 'director'
-        elif any(word in text for word in ['principal', 'distinguished']):
-            return 'principal'
-        elif any(word in text for word in ['staff', 'lead']):
-            return 'staff'
-        elif any(word in text for word in ['senior', 'sr.']):
-            return 'senior'
-        elif any(word in text for word in ['junior', 'jr.', 'entry']):
-            return 'junior'
-        elif any(word in text for word in ['intern', 'internship']):
-            return 'intern'
-        else:
-            return 'mid'
+        return extract_requirements(title, description).level
 
 class IndeedScraper:
     """Main Indeed job scraper with all filters"""
 
-    def __init__(self):
+    def __init__(self, sponsor_index: Optional[str] = DEFAULT_SPONSOR_INDEX,
+                 cache_dir: Optional[str] = DEFAULT_CACHE_DIR, parser: str = DEFAULT_PARSER,
+                 seen_jobs: Optional[str] = DEFAULT_SEEN_JOBS):
         self.base_url = "https://www.indeed.com/jobs"
+        self.view_url = "https://www.indeed.com/viewjob"
         self.blacklist = CompanyBlacklist()
         self.salary_estimator = SalaryEstimator()
+        # Search and job pages are parsed by lxml when it is installed, BeautifulSoup otherwise
+        self.parser = new_parser(parser)
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
@@ -149,34 +268,178 @@ class IndeedScraper:
                 {'name': 'United States', 'remote': True}
             ],
             'salary_min': 150000,
-            'experience_range': (3, 9)
+            'experience_range': (3, 9),
+            'min_sponsor_approvals': 1,
+            'min_sponsor_approval_rate': 0.0
         }
 
-    def get_daily_jobs(self) -> List[Dict]:
-        """Main method to get daily job listings"""
-        all_jobs = []
+        # Fetching: pages in flight at once, and requests per second to Indeed after a first burst
+        self.fetch_config = {
+            'max_concurrency': 4,
+            'requests_per_second': 0.5,
+            'burst': 2,
+            'max_retries': 3,
+            'backoff': 2.0
+        }
+
+        # One session for every request, so connections to Indeed are kept alive and reused
+        self.session = new_session(self.fetch_config['max_concurrency'])
+        self.session.headers.update(self.headers)
+
+        # Job pages already downloaded are only fetched again once their copy expires
+        self.cache_ttl_days = 7
+        self.page_cache = ResponseCache(cache_dir, ttl=self.cache_ttl_days * 24 * 3600) if cache_dir else None
 
-        for query in self.search_config['queries']:
-            for location in self.search_config['locations']:
-                print(f"Searching: {query} in {location['name']}")
-                jobs = self._search_jobs(query, location)
-                all_jobs.extend(jobs)
-                time.sleep(2)  # Be respectful to Indeed's servers
+        # Jobs of earlier runs are skipped before any job page is fetched, unless their card changed
+        if seen_jobs:
+            os.makedirs(os.path.dirname(os.path.abspath(seen_jobs)), exist_ok=True)
+        self.seen_jobs = SeenJobs(seen_jobs) if seen_jobs else None
 
-        # Remove duplicates based on job ID
-        unique_jobs = {job['id']: job for job in all_jobs}.values()
+        # Job counts and seconds of each stage of the last get_daily_jobs run
+        self.pipeline_stats = Counter()
 
-        # Filter jobs
-        filtered_jobs = self._apply_filters(list(unique_jobs))
+        # Loaded once per run, the filter is skipped when there is no index
+        self.sponsors = SponsorIndex.load(
+            sponsor_index,
+            min_approvals=self.search_config['min_sponsor_approvals'],
+            min_approval_rate=self.search_config['min_sponsor_approval_rate']
+        )
 
-        print(f"Total jobs found: {len(all_jobs)}, After filtering: {len(filtered_jobs)}")
+    def get_daily_jobs(self) -> List[Dict]:
+        """Main method to get daily job listings, only the new or changed ones when seen jobs are stored"""
+        return asyncio.run(self._run_pipeline())
+
+    async def _run_pipeline(self) -> List[Dict]:
+        """
+        Find jobs in two stages, so job pages are only fetched for jobs that can still be kept:
+        1. search: run every search in parallel and screen each results page as it arrives:
+           dedupe the cards by job ID, skip the jobs seen by earlier runs and drop the jobs
+           failing the filters that only need the card (blacklist, sponsor, degree, experience)
+        2. details: fetch the description of the screened jobs without a listed salary, as
+           soon as they are screened, estimate their salary and apply the salary filter
+        """
+        stats = self.pipeline_stats = Counter()
+        filters = self._filters_version()
+        seen_ids = set()
+        fresh_jobs = []
+        screened = []
+        need_details = []
+        details = []
+
+        # Rate limiting per host replaces sleeping between searches
+        async with AsyncFetcher(session=self.session, **self.fetch_config) as fetcher:
+            def screen(page_jobs: List[Dict]):
+                """Screen the cards of a results page, and start fetching the details the survivors need"""
+                stats['cards'] += len(page_jobs)
+                # Remove duplicates based on job ID, the same job is listed by several searches
+                unique_jobs = []
+                for job in page_jobs:
+                    if job['id'] not in seen_ids:
+                        seen_ids.add(job['id'])
+                        unique_jobs.append(job)
+                fresh = self.seen_jobs.unseen(unique_jobs, filters) if self.seen_jobs is not None else unique_jobs
+                fresh_jobs.extend(fresh)
+                stats['unique'] += len(unique_jobs)
+                stats['known'] += len(unique_jobs) - len(fresh)
+                # Jobs without salary whose page the card filters or earlier runs saved fetching
+                stats['details_skipped'] += sum(job['salary'] is None for job in unique_jobs)
+
+                for job in fresh:
+                    if self._passes_card_filters(job):
+                        screened.append(job)
+                        if job['salary'] is None:
+                            stats['details_skipped'] -= 1
+                            need_details.append(job)
+                            details.append(asyncio.create_task(self._estimate_salary_async(fetcher, job)))
+
+            started = time.perf_counter()
+            searches = [self._search_jobs_async(fetcher, query, location, screen)
+                        for query in self.search_config['queries']
+                        for location in self.search_config['locations']]
+            await asyncio.gather(*searches)
+
+            stats['screened'] = len(screened)
+            stats['search_seconds'] = time.perf_counter() - started
+            print(f"Stage 1 (search): {stats['search_requests']} pages, {stats['cards']} cards, "
+                  f"{stats['unique']} unique jobs, {stats['known']} seen before, "
+                  f"{stats['screened']} passed the card filters in {stats['search_seconds']:.1f}s")
+
+            # Job pages are fetched while the searches run, only the remaining ones are waited for here
+            started = time.perf_counter()
+            fetched = await asyncio.gather(*details)
+            filtered_jobs = [job for job in screened if self._passes_salary_filter(job)]
+            # Jobs whose page could not be fetched are not recorded, so the next run fetches them again
+            failed = {job['id'] for job, ok in zip(need_details, fetched) if not ok}
+            if self.seen_jobs is not None:
+                self.seen_jobs.record([job for job in fresh_jobs if job['id'] not in failed],
+                                      {job['id'] for job in filtered_jobs}, filters)
+
+            stats['details'] = len(details)
+            stats['detail_failures'] = len(failed)
+            stats['kept'] = len(filtered_jobs)
+            stats['details_seconds'] = time.perf_counter() - started
+            print(f"Stage 2 (details): {stats['details']} jobs needed details "
+                  f"({stats['detail_requests']} pages fetched, {stats['detail_failures']} failed, "
+                  f"{stats['details_skipped']} skipped), "
+                  f"{stats['kept']} passed the salary filter {stats['details_seconds']:.1f}s after the searches")
+
+            print(f"Fetched {fetcher.stats['requests']} pages "
+                  f"({fetcher.stats['retries']} retries, {fetcher.stats['failures']} failures)")
+            if self.page_cache:
+                print(f"Job page cache: {self.page_cache.summary()}")
+
+        print(f"Total jobs found: {stats['cards']}, After filtering: {len(filtered_jobs)}")
         return filtered_jobs
 
-    def _search_jobs(self, query: str, location: Dict) -> List[Dict]:
-        """Search Indeed for specific query and location"""
+    async def _search_jobs_async(self, fetcher: AsyncFetcher, query: str, location: Dict,
+                                 on_page: Optional[Callable[[List[Dict]], None]] = None) -> List[Dict]:
+        """Search Indeed for a query and location, without fetching job details, passing each results page to on_page"""
+        print(f"Searching: {query} in {location['name']}")
         jobs = []
+        params = self._search_params(query, location)
 
-        # Build search URL
+        # Pages are fetched in order, since an empty page ends the search
+        for start in range(0, 50, 10):
+            try:
+                self.pipeline_stats['search_requests'] += 1
+                response = await fetcher.get(self.base_url, params={**params, 'start': start})
+                page_jobs = self._parse_search_results(response.content, declared_encoding(
+                    response.headers.get('Content-Type')))
+            except Exception as e:
+                print(f"Error searching Indeed: {e}")
+                break
+
+            if not page_jobs:
+                break
+
+            if on_page:
+                on_page(page_jobs)
+            jobs.extend(page_jobs)
+
+        return jobs
+
+    async def _estimate_salary_async(self, fetcher: AsyncFetcher, job: Dict) -> bool:
+        """Estimate the salary of a job without listed salary from its description, False if its page fetch failed"""
+        description = await self._fetch_job_details_async(fetcher, job['url'], job['id'])
+        job['salary'] = self.salary_estimator.estimate_salary(job['title'], job['company'], description or job['snippet'])
+        return description is not None
+
+    async def _fetch_job_details_async(self, fetcher: AsyncFetcher, url: str, job_id: str) -> Optional[str]:
+        """Fetch full job description from job URL, without blocking other fetches, None if the fetch fails"""
+        try:
+            cache = self.page_cache
+            html, headers = cache.lookup(job_id) if cache else (None, {})
+            if html is None:
+                self.pipeline_stats['detail_requests'] += 1
+                response = await fetcher.get(url, headers=headers)
+                html = cache.update(job_id, response) if cache else response.text
+            return self._parse_job_details(html)
+        except Exception as e:
+            print(f"Error fetching job details: {e}")
+            return None
+
+    def _search_params(self, query: str, location: Dict) -> Dict:
+        """Build the search URL parameters of a query and location"""
         params = {
             'q': query,
             'l': location['name'],
@@ -190,36 +453,14 @@ class IndeedScraper:
         if location.get('remote'):
             params['q'] += ' remote'
 
-        # Indeed typically shows 15 jobs per page
-        for start in range(0, 50, 10):  # Get up to 50 jobs per query
-            params['start'] = start
-
-            try:
-                response = requests.get(self.base_url, params=params, headers=self.headers)
-                response.raise_for_status()
-
-                soup = BeautifulSoup(response.text, 'html.parser')
-                page_jobs = self._parse_search_results(soup)
-
-                if not page_jobs:
-                    break
-
-                jobs.extend(page_jobs)
+        return params
 
-            except Exception as e:
-                print(f"Error searching Indeed: {e}")
-                break
-
-        return jobs
-
-    def _parse_search_results(self, soup: BeautifulSoup) -> List[Dict]:
-        """Parse Indeed search results page"""
+    def _parse_search_results(self, page: Union[str, bytes], encoding: Optional[str] = None) -> List[Dict]:
+        """Parse Indeed search results page, given as the bytes received and their declared encoding"""
         jobs = []
 
-        # Find job cards - Indeed's structure changes, so we try multiple selectors
-        job_cards = soup.find_all('div', class_='job_seen_beacon') or \
-                   soup.find_all('div', class_='jobsearch-SerpJobCard') or \
-                   soup.find_all('div', {'data-testid': 'job-card'})
+        # Find job cards - Indeed's structure changes, so the parser tries multiple selectors
+        job_cards = self.parser.parse_cards(page, encoding)
 
         for card in job_cards:
             try:
@@ -232,49 +473,27 @@ class IndeedScraper:
 
         return jobs
 
-    def _extract_job_info(self, card) -> Optional[Dict]:
-        """Extract job information from a job card"""
+    def _extract_job_info(self, card: Dict) -> Optional[Dict]:
+        """Build a job from the fields of a job card, its salary is None when the card does not list one"""
         try:
-            # Title
-            title_elem = card.find('h2', class_='jobTitle') or card.find('a', {'data-testid': 'job-title'})
-            title = title_elem.get_text(strip=True) if title_elem else None
+            title = card['title']
+            job_id = card['id']
 
-            if not title:
+            if not title or not job_id:
                 return None
 
-            # Company
-            company_elem = card.find('span', class_='companyName') or card.find('div', class_='companyName')
-            company = company_elem.get_text(strip=True) if company_elem else 'Unknown'
-
-            # Location
-            location_elem = card.find('div', class_='companyLocation') or card.find('div', class_='locationsContainer')
-            location = location_elem.get_text(strip=True) if location_elem else 'Unknown'
-
-            # Job ID
-            job_id = card.get('data-jk') or card.find('a', {'data-testid': 'job-title'}).get('href', '').split('jk=')[-1][:16]
+            company = card['company'] or 'Unknown'
+            location = card['location'] or 'Unknown'
 
             # URL
-            url = f"https://www.indeed.com/viewjob?jk={job_id}"
-
-            # Salary (if available)
-            salary_elem = card.find('div', class_='salary-snippet') or card.find('span', class_='salary-snippet')
-            salary_text = salary_elem.get_text(strip=True) if salary_elem else None
+            url = f"{self.view_url}?jk={job_id}"
 
-            # Description snippet
-            snippet_elem = card.find('div', class_='job-snippet')
-            snippet = snippet_elem.get_text(strip=True) if snippet_elem else ''
+            salary_text = card['salary_text']
+            snippet = card['snippet'] or ''
 
             # Parse salary
             salary_info = self._parse_salary(salary_text) if salary_text else None
 
-            # If no salary, fetch full job details for better estimation
-            if not salary_info:
-                full_description = self._fetch_job_details(url)
-                if not full_description:
-                    full_description = snippet
-
-                salary_info = self.salary_estimator.estimate_salary(title, company, full_description)
-
             return {
                 'id': job_id,
                 'title': title,
@@ -322,97 +541,55 @@ class IndeedScraper:
             'original_text': salary_text
         }
 
-    def _fetch_job_details(self, url: str) -> str:
-        """Fetch full job description from job URL"""
-        try:
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.text, 'html.parser')
-            description_elem = soup.find('div', id='jobDescriptionText') or \
-                             soup.find('div', class_='jobsearch-JobComponent-description')
-
-            return description_elem.get_text() if description_elem else ""
-
-        except Exception as e:
-            print(f"Error fetching job details: {e}")
-            return ""
-
-    def _apply_filters(self, jobs: List[Dict]) -> List[Dict]:
-        """Apply all filters to job list"""
-        filtered = []
+    def _parse_job_details(self, html: str) -> str:
+        """Extract the full job description of a job page"""
+        return self.parser.parse_description(html)
 
-        for job in jobs:
-            # Check blacklist
-            if self.blacklist.is_blacklisted(job['company'], job['snippet']):
-                continue
+    def _filters_version(self) -> str:
+        """Get a hash of the filter settings, so jobs seen before are filtered again when they change"""
+        settings = {key: value for key, value in self.search_config.items() if key not in ('queries', 'locations')}
+        sponsors = [self.sponsors.version, self.sponsors.fuzzy] if self.sponsors is not None else None
+        return digest([settings, self.blacklist.blacklist, sponsors])
 
-            # Check salary
-            if job.get('salary'):
-                if job['salary']['max'] < self.search_config['salary_min']:
-                    continue
+    def _passes_card_filters(self, job: Dict) -> bool:
+        """Check the filters needing only the search card, before any job page is fetched"""
+        # Check blacklist
+        if self.blacklist.is_blacklisted(job['company'], job['snippet']):
+            return False
 
-            # Check education requirements (would need full description)
-            # This is a simplified check - in production, you'd fetch full descriptions
-            if self._requires_advanced_degree(job['title'], job['snippet']):
-                continue
+        # Check the employer sponsors H-1B visas, annotating the job with its approvals
+        if self.sponsors and not self.sponsors.annotate(job):
+            return False
 
-            # Check experience requirements
-            if not self._matches_experience_range(job['title'], job['snippet']):
-                continue
+        # Check education requirements (would need full description)
+        # This is a simplified check - in production, you'd fetch full descriptions
+        if self._requires_advanced_degree(job['title'], job['snippet']):
+            return False
 
-            filtered.append(job)
+        # Check experience requirements
+        return self._matches_experience_range(job['title'], job['snippet'])
 
-        return filtered
+    def _passes_salary_filter(self, job: Dict) -> bool:
+        """Check the listed or estimated salary reaches the minimum"""
+        if job.get('salary'):
+            return job['salary']['max'] >= self.search_config['salary_min']
+        return True
 
     def _requires_advanced_degree(self, title: str, description: str) -> bool:
         """Check if job requires Master's or PhD"""
-        text = f"{title} {description}".lower()
-
-        # Patterns that indicate advanced degree requirement
-        advanced_patterns = [
-            "master's required",
-            "masters required",
-            "ms required",
-            "m.s. required",
-            "phd required",
-            "ph.d. required",
-            "doctorate required",
-            "advanced degree required"
-        ]
-
-        return any(pattern in text for pattern in advanced_patterns)
+        return extract_requirements(title, description).degree is not None
 
     def _matches_experience_range(self, title: str, description: str) -> bool:
         """Check if job matches experience range (3-9 years)"""
-        text = f"{title} {description}".lower()
+        requirements = extract_requirements(title, description)
 
-        # Extract years of experience
-        exp_patterns = [
-            r'(\d+)\+?\s*years?\s*(?:of\s*)?experience',
-            r'(\d+)\s*-\s*(\d+)\s*years?\s*(?:of\s*)?experience',
-            r'minimum\s*(\d+)\s*years?'
-        ]
+        # If no specific requirement found, assume it matches
+        if requirements.years_min is None:
+            return True
 
+        # Check if requirement overlaps with our range
         min_exp, max_exp = self.search_config['experience_range']
-
-        for pattern in exp_patterns:
-            matches = re.findall(pattern, text)
-            if matches:
-                if isinstance(matches[0], tuple):
-                    # Range pattern
-                    req_min = int(matches[0][0])
-                    req_max = int(matches[0][1]) if len(matches[0]) > 1 else req_min
-                else:
-                    # Single number
-                    req_min = req_max = int(matches[0])
-
-                # Check if requirement overlaps with our range
-                if req_max < min_exp or req_min > max_exp:
-                    return False
-
-        # If no specific requirement found, assume it matches
-        return True
+        return not (requirements.years_max < min_exp or requirements.years_min > max_exp)
 
 # Example usage
 if __name__ == "__main__":
@@ -423,12 +600,14 @@ if __name__ == "__main__":
     with open(f"jobs_{datetime.now().strftime('%Y%m%d')}.json", 'w') as f:
         json.dump(jobs, f, indent=2)
 
-    print(f"\nSaved {len(jobs)} jobs to file")
+    print(f"\nSaved {len(jobs)} new or changed jobs to file")
 
     # Display sample results
     for job in jobs[:3]:
         print(f"\nTitle: {job['title']}")
         print(f"Company: {job['company']}")
+        if job.get('sponsor'):
+            print(f"H-1B approvals: {job['sponsor']['approvals']:,} ({job['sponsor']['approval_rate']}% approved)")
         print(f"Salary: ${job['salary']['min']:,} - ${job['salary']['max']:,} "
               f"({'estimated' if job['salary']['estimated'] else 'listed'})")
         print(f"URL: {job['url']}")
@@ -0,0 +1,267 @@
+"""
+Indeed Parser - extracts job cards and job descriptions from Indeed pages
+
+Indeed changes its markup over time, so each field has several selector variants tried in
+order. Two backends share these selectors:
+- bs4: BeautifulSoup with html.parser, building a tree of the whole decoded page. This
+  is the reference the other backend is tested against.
+- lxml: parses the raw bytes in C, finds the cards with precompiled XPath expressions and
+  only walks the card subtrees. One XPath query finds the elements of every variant of
+  every field of a card at once, and the variants each element layout (tag and
+  attributes) matched are cached, so cards of a known page layout are not matched
+  against each selector again.
+
+Both return the same card records:
+    {'id': ..., 'title': ..., 'company': ..., 'location': ..., 'salary_text': ..., 'snippet': ...}
+with None for missing fields, and the id None when the card has no job ID.
+"""
+
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Tuple, Union
+
+from bs4 import BeautifulSoup
+
+try:
+    from lxml import etree, html as lxml_html
+except ImportError:
+    etree = lxml_html = None
+
+# (tag, attribute, value) selectors; class matches one of the classes, other attributes the whole value
+CARD_SELECTORS = [
+    ('div', 'class', 'job_seen_beacon'),
+    ('div', 'class', 'jobsearch-SerpJobCard'),
+    ('div', 'data-testid', 'job-card'),
+]
+
+FIELD_SELECTORS = {
+    'title': [('h2', 'class', 'jobTitle'), ('a', 'data-testid', 'job-title')],
+    'company': [('span', 'class', 'companyName'), ('div', 'class', 'companyName')],
+    'location': [('div', 'class', 'companyLocation'), ('div', 'class', 'locationsContainer')],
+    'salary_text': [('div', 'class', 'salary-snippet'), ('span', 'class', 'salary-snippet')],
+    'snippet': [('div', 'class', 'job-snippet')],
+}
+
+# Link holding the job ID of cards without a data-jk attribute
+JOB_LINK_SELECTOR = ('a', 'data-testid', 'job-title')
+
+DESCRIPTION_SELECTORS = [
+    ('div', 'id', 'jobDescriptionText'),
+    ('div', 'class', 'jobsearch-JobComponent-description'),
+]
+
+# Text of these elements is not page text, like in BeautifulSoup.get_text
+SKIPPED_TEXT_TAGS = {'script', 'style', 'template'}
+
+# Whitespace BeautifulSoup collapses when a string holds nothing else
+ASCII_SPACES = ' \n\t\f\r'
+# Elements whose whitespace BeautifulSoup keeps
+PRESERVE_WHITESPACE_TAGS = {'pre', 'textarea'}
+
+BS4_PARSER = 'bs4'
+LXML_PARSER = 'lxml'
+
+Content = Union[str, bytes]
+
+def declared_encoding(content_type: Optional[str]) -> Optional[str]:
+    """Get the charset of a Content-Type header, None when the page has to tell its encoding"""
+    match = re.search(r'charset=["\']?([\w.:-]+)', content_type or '', re.IGNORECASE)
+    return match.group(1) if match else None
+
+def job_id_from_href(href: str) -> str:
+    """Get the job ID of a job link"""
+    return href.split('jk=')[-1][:16]
+
+class SoupParser:
+    """Reference parser, BeautifulSoup over the whole page"""
+
+    name = BS4_PARSER
+
+    @staticmethod
+    def _find(node, selector):
+        tag, attribute, value = selector
+        if attribute == 'class':
+            return node.find(tag, class_=value)
+        return node.find(tag, {attribute: value})
+
+    @staticmethod
+    def _soup(content: Content, encoding: Optional[str]) -> BeautifulSoup:
+        if isinstance(content, bytes):
+            # Without an encoding, BeautifulSoup looks for a meta charset like lxml does
+            return BeautifulSoup(content, 'html.parser', from_encoding=encoding)
+        return BeautifulSoup(content, 'html.parser')
+
+    def parse_cards(self, content: Content, encoding: Optional[str] = None) -> List[Dict]:
+        """Extract the job cards of a search results page"""
+        soup = self._soup(content, encoding)
+        cards = []
+        for tag, attribute, value in CARD_SELECTORS:
+            if attribute == 'class':
+                cards = soup.find_all(tag, class_=value)
+            else:
+                cards = soup.find_all(tag, {attribute: value})
+            if cards:
+                break
+
+        records = []
+        for card in cards:
+            record = {}
+            for field, selectors in FIELD_SELECTORS.items():
+                element = None
+                for selector in selectors:
+                    element = self._find(card, selector)
+                    if element:
+                        break
+                record[field] = element.get_text(strip=True) if element else None
+
+            job_id = card.get('data-jk')
+            if not job_id:
+                link = self._find(card, JOB_LINK_SELECTOR)
+                job_id = job_id_from_href(link.get('href', '')) if link else None
+            record['id'] = job_id
+            records.append(record)
+        return records
+
+    def parse_description(self, content: Content, encoding: Optional[str] = None) -> str:
+        """Extract the full job description of a job page"""
+        soup = self._soup(content, encoding)
+        for selector in DESCRIPTION_SELECTORS:
+            element = self._find(soup, selector)
+            if element:
+                return element.get_text()
+        return ""
+
+def _condition(attribute: str, value: str) -> str:
+    if attribute == 'class':
+        return f"contains(concat(' ', normalize-space(@class), ' '), ' {value} ')"
+    return f"@{attribute}='{value}'"
+
+def _union_xpath(selectors: List[Tuple[str, str, str]], prefix: str) -> 'etree.XPath':
+    """Compile an XPath finding the elements of any of the selectors, in document order"""
+    return etree.XPath(' | '.join(f"{prefix}{tag}[{_condition(attribute, value)}]"
+                                  for tag, attribute, value in selectors))
+
+def _collapse(string: str, preserve: bool) -> str:
+    """Collapse a whitespace-only string like the BeautifulSoup tree builder"""
+    if preserve or string.strip(ASCII_SPACES):
+        return string
+    return '\n' if '\n' in string else ' '
+
+def _strings(element, preserve: bool = False):
+    """Yield the text of an element like BeautifulSoup does, without comments and scripts"""
+    if not isinstance(element.tag, str):
+        return
+    inner = preserve or element.tag in PRESERVE_WHITESPACE_TAGS
+    if element.tag not in SKIPPED_TEXT_TAGS and element.text:
+        yield _collapse(element.text, inner)
+    for child in element:
+        yield from _strings(child, inner)
+        if child.tail:
+            yield _collapse(child.tail, preserve)
+
+def _text(element, strip: bool = False) -> str:
+    if strip:
+        return ''.join(string.strip() for string in _strings(element))
+    return ''.join(_strings(element))
+
+class LxmlParser:
+    """Fast parser, lxml over the raw bytes with one XPath query per page and per card"""
+
+    name = LXML_PARSER
+
+    def __init__(self):
+        # (key, variant, selector) per selector group, the lowest variant of a key wins
+        self.groups = {
+            'cards': [('card', variant, selector) for variant, selector in enumerate(CARD_SELECTORS)],
+            'fields': [(field, variant, selector) for field, selectors in FIELD_SELECTORS.items()
+                       for variant, selector in enumerate(selectors)] + [('job_link', 0, JOB_LINK_SELECTOR)],
+            'description': [('description', variant, selector)
+                            for variant, selector in enumerate(DESCRIPTION_SELECTORS)],
+        }
+        self.xpaths = {
+            'cards': _union_xpath(CARD_SELECTORS, '//'),
+            'fields': _union_xpath([selector for _, _, selector in self.groups['fields']], './/'),
+            'description': _union_xpath(DESCRIPTION_SELECTORS, '//'),
+        }
+
+        # Selector variants matched by each element layout (tag and attributes) seen so far,
+        # so the elements of a known page layout are not matched against every selector again
+        self.layouts: Dict[Tuple, List[Tuple[str, int]]] = {}
+        self.stats = Counter()
+
+    @staticmethod
+    def _document(content: Content, encoding: Optional[str]):
+        if isinstance(content, str):
+            content, encoding = content.encode('utf-8'), 'utf-8'
+        if not content.strip():
+            return None
+        parser = lxml_html.HTMLParser(encoding=encoding) if encoding else None
+        return lxml_html.document_fromstring(content, parser=parser)
+
+    def _variants(self, group: str, element) -> List[Tuple[str, int]]:
+        """Get the keys and variants of the selectors of a group matching an element"""
+        layout = (group, element.tag, element.get('class'), element.get('data-testid'), element.get('id'))
+        if layout in self.layouts:
+            self.stats['cached'] += 1
+            return self.layouts[layout]
+
+        self.stats['classified'] += 1
+        classes = (element.get('class') or '').split()
+        self.layouts[layout] = [
+            (key, variant) for key, variant, (tag, attribute, value) in self.groups[group]
+            if element.tag == tag and (value in classes if attribute == 'class' else element.get(attribute) == value)
+        ]
+        return self.layouts[layout]
+
+    def _select(self, group: str, node) -> Dict[str, Tuple[int, list]]:
+        """Get the elements of the lowest matching variant of each key, in document order"""
+        selected = {}
+        for element in self.xpaths[group](node):
+            for key, variant in self._variants(group, element):
+                best = selected.get(key)
+                if best is None or variant < best[0]:
+                    selected[key] = (variant, [element])
+                elif variant == best[0]:
+                    best[1].append(element)
+        return selected
+
+    def parse_cards(self, content: Content, encoding: Optional[str] = None) -> List[Dict]:
+        """Extract the job cards of a search results page"""
+        document = self._document(content, encoding)
+        if document is None:
+            return []
+        _, cards = self._select('cards', document).get('card', (None, []))
+
+        records = []
+        for card in cards:
+            fields = self._select('fields', card)
+            record = {field: _text(fields[field][1][0], strip=True) if field in fields else None
+                      for field in FIELD_SELECTORS}
+
+            job_id = card.get('data-jk')
+            if not job_id:
+                link = fields['job_link'][1][0] if 'job_link' in fields else None
+                job_id = job_id_from_href(link.get('href', '')) if link is not None else None
+            record['id'] = job_id
+            records.append(record)
+        return records
+
+    def parse_description(self, content: Content, encoding: Optional[str] = None) -> str:
+        """Extract the full job description of a job page"""
+        document = self._document(content, encoding)
+        if document is None:
+            return ""
+        selected = self._select('description', document)
+        return _text(selected['description'][1][0]) if selected else ""
+
+PARSERS = {BS4_PARSER: SoupParser}
+if lxml_html is not None:
+    PARSERS[LXML_PARSER] = LxmlParser
+
+DEFAULT_PARSER = LXML_PARSER if LXML_PARSER in PARSERS else BS4_PARSER
+
+def new_parser(name: str = DEFAULT_PARSER):
+    """Create a parser of one of the PARSERS backends"""
+    if name not in PARSERS:
+        raise ValueError(f"Unknown parser {name!r}, expected one of {sorted(PARSERS)}")
+    return PARSERS[name]()
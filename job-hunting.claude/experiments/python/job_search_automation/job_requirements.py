@@ -0,0 +1,101 @@
+"""
+Job Requirements - reads the experience, degree, level and remote requirements of a posting
+
+The title and description of a posting are lowercased once and scanned by two precompiled
+regexes, one for the years of experience and one for all the keywords (levels, degree
+phrases, remote), each starting with a literal character or a digit so the regex engine
+skips the positions where they cannot match. The result is a Requirements record read by
+the experience and degree filters and by the salary estimator. Records are cached by text,
+so the filters of a job share one extraction.
+
+Keywords match whole words only, so "lead" does not match "leadership" and "ms required"
+does not match "teams required".
+"""
+
+import re
+from functools import lru_cache
+from typing import NamedTuple, Optional
+from keyword_patterns import compile_keywords, find_keywords
+
+# Level keywords, highest level first: a posting gets the highest level it mentions
+LEVEL_KEYWORDS = [
+    ('vp', ['vp', 'vice president']),
+    ('director', ['director']),
+    ('principal', ['principal', 'distinguished']),
+    ('staff', ['staff', 'lead']),
+    ('senior', ['senior', 'sr.']),
+    ('junior', ['junior', 'jr.', 'entry']),
+    ('intern', ['intern', 'internship']),
+]
+DEFAULT_LEVEL = 'mid'
+
+# Phrases stating an advanced degree is required, with the degree they name
+ADVANCED_DEGREES = {
+    "master's required": 'masters',
+    "master’s required": 'masters',
+    'masters required': 'masters',
+    'ms required': 'masters',
+    'm.s. required': 'masters',
+    'phd required': 'phd',
+    'ph.d. required': 'phd',
+    'doctorate required': 'phd',
+    'advanced degree required': 'advanced',
+}
+
+REMOTE_KEYWORD = 'remote'
+MINIMUM_KEYWORD = 'minimum'
+
+LEVEL_RANK = {keyword: rank for rank, (_, keywords) in enumerate(LEVEL_KEYWORDS) for keyword in keywords}
+
+KEYWORD_PATTERN = compile_keywords(list(LEVEL_RANK) + list(ADVANCED_DEGREES) + [REMOTE_KEYWORD, MINIMUM_KEYWORD])
+
+# "5+ years of experience" or "5-8 years experience", \d\d* rather than \d+ so the digits start the pattern
+EXPERIENCE_PATTERN = re.compile(r'(\d\d*)(?:\s*-\s*(\d+))?\+?\s*years?\s*(?:of\s*)?experience')
+
+# Read after the "minimum" keyword: "minimum 5 years"
+MINIMUM_YEARS_PATTERN = re.compile(r'\s*(\d+)\s*years?')
+
+class Requirements(NamedTuple):
+    """Requirements stated by a posting, None when it does not state them"""
+    years_min: Optional[int]
+    years_max: Optional[int]
+    degree: Optional[str]
+    level: str
+    remote: bool
+
+@lru_cache(maxsize=4096)
+def extract_requirements(title: str, description: str) -> Requirements:
+    """
+    Read the requirements of a posting from its title and description.
+
+    When several years of experience are stated, the highest minimum and the highest maximum
+    are kept, "5+ years" counting as 5 to 5.
+    """
+    text = f"{title} {description}".lower()
+    years = []
+    degree = None
+    level_rank = len(LEVEL_KEYWORDS)
+    remote = False
+
+    for match in find_keywords(KEYWORD_PATTERN, text):
+        keyword = match.group()
+        if keyword in LEVEL_RANK:
+            level_rank = min(level_rank, LEVEL_RANK[keyword])
+        elif keyword in ADVANCED_DEGREES:
+            degree = degree or ADVANCED_DEGREES[keyword]
+        elif keyword == REMOTE_KEYWORD:
+            remote = True
+        else:
+            minimum = MINIMUM_YEARS_PATTERN.match(text, match.end())
+            if minimum:
+                years.append((int(minimum.group(1)), int(minimum.group(1))))
+
+    # Years are only stated next to the word, which is much faster to look for than digits
+    if 'year' in text:
+        for low, high in EXPERIENCE_PATTERN.findall(text):
+            years.append((int(low), int(high or low)))
+
+    level = LEVEL_KEYWORDS[level_rank][0] if level_rank < len(LEVEL_KEYWORDS) else DEFAULT_LEVEL
+    years_min = max(low for low, _ in years) if years else None
+    years_max = max(high for _, high in years) if years else None
+    return Requirements(years_min, years_max, degree, level, remote)
@@ -0,0 +1,57 @@
+"""
+Keyword Patterns - whole-word keyword search with one regex over a text
+
+The keywords are compiled into one regex shaped as their prefix tree. Every alternative of
+the regex starts with a literal character, which lets the regex engine skip the positions
+where no keyword can start in C instead of trying each keyword there. The word boundary
+before a match is checked on the matches found rather than in the regex, as a lookbehind
+would turn that skipping off. A match failing that check is dropped without consuming its
+text, so a keyword starting inside it is still found.
+
+Usage:
+    pattern = compile_keywords(['aws', 'amazon web services'])
+    for match in find_keywords(pattern, text.lower()):
+        print(match.group())
+"""
+
+import re
+from typing import Dict, Iterable, Iterator, Optional
+
+WORD_CHARACTER = re.compile(r'\w')
+
+def trie_pattern(words: Iterable[str]) -> str:
+    """Build a regex matching any of the words, shaped as their prefix tree so each position is tried once"""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    return _node_pattern(trie)
+
+def _node_pattern(node: Dict) -> str:
+    branches = [re.escape(char) + _node_pattern(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ''
+    body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+    # The optional group is greedy, so the longest word is matched first
+    return f"(?:{body})?" if '' in node else body
+
+def compile_keywords(words: Iterable[str]) -> Optional[re.Pattern]:
+    """Compile keywords into one regex matching them up to the end of a word, None without keywords"""
+    words = [word for word in words if word]
+    if not words:
+        return None
+    return re.compile(rf"{trie_pattern(words)}(?!\w)")
+
+def find_keywords(pattern: re.Pattern, text: str) -> Iterator[re.Match]:
+    """Yield the matches of a compile_keywords pattern that start a word"""
+    match = pattern.search(text)
+    while match:
+        start = match.start()
+        if not start or not WORD_CHARACTER.match(text, start - 1):
+            yield match
+            match = pattern.search(text, match.end())
+        else:
+            # A match inside a word may overlap a keyword starting a later word, search again from the next character
+            match = pattern.search(text, start + 1)
@@ -0,0 +1,96 @@
+"""
+Response Cache - on-disk cache of fetched pages, keyed by job ID
+
+Job pages rarely change while a posting is listed, so each page is kept in a JSON file
+with the validators the server sent. Within the TTL a cached page is used without any
+request. Once it expires, the page is revalidated with If-None-Match/If-Modified-Since,
+and a 304 answer keeps the cached copy for another TTL.
+
+Usage:
+    cache = ResponseCache('cache/indeed')
+    body, headers = cache.lookup(job_id)
+    if body is None:
+        body = cache.update(job_id, session.get(url, headers=headers))
+"""
+
+import json
+import os
+import re
+import time
+from collections import Counter
+from typing import Callable, Dict, Optional, Tuple
+
+import requests
+
+DEFAULT_TTL = 7 * 24 * 3600
+
+class ResponseCache:
+    """Pages stored on disk with their ETag/Last-Modified validators, counting what was saved"""
+
+    def __init__(self, directory: str, ttl: float = DEFAULT_TTL, clock: Callable[[], float] = time.time):
+        self.directory = directory
+        self.ttl = ttl
+        self.clock = clock
+        # hits: fresh pages, revalidated: 304 answers, misses: pages downloaded
+        self.stats = Counter()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, re.sub(r'[^\w.-]', '_', key) + '.json')
+
+    def _read(self, key: str) -> Optional[Dict]:
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, key: str, entry: Dict):
+        # Write next to the file first, so an interrupted run never leaves half a page
+        path = self._path(key)
+        with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(f"{path}.tmp", path)
+
+    def lookup(self, key: str) -> Tuple[Optional[str], Dict]:
+        """Get the cached page if it is fresh, or else the headers revalidating the cached copy"""
+        entry = self._read(key)
+        if entry is None:
+            return None, {}
+        if self.clock() - entry['fetched_at'] < self.ttl:
+            self.stats['hits'] += 1
+            self.stats['bytes_saved'] += len(entry['body'].encode('utf-8'))
+            return entry['body'], {}
+
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return None, headers
+
+    def update(self, key: str, response: requests.Response) -> str:
+        """Store the page of a response, or refresh the cached copy on a 304, and return the page"""
+        if response.status_code == 304:
+            entry = self._read(key)
+            if entry is None:
+                # The copy was removed since the lookup, so there is no page to return
+                return ""
+            self.stats['revalidated'] += 1
+            self.stats['bytes_saved'] += len(entry['body'].encode('utf-8'))
+        else:
+            self.stats['misses'] += 1
+            entry = {
+                'url': response.url,
+                'body': response.text,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+            }
+        entry['fetched_at'] = self.clock()
+        self._write(key, entry)
+        return entry['body']
+
+    def summary(self) -> str:
+        """Describe the cache use of this run"""
+        return (f"{self.stats['hits']} cached, {self.stats['revalidated']} revalidated, "
+                f"{self.stats['misses']} downloaded, {self.stats['bytes_saved'] / 1024:,.0f} KB saved")
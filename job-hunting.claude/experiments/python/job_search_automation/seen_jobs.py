@@ -0,0 +1,138 @@
+"""
+Seen Jobs - SQLite store of the jobs found by earlier runs
+
+Postings stay listed for weeks, so every job found is stored with the dates it was first
+and last seen, a fingerprint of its search card and the result of the filters. A later
+run splits the jobs of its searches before any job page is fetched:
+- known jobs, whose card and filter settings did not change, only get their last-seen
+  date updated
+- new or changed jobs go through the filters and salary estimation again, and are the
+  only ones returned
+
+Usage:
+    seen = SeenJobs('cache/seen_jobs.sqlite')
+    fresh = seen.unseen(jobs, filters)
+    ...
+    seen.record(fresh, passed_ids, filters)
+"""
+
+import hashlib
+import json
+import sqlite3
+from datetime import date
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+# Card fields whose change makes a known job a changed posting
+FINGERPRINT_FIELDS = ['title', 'company', 'location', 'snippet']
+
+# Number of job IDs looked up at once, below the SQLite limit of query parameters
+LOOKUP_BATCH_SIZE = 900
+
+def digest(value) -> str:
+    """Get a stable hash of a JSON-serializable value"""
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:16]
+
+def fingerprint(job: Dict) -> str:
+    """Get a hash of the card fields of a job, including its listed salary"""
+    salary = job.get('salary')
+    listed = salary['original_text'] if salary and not salary.get('estimated') else None
+    return digest([job.get(field) for field in FINGERPRINT_FIELDS] + [listed])
+
+class SeenJobs:
+    """Jobs seen by earlier runs, with their first and last seen dates and filter results"""
+
+    def __init__(self, path: str, today: Callable[[], date] = date.today):
+        self.path = path
+        self.today = today
+        self.connection = sqlite3.connect(path)
+        with self.connection:
+            self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    first_seen TEXT NOT NULL,
+                    last_seen TEXT NOT NULL,
+                    fingerprint TEXT NOT NULL,
+                    filters TEXT NOT NULL,
+                    passed INTEGER NOT NULL,
+                    salary TEXT
+                )
+            """)
+
+    def __enter__(self) -> 'SeenJobs':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Commit pending changes and close the file"""
+        self.connection.commit()
+        self.connection.close()
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Get the stored record of a job, or None if it was never seen"""
+        row = self.connection.execute(
+            "SELECT id, first_seen, last_seen, fingerprint, filters, passed, salary FROM jobs WHERE id = ?",
+            (job_id,)).fetchone()
+        if row is None:
+            return None
+        return {
+            'id': row[0],
+            'first_seen': row[1],
+            'last_seen': row[2],
+            'fingerprint': row[3],
+            'filters': row[4],
+            'passed': bool(row[5]),
+            'salary': json.loads(row[6]) if row[6] else None,
+        }
+
+    def _stored(self, job_ids: List[str]) -> Dict[str, tuple]:
+        stored = {}
+        for start in range(0, len(job_ids), LOOKUP_BATCH_SIZE):
+            batch = job_ids[start:start + LOOKUP_BATCH_SIZE]
+            placeholders = ','.join('?' * len(batch))
+            for job_id, job_fingerprint, filters in self.connection.execute(
+                    f"SELECT id, fingerprint, filters FROM jobs WHERE id IN ({placeholders})", batch):
+                stored[job_id] = (job_fingerprint, filters)
+        return stored
+
+    def unseen(self, jobs: Iterable[Dict], filters: str) -> List[Dict]:
+        """
+        Get the new or changed jobs, marking the known ones as seen today.
+
+        A job is known when it was stored with the same card fingerprint and filters version.
+        """
+        jobs = list(jobs)
+        stored = self._stored([job['id'] for job in jobs])
+        fresh, known = [], []
+        for job in jobs:
+            if stored.get(job['id']) == (fingerprint(job), filters):
+                known.append(job['id'])
+            else:
+                fresh.append(job)
+
+        with self.connection:
+            self.connection.executemany("UPDATE jobs SET last_seen = ? WHERE id = ?",
+                                        ((self.today().isoformat(), job_id) for job_id in known))
+        return fresh
+
+    def record(self, jobs: Iterable[Dict], passed: Set[str], filters: str):
+        """Store the filter results and salaries of jobs, keeping the first seen date of changed jobs"""
+        today = self.today().isoformat()
+        rows = ((job['id'], today, today, fingerprint(job), filters, job['id'] in passed,
+                 json.dumps(job['salary']) if job.get('salary') else None)
+                for job in jobs)
+        with self.connection:
+            self.connection.executemany("""
+                INSERT INTO jobs (id, first_seen, last_seen, fingerprint, filters, passed, salary)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (id) DO UPDATE SET
+                    last_seen = excluded.last_seen,
+                    fingerprint = excluded.fingerprint,
+                    filters = excluded.filters,
+                    passed = excluded.passed,
+                    salary = excluded.salary
+            """, rows)
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
@@ -0,0 +1,191 @@
+import asyncio
+import threading
+import time
+import unittest
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import requests
+from .async_fetcher import AsyncFetcher, TokenBucket
+from .indeed_job_scraper import CompanyBlacklist, IndeedScraper
+
+SEARCH_PAGE = """<html><body>
+<div class="job_seen_beacon" data-jk="job1">
+  <h2 class="jobTitle">Senior Software Engineer</h2>
+  <span class="companyName">Globex</span>
+  <div class="companyLocation">Redmond, WA</div>
+  <div class="job-snippet">Build services. 5+ years of experience</div>
+</div>
+<div class="job_seen_beacon" data-jk="job2">
+  <h2 class="jobTitle">Backend Engineer</h2>
+  <span class="companyName">Initech</span>
+  <div class="companyLocation">Remote</div>
+  <div class="salary-snippet">$160,000 - $190,000 a year</div>
+  <div class="job-snippet">APIs</div>
+</div>
+</body></html>"""
+
+DETAIL_PAGE = """<html><body><div id="jobDescriptionText">Staff level role, {jk}</div></body></html>"""
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Indeed-like pages, with endpoints that fail or answer slowly"""
+
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        with server.lock:
+            server.hits[url.path] += 1
+            server.paths.append(url.path)
+            hits = server.hits[url.path]
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            if url.path == '/jobs':
+                self.send_text(SEARCH_PAGE if query.get('start') == ['0'] else "<html></html>")
+            elif url.path == '/viewjob':
+                etag = f'"{query["jk"][0]}"'
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_text("", status=304)
+                else:
+                    self.send_text(DETAIL_PAGE.format(jk=query['jk'][0]), headers={'ETag': etag})
+            elif url.path == '/flaky' and hits <= 2:
+                self.send_text("busy", status=503, headers={'Retry-After': '0'})
+            elif url.path == '/flaky':
+                self.send_text("ok")
+            elif url.path == '/down':
+                self.send_text("down", status=503)
+            elif url.path == '/slow':
+                time.sleep(0.05)
+                self.send_text("ok")
+            else:
+                self.send_text("missing", status=404)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def send_text(self, text, status=200, headers=None):
+        data = text.encode('utf-8')
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+        self.server.lock = threading.Lock()
+        self.server.hits = Counter()
+        self.server.paths = []
+        self.server.in_flight = self.server.max_in_flight = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestAsyncFetcher(StubServerTestCase):
+    def fetch_all(self, paths, **options):
+        async def run():
+            async with AsyncFetcher(**options) as fetcher:
+                responses = await asyncio.gather(*(fetcher.get(self.url + path) for path in paths))
+                return responses, fetcher.stats
+        return asyncio.run(run())
+
+    def test_retries_temporary_failures(self):
+        (response,), stats = self.fetch_all(['/flaky'], requests_per_second=1000, backoff=0.01)
+        self.assertEqual(response.text, "ok")
+        self.assertEqual(stats['retries'], 2)
+
+    def test_gives_up(self):
+        with self.assertRaises(requests.HTTPError):
+            self.fetch_all(['/down'], max_retries=1, backoff=0.01)
+        self.assertEqual(self.server.hits['/down'], 2)
+        with self.assertRaises(requests.HTTPError):
+            self.fetch_all(['/missing'], backoff=0.01)
+        self.assertEqual(self.server.hits['/missing'], 1)
+
+    def test_bounds_concurrency(self):
+        responses, stats = self.fetch_all(['/slow'] * 12, max_concurrency=3, requests_per_second=1000, burst=12)
+        self.assertEqual([response.text for response in responses], ["ok"] * 12)
+        self.assertLessEqual(self.server.max_in_flight, 3)
+        self.assertGreater(self.server.max_in_flight, 1)
+
+    def test_rate_limits_per_host(self):
+        start = time.monotonic()
+        self.fetch_all(['/flaky'] * 2 + ['/slow'] * 4, requests_per_second=20, burst=2, backoff=0)
+        # 2 requests go through at once, the 6 others are spaced by 1 / 20 s
+        self.assertGreaterEqual(time.monotonic() - start, 6 / 20 - 0.02)
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_burst_then_rate(self):
+        now = [0.0]
+        bucket = TokenBucket(rate=2, burst=3, clock=lambda: now[0])
+
+        async def run():
+            for _ in range(3):
+                await bucket.acquire()
+            self.assertLess(bucket.tokens, 1)
+            now[0] += 0.5
+            await bucket.acquire()
+        asyncio.run(run())
+
+
+class TestScraperFetching(StubServerTestCase):
+    def scraper(self):
+        scraper = IndeedScraper(sponsor_index=None, cache_dir=None, seen_jobs=None)
+        scraper.base_url = f"{self.url}/jobs"
+        scraper.view_url = f"{self.url}/viewjob"
+        scraper.fetch_config.update(requests_per_second=1000, burst=100, backoff=0.01)
+        return scraper
+
+    def test_daily_jobs_from_stub(self):
+        scraper = self.scraper()
+        jobs = {job['id']: job for job in scraper.get_daily_jobs()}
+        self.assertEqual(sorted(jobs), ['job1', 'job2'])
+        self.assertFalse(jobs['job2']['salary']['estimated'])
+        # The description says staff level, the snippet alone would say senior
+        self.assertEqual(jobs['job1']['salary']['min'], 180000)
+
+        # Every search reads 2 pages, and the details of job1 are fetched once for all the searches
+        searches = len(scraper.search_config['queries']) * len(scraper.search_config['locations'])
+        self.assertEqual(self.server.hits['/jobs'], 2 * searches)
+        self.assertEqual(self.server.hits['/viewjob'], 1)
+
+        stats = scraper.pipeline_stats
+        self.assertEqual((stats['cards'], stats['unique'], stats['screened'], stats['kept']), (2 * searches, 2, 2, 2))
+        self.assertEqual((stats['details'], stats['detail_requests'], stats['details_skipped']), (1, 1, 0))
+
+    def test_details_are_fetched_while_searching(self):
+        scraper = self.scraper()
+        scraper.get_daily_jobs()
+
+        # The page of job1 is fetched as soon as its card passes, before the searches end
+        paths = self.server.paths
+        self.assertLess(paths.index('/viewjob'), len(paths) - 1 - paths[::-1].index('/jobs'))
+
+    def test_card_filters_run_before_detail_fetches(self):
+        scraper = self.scraper()
+        scraper.blacklist = CompanyBlacklist({'permanent': {'Globex': ['Globex']}, 'industries': []})
+
+        jobs = scraper.get_daily_jobs()
+        self.assertEqual([job['id'] for job in jobs], ['job2'])
+
+        # job1 has no salary, but its page is not fetched since its company is blacklisted
+        self.assertEqual(self.server.hits['/viewjob'], 0)
+        stats = scraper.pipeline_stats
+        self.assertEqual((stats['unique'], stats['screened'], stats['details'], stats['details_skipped']), (2, 1, 0, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
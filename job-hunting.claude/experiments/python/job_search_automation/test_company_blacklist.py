@@ -0,0 +1,43 @@
+import unittest
+from .indeed_job_scraper import BlacklistMatch, CompanyBlacklist
+
+
+class TestCompanyBlacklist(unittest.TestCase):
+    def setUp(self):
+        self.blacklist = CompanyBlacklist()
+
+    def test_reports_matched_entry(self):
+        self.assertEqual(self.blacklist.match('Amazon Web Services, Inc.'), BlacklistMatch('Amazon', 'Amazon Web Services'))
+        self.assertEqual(self.blacklist.match('amazon.com services llc'), BlacklistMatch('Amazon', 'Amazon'))
+        self.assertEqual(self.blacklist.match('GitHub'), BlacklistMatch('Microsoft', 'GitHub'))
+        self.assertEqual(self.blacklist.match('Globex', 'Build flight software for the Space program'),
+                         BlacklistMatch(None, 'Space'))
+        self.assertEqual(self.blacklist.match('Northrop Aerospace'), BlacklistMatch(None, 'Aerospace'))
+        self.assertTrue(self.blacklist.is_blacklisted('Reality Labs'))
+
+    def test_matches_whole_words_only(self):
+        for company, description in [('Springfield Engineering', ''), ('Metadata Systems', ''),
+                                     ('Globex', 'Kubernetes namespaces and whitespace handling'),
+                                     ('Lawson Software', ''), ('', 'Military')]:
+            with self.subTest(company=company):
+                self.assertIsNone(self.blacklist.match(company, description))
+                self.assertFalse(self.blacklist.is_blacklisted(company, description))
+
+    def test_entry_overlapping_a_rejected_match(self):
+        # "ring central" matches inside "spring", and must not hide "central bank" starting in it
+        blacklist = CompanyBlacklist({'permanent': {'RC': ['Ring Central'], 'CB': ['Central Bank']}, 'industries': []})
+        self.assertEqual(blacklist.match('Spring Central Bank'), BlacklistMatch('CB', 'Central Bank'))
+        self.assertEqual(blacklist.match('Central Bank'), BlacklistMatch('CB', 'Central Bank'))
+        self.assertEqual(blacklist.match('Ring Central Bank'), BlacklistMatch('RC', 'Ring Central'))
+
+    def test_companies_are_not_matched_in_descriptions(self):
+        self.assertIsNone(self.blacklist.match('Globex', 'Integrate with Amazon S3'))
+
+    def test_custom_blacklist(self):
+        blacklist = CompanyBlacklist({'permanent': {'Globex': ['Globex', 'Globex Labs']}, 'industries': []})
+        self.assertEqual(blacklist.match('globex labs inc'), BlacklistMatch('Globex', 'Globex Labs'))
+        self.assertIsNone(blacklist.match('Initech', 'Defense contractor'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import unittest
+from .indeed_job_scraper import IndeedScraper
+from .indeed_parser import PARSERS, LXML_PARSER, LxmlParser, SoupParser, declared_encoding
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures', 'indeed')
+SEARCH_PAGES = ['search_beacon.html', 'search_serp.html', 'search_testid.html', 'search_empty.html']
+JOB_PAGES = ['viewjob.html', 'viewjob_component.html']
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES, name), 'rb') as f:
+        return f.read()
+
+
+class TestSoupParser(unittest.TestCase):
+    def test_search_layouts(self):
+        parser = SoupParser()
+        beacon = parser.parse_cards(fixture('search_beacon.html'))
+        self.assertEqual([card['id'] for card in beacon], ['a1b2c3d4e5f60718', '0f1e2d3c4b5a6978', '99aa88bb77cc66dd'])
+        self.assertEqual(beacon[0]['company'], 'Contoso & Partners')
+        self.assertEqual(beacon[0]['salary_text'], '$150,000 - $190,000 a year')
+        self.assertEqual(beacon[1]['title'], 'Backend Engineer – Café Payments')
+        self.assertEqual(beacon[1]['snippet'], 'Own our payment APIs.\xa0Kubernetes,\xa0PostgreSQL.')
+        self.assertIsNone(beacon[1]['salary_text'])
+        self.assertEqual(beacon[2]['location'], 'Seattle, WA')
+
+        # Without data-jk the ID comes from the job link
+        serp = parser.parse_cards(fixture('search_serp.html'))
+        self.assertEqual([card['id'] for card in serp], ['1234567890abcdef', 'fedcba0987654321', None])
+
+        # The page declares its encoding in a meta tag
+        testid = parser.parse_cards(fixture('search_testid.html'))
+        self.assertEqual(testid[0]['location'], 'Montréal, QC')
+        self.assertEqual(testid[1]['id'], 'aaaabbbbccccdddd')
+
+        self.assertEqual(parser.parse_cards(fixture('search_empty.html')), [])
+
+    def test_descriptions(self):
+        description = SoupParser().parse_description(fixture('viewjob.html'))
+        self.assertIn('5-8 years of experience', description)
+        self.assertIn('Bachelor’s degree', description)
+        self.assertNotIn('impression', description)
+        self.assertNotIn('tracking pixel', description)
+
+
+@unittest.skipUnless(LXML_PARSER in PARSERS, "lxml is not installed")
+class TestLxmlParser(unittest.TestCase):
+    def test_matches_reference_parser(self):
+        for name in SEARCH_PAGES + JOB_PAGES:
+            page = fixture(name)
+            parse = 'parse_cards' if name in SEARCH_PAGES else 'parse_description'
+            for content in (page, page.decode('utf-8', errors='replace')):
+                with self.subTest(name=name, type=type(content).__name__):
+                    self.assertEqual(getattr(LxmlParser(), parse)(content), getattr(SoupParser(), parse)(content))
+
+    def test_declared_encoding(self):
+        page = fixture('search_testid.html')
+        self.assertEqual(LxmlParser().parse_cards(page, 'iso-8859-1'), SoupParser().parse_cards(page, 'iso-8859-1'))
+        self.assertEqual(declared_encoding('text/html; charset=ISO-8859-1'), 'ISO-8859-1')
+        self.assertEqual(declared_encoding('text/html;charset="utf-8"'), 'utf-8')
+        self.assertIsNone(declared_encoding('text/html'))
+        self.assertIsNone(declared_encoding(None))
+
+    def test_known_layouts_are_not_matched_again(self):
+        parser = LxmlParser()
+        page = fixture('search_beacon.html')
+        first = parser.parse_cards(page)
+        classified = parser.stats['classified']
+        self.assertGreater(classified, 0)
+
+        self.assertEqual(parser.parse_cards(page), first)
+        self.assertEqual(parser.stats['classified'], classified)
+        self.assertGreater(parser.stats['cached'], classified)
+
+
+class TestScraperParsing(unittest.TestCase):
+    def test_jobs_from_cards(self):
+        for parser in PARSERS:
+            with self.subTest(parser=parser):
+                scraper = IndeedScraper(sponsor_index=None, cache_dir=None, seen_jobs=None, parser=parser)
+                jobs = scraper._parse_search_results(fixture('search_serp.html'))
+
+                # The card without a job ID is skipped
+                self.assertEqual([job['id'] for job in jobs], ['1234567890abcdef', 'fedcba0987654321'])
+                self.assertEqual(jobs[0]['salary']['min'], 200000)
+                self.assertEqual(jobs[1]['location'], 'Kirkland, WA')
+                self.assertEqual(jobs[1]['snippet'], '')
+                self.assertIsNone(jobs[1]['salary'])
+
+    def test_unknown_parser(self):
+        with self.assertRaises(ValueError):
+            IndeedScraper(sponsor_index=None, cache_dir=None, seen_jobs=None, parser='regex')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+from .indeed_job_scraper import IndeedScraper, SalaryEstimator
+from .job_requirements import Requirements, extract_requirements
+
+
+class TestExtractRequirements(unittest.TestCase):
+    def test_record(self):
+        self.assertEqual(extract_requirements('Senior Backend Engineer (Remote)', '5-8 years of experience. PhD required.'),
+                         Requirements(5, 8, 'phd', 'senior', True))
+        self.assertEqual(extract_requirements('Software Engineer', 'Build APIs.'), Requirements(None, None, None, 'mid', False))
+
+    def test_years(self):
+        for description, years in [('3+ years of experience', (3, 3)),
+                                   ('2 - 4 years experience', (2, 4)),
+                                   ('Minimum 6 years in backend roles', (6, 6)),
+                                   ('1 year of experience with Go, 5+ years of experience overall', (5, 5)),
+                                   ('Founded 20 years ago', (None, None))]:
+            with self.subTest(description=description):
+                requirements = extract_requirements('Engineer', description)
+                self.assertEqual((requirements.years_min, requirements.years_max), years)
+
+    def test_highest_level_wins(self):
+        for title, description, level in [('Staff Engineer', 'Reports to the VP of Engineering', 'vp'),
+                                          ('Sr. Software Engineer', '', 'senior'),
+                                          ('Engineering Intern', 'Summer internship', 'intern'),
+                                          ('Tech Lead', 'Mentor junior engineers', 'staff'),
+                                          ('Principal Engineer', 'Distinguished track', 'principal')]:
+            with self.subTest(title=title):
+                self.assertEqual(extract_requirements(title, description).level, level)
+
+    def test_whole_words_only(self):
+        requirements = extract_requirements('Software Engineer', 'Leadership skills, internal tools, MVP '
+                                            'delivery, teams required to work remotely, staffing')
+        self.assertEqual(requirements, Requirements(None, None, None, 'mid', False))
+
+    def test_degrees(self):
+        for description, degree in [("Master's required", 'masters'), ('M.S. required', 'masters'),
+                                    ('Ph.D. required', 'phd'), ('Advanced degree required', 'advanced'),
+                                    ("Master's preferred", None)]:
+            with self.subTest(description=description):
+                self.assertEqual(extract_requirements('Engineer', description).degree, degree)
+
+
+class TestRequirementConsumers(unittest.TestCase):
+    def setUp(self):
+        self.scraper = IndeedScraper(sponsor_index=None, cache_dir=None, seen_jobs=None)
+
+    def test_filters(self):
+        self.assertTrue(self.scraper._requires_advanced_degree('Research Engineer', 'PhD required'))
+        self.assertFalse(self.scraper._requires_advanced_degree('Engineer', 'Cross-functional teams required'))
+        self.assertTrue(self.scraper._matches_experience_range('Engineer', '5+ years of experience'))
+        self.assertTrue(self.scraper._matches_experience_range('Engineer', '8-12 years of experience'))
+        self.assertFalse(self.scraper._matches_experience_range('Engineer', '1+ years of experience'))
+        self.assertFalse(self.scraper._matches_experience_range('Engineer', 'Minimum 10 years'))
+        self.assertTrue(self.scraper._matches_experience_range('Engineer', 'No requirement stated'))
+
+    def test_salary_estimate(self):
+        estimator = SalaryEstimator()
+        self.assertEqual(estimator._extract_level('Staff Engineer', ''), 'staff')
+        office = estimator.estimate_salary('Senior Engineer', 'Globex', 'Onsite in Redmond')
+        remote = estimator.estimate_salary('Senior Engineer', 'Globex', 'Fully remote')
+        self.assertEqual((office['min'], office['max']), (150000, 200000))
+        self.assertEqual((remote['min'], remote['max']), (142500, 190000))
+
+
+if __name__ == '__main__':
+    unittest.main()
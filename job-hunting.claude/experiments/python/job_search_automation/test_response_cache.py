@@ -0,0 +1,74 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from .async_fetcher import AsyncFetcher
+from .indeed_job_scraper import IndeedScraper
+from .response_cache import ResponseCache
+from .test_async_fetcher import DETAIL_PAGE, StubServerTestCase
+
+
+class TestResponseCache(StubServerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        self.now = [1000.0]
+
+    def tearDown(self):
+        self.directory.cleanup()
+        super().tearDown()
+
+    def scraper(self):
+        scraper = IndeedScraper(sponsor_index=None, cache_dir=self.directory.name, seen_jobs=None)
+        scraper.page_cache.clock = lambda: self.now[0]
+        scraper.base_url = f"{self.url}/jobs"
+        scraper.view_url = f"{self.url}/viewjob"
+        scraper.fetch_config.update(requests_per_second=1000, burst=100, backoff=0.01)
+        return scraper
+
+    def test_pages_are_fetched_once_per_ttl(self):
+        scraper = self.scraper()
+        ttl = scraper.page_cache.ttl
+        page_size = len(DETAIL_PAGE.format(jk='job1'))
+
+        scraper.get_daily_jobs()
+        self.assertEqual(self.server.hits['/viewjob'], 1)
+        self.assertEqual(scraper.page_cache.stats['misses'], 1)
+        self.assertEqual(os.listdir(self.directory.name), ['job1.json'])
+
+        # A later run uses the stored page without any request
+        scraper = self.scraper()
+        jobs = scraper.get_daily_jobs()
+        self.assertEqual(self.server.hits['/viewjob'], 1)
+        self.assertEqual(scraper.page_cache.stats['hits'], 1)
+        self.assertEqual(scraper.page_cache.stats['bytes_saved'], page_size)
+        self.assertIn(180000, [job['salary']['min'] for job in jobs])
+
+        # Once expired, the page is revalidated with its ETag and the server answers 304
+        self.now[0] += ttl + 1
+        scraper = self.scraper()
+        scraper.get_daily_jobs()
+        self.assertEqual(self.server.hits['/viewjob'], 2)
+        self.assertEqual(scraper.page_cache.stats['revalidated'], 1)
+        self.assertEqual(scraper.page_cache.lookup('job1')[0], DETAIL_PAGE.format(jk='job1'))
+
+    def test_detail_fetch_uses_cache(self):
+        scraper = self.scraper()
+        url = f"{scraper.view_url}?jk=job9"
+
+        async def fetch_twice():
+            async with AsyncFetcher(session=scraper.session, **scraper.fetch_config) as fetcher:
+                return [await scraper._fetch_job_details_async(fetcher, url, 'job9') for _ in range(2)]
+
+        self.assertEqual(asyncio.run(fetch_twice()), ["Staff level role, job9"] * 2)
+        self.assertEqual(self.server.hits['/viewjob'], 1)
+        self.assertEqual(scraper.page_cache.stats['hits'], 1)
+
+    def test_unknown_key(self):
+        cache = ResponseCache(self.directory.name)
+        self.assertEqual(cache.lookup('../job'), (None, {}))
+        self.assertEqual(cache.summary(), "0 cached, 0 revalidated, 0 downloaded, 0 KB saved")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import os
+import tempfile
+import unittest
+from datetime import date
+from .indeed_job_scraper import IndeedScraper, load_counting_h1b
+from .seen_jobs import SeenJobs
+from .test_async_fetcher import StubServerTestCase
+
+
+def job(job_id, title='Software Engineer', salary=None):
+    return {'id': job_id, 'title': title, 'company': 'Globex', 'location': 'Remote', 'snippet': 'APIs',
+            'salary': salary}
+
+
+class TestSeenJobs(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'seen_jobs.sqlite')
+        self.today = [date(2025, 3, 1)]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def store(self):
+        return SeenJobs(self.path, today=lambda: self.today[0])
+
+    def test_known_jobs_are_skipped(self):
+        salary = {'estimated': True, 'min': 150000, 'max': 200000}
+        with self.store() as seen:
+            jobs = [job('a'), job('b')]
+            self.assertEqual(seen.unseen(jobs, 'v1'), jobs)
+            jobs[0]['salary'] = salary
+            seen.record(jobs, {'a'}, 'v1')
+
+        self.today[0] = date(2025, 3, 4)
+        with self.store() as seen:
+            fresh = seen.unseen([job('a'), job('b', title='Senior Software Engineer'), job('c')], 'v1')
+            self.assertEqual([j['id'] for j in fresh], ['b', 'c'])
+            self.assertEqual(seen.get('a'), {'id': 'a', 'first_seen': '2025-03-01', 'last_seen': '2025-03-04',
+                                             'fingerprint': seen.get('a')['fingerprint'], 'filters': 'v1',
+                                             'passed': True, 'salary': salary})
+
+            # A changed posting keeps the date it was first seen
+            seen.record(fresh, {'c'}, 'v1')
+            self.assertEqual((seen.get('b')['first_seen'], seen.get('b')['last_seen']), ('2025-03-01', '2025-03-04'))
+            self.assertEqual(seen.get('c')['first_seen'], '2025-03-04')
+            self.assertFalse(seen.get('b')['passed'])
+            self.assertEqual(len(seen), 3)
+            self.assertIsNone(seen.get('d'))
+
+    def test_filter_change_filters_again(self):
+        with self.store() as seen:
+            seen.record([job('a')], set(), 'v1')
+            self.assertEqual(seen.unseen([job('a')], 'v1'), [])
+            self.assertEqual([j['id'] for j in seen.unseen([job('a')], 'v2')], ['a'])
+
+
+class TestScraperSeenJobs(StubServerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+        super().tearDown()
+
+    def scraper(self, sponsor_index=None):
+        scraper = IndeedScraper(sponsor_index=sponsor_index, cache_dir=None,
+                                seen_jobs=os.path.join(self.directory.name, 'seen_jobs.sqlite'))
+        scraper.base_url = f"{self.url}/jobs"
+        scraper.view_url = f"{self.url}/viewjob"
+        scraper.fetch_config.update(requests_per_second=1000, burst=100, backoff=0.01)
+        return scraper
+
+    def test_later_runs_only_return_new_jobs(self):
+        scraper = self.scraper()
+        self.assertEqual(sorted(job['id'] for job in scraper.get_daily_jobs()), ['job1', 'job2'])
+        self.assertEqual(self.server.hits['/viewjob'], 1)
+        self.assertEqual(scraper.seen_jobs.get('job1')['salary']['min'], 180000)
+
+        # The same postings are found again, without fetching any job page
+        scraper = self.scraper()
+        self.assertEqual(scraper.get_daily_jobs(), [])
+        self.assertEqual(self.server.hits['/viewjob'], 1)
+        self.assertEqual((scraper.pipeline_stats['known'], scraper.pipeline_stats['screened']), (2, 0))
+
+        # Changing a filter setting filters the known jobs again
+        scraper = self.scraper()
+        scraper.search_config['experience_range'] = (6, 9)
+        self.assertEqual([job['id'] for job in scraper.get_daily_jobs()], ['job2'])
+        self.assertFalse(scraper.seen_jobs.get('job1')['passed'])
+
+    def test_failed_detail_fetches_are_not_recorded(self):
+        scraper = self.scraper()
+        scraper.view_url = f"{self.url}/down"
+        scraper.fetch_config['max_retries'] = 0
+        self.assertEqual(sorted(job['id'] for job in scraper.get_daily_jobs()), ['job1', 'job2'])
+        self.assertIsNone(scraper.seen_jobs.get('job1'))
+
+        # The next run fetches the page of job1 again
+        scraper = self.scraper()
+        self.assertEqual([job['id'] for job in scraper.get_daily_jobs()], ['job1'])
+        self.assertEqual(self.server.hits['/viewjob'], 1)
+
+    def test_rebuilt_sponsor_index_filters_again(self):
+        path = os.path.join(self.directory.name, 'sponsors.json')
+        company = {'approvals': 10, 'denials': 0, 'approval_rate': 100.0}
+        CompanyLookup = load_counting_h1b().CompanyLookup
+        CompanyLookup({'Initech': company}).save(path)
+        self.assertEqual([job['id'] for job in self.scraper(path).get_daily_jobs()], ['job2'])
+        self.assertEqual(self.scraper(path).get_daily_jobs(), [])
+
+        # Once the index is built with more data, the known jobs are filtered again and Globex is a sponsor
+        CompanyLookup({'Initech': company, 'Globex': company}).save(path)
+        self.assertEqual(sorted(job['id'] for job in self.scraper(path).get_daily_jobs()), ['job1', 'job2'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+from unittest import mock
+from .indeed_job_scraper import SponsorIndex, load_counting_h1b
+
+COMPANIES = {
+    'GLOBEX CORPORATION': {'approvals': 120, 'denials': 6, 'approval_rate': 95.2},
+    'INITECH LLC': {'approvals': 3, 'denials': 3, 'approval_rate': 50.0},
+    'Initech': {'approvals': 10, 'denials': 0, 'approval_rate': 100.0},
+    'Umbrella Pharmaceuticals': {'approvals': 40, 'denials': 1, 'approval_rate': 97.6},
+}
+
+
+class TestSponsorIndex(unittest.TestCase):
+    def setUp(self):
+        self.lookup = load_counting_h1b().CompanyLookup(COMPANIES)
+
+    def index(self, **options):
+        return SponsorIndex(self.lookup, **options)
+
+    def test_exact_match_skips_fuzzy_lookup(self):
+        sponsors = self.index()
+        with mock.patch.object(self.lookup, 'lookup_normalized') as lookup_normalized:
+            self.assertEqual(sponsors.match('Globex Corporation'),
+                             {'company': 'GLOBEX CORPORATION', 'similarity': 1.0, 'approvals': 120, 'denials': 6,
+                              'approval_rate': 95.2})
+            # Names normalized alike go to the most approved company
+            self.assertEqual(sponsors.match('Initech, Inc.')['company'], 'Initech')
+        lookup_normalized.assert_not_called()
+
+    def test_fuzzy_match(self):
+        sponsor = self.index().match('Umbrella Pharmaceuticals Group')
+        self.assertEqual((sponsor['company'], sponsor['similarity']), ('Umbrella Pharmaceuticals', 0.94))
+        self.assertIsNone(self.index(fuzzy=False).match('Umbrella Pharmaceuticals Group'))
+        self.assertIsNone(self.index().match('Hooli'))
+
+    def test_matches_are_memoized(self):
+        sponsors = self.index()
+        with mock.patch.object(self.lookup, 'lookup_normalized', wraps=self.lookup.lookup_normalized) as lookup_normalized:
+            for name in ['Umbrella Pharmaceuticals Group', 'UMBRELLA PHARMACEUTICALS GROUP', 'Hooli', 'Hooli']:
+                sponsors.match(name)
+        self.assertEqual(lookup_normalized.call_count, 2)
+
+    def test_annotate(self):
+        job = {'company': 'Globex Corporation'}
+        self.assertTrue(self.index().annotate(job))
+        self.assertEqual(job['sponsor'], self.index().match('Globex Corporation'))
+
+        # Unknown companies are kept only without a minimum of approvals
+        job = {'company': 'Hooli'}
+        self.assertFalse(self.index().annotate(job))
+        self.assertIsNone(job['sponsor'])
+        self.assertTrue(self.index(min_approvals=0).annotate({'company': 'Hooli'}))
+
+        for name, options, passes in [('Initech', {'min_approvals': 11}, False),
+                                      ('Globex Corporation', {'min_approval_rate': 96.0}, False),
+                                      ('Initech', {'min_approval_rate': 96.0}, True)]:
+            with self.subTest(name=name, options=options):
+                self.assertEqual(self.index(**options).annotate({'company': name}), passes)
+
+
+if __name__ == '__main__':
+    unittest.main()